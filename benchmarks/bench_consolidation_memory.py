@@ -0,0 +1,93 @@
+"""
+Peak traced memory (tracemalloc) of consolidating an extraction the legacy
+way, with every batch result held in a dict until the end, against the
+streaming ResultAggregator, where each batch goes to the sink on completion.
+
+    python -m benchmarks.bench_consolidation_memory --orders 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.bench_ndjson_sink_memory import synthetic_order
+from benchmarks.local_bucket import LocalBucket
+from src.extraction.common.concurrency import ResultAggregator
+from src.extraction.common.engine import consolidate_results
+from src.extraction.entities import SALES_ORDERS
+from src.extraction.common.sinks import NdjsonBlobSink
+
+def batches(orders: int, batch_size: int, failure_every: int):
+    for start in range(0, orders, batch_size):
+        ids = range(start, min(start + batch_size, orders))
+        yield f"batch_{start // batch_size}", {
+            "success": [synthetic_order(i) for i in ids if i % failure_every],
+            "failed": [i for i in ids if not i % failure_every]
+        }
+
+def run_legacy(bucket, orders: int, batch_size: int, failure_every: int):
+    results = dict(batches(orders, batch_size, failure_every))
+
+    records, failed_ids, summary = [], [], {}
+    for batch_name, batch in results.items():
+        summary[batch_name] = {"successful_count": len(batch["success"]), "failed_count": len(batch["failed"]), "failed_ids": batch["failed"]}
+        records.extend(batch["success"])
+        failed_ids.extend(batch["failed"])
+
+    with NdjsonBlobSink(bucket, "raw/legacy.ndjson", chunk_size=8 * 1024 * 1024) as sink:
+        sink.write_many(records)
+        sink.close(metadata={"total_orders": len(records), "failed_extractions": len(failed_ids)})
+
+    return len(records), len(failed_ids)
+
+def run_streaming(bucket, orders: int, batch_size: int, failure_every: int):
+    results = ResultAggregator()
+
+    with NdjsonBlobSink(bucket, "raw/streaming.ndjson", chunk_size=8 * 1024 * 1024) as sink:
+        for batch_name, batch in batches(orders, batch_size, failure_every):
+            sink.write_batch(batch_name, batch["success"], batch["failed"])
+            results.add_batch(len(batch["success"]), batch["failed"])
+
+        data = consolidate_results(results=results, params={}, spec=SALES_ORDERS, sink=sink)
+        sink.close(metadata=data["metadata"])
+
+    return data["metadata"]["successful_extractions"], data["metadata"]["failed_extractions"]
+
+def measure(mode: str, orders: int, batch_size: int, failure_every: int) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        tracemalloc.start()
+        start = time.perf_counter()
+        successful, failed = (run_legacy if mode == "legacy" else run_streaming)(LocalBucket(root), orders, batch_size, failure_every)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "orders": orders,
+        "successful": successful,
+        "failed": failed,
+        "peak_traced_mb": round(peak / (1024 * 1024), 1),
+        "seconds": round(elapsed, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--failure-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    report = [measure(mode, args.orders, args.batch_size, args.failure_every) for mode in ("legacy", "streaming")]
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
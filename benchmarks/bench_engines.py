@@ -0,0 +1,95 @@
+"""
+Compare the threaded and asyncio detail-fetch engines against a local mock
+Bling server and print requests/sec for each one as JSON. Both engines run at
+the same concurrency (threads in the pool vs. in-flight requests), and the IDs
+are split into small batches so the threaded pool can keep every worker busy.
+
+    python -m benchmarks.bench_engines --ids 600 --latency 0.05 --concurrency 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.mock_bling_server import MockBlingServer, MockBlingState
+from src.extraction.common.bling_api_client import BlingClient
+from src.extraction.common.rate_limiter import TokenBucketRateLimiter
+from src.extraction.common.concurrency import process_pre_batched
+from src.extraction.common.async_concurrency import run_pre_batched_async
+
+class InMemoryStateManager:
+    stores_secrets = True
+
+    def __init__(self):
+        self._state = {"ELETROFOR_BLING_REFRESH_TOKEN": "mock-refresh"}
+
+    def get_state(self, key: str, fresh: bool = False):
+        return self._state.get(key)
+
+    def reload(self):
+        pass
+
+    def set_state(self, key: str, value: str, durable: bool = False):
+        self._state[key] = value
+
+    def update_state(self, values: dict, durable: bool = False):
+        self._state.update(values)
+
+    def flush(self):
+        pass
+
+def build_client(base_url: str, rate: float) -> BlingClient:
+    client_class = type("LocalBlingClient", (BlingClient,), {"BASE_URL": base_url})
+    limiter = TokenBucketRateLimiter(rate=rate, burst=max(1, int(rate)))
+    return client_class(state_manager=InMemoryStateManager(), rate_limiter=limiter)
+
+def build_batches(total_ids: int, batch_size: int = 100):
+    ids = [str(object_id) for object_id in range(1, total_ids + 1)]
+    return {page: ids[i:i + batch_size] for page, i in enumerate(range(0, total_ids, batch_size), start=1)}
+
+def run_engine(engine: str, base_url: str, batches, args) -> dict:
+    client = build_client(base_url, args.rate)
+    start = time.perf_counter()
+
+    if engine == "async":
+        results = run_pre_batched_async(batches, "pedidos/vendas", client, concurrency=args.concurrency, show_progress=False)
+    else:
+        results = process_pre_batched(batches, "pedidos/vendas", client, max_workers=args.concurrency, reqs_per_second=args.rate, show_progress=False)
+
+    elapsed = time.perf_counter() - start
+    succeeded = results.successful
+
+    return {
+        "engine": engine,
+        "concurrency": args.concurrency,
+        "requests": succeeded,
+        "wall_seconds": round(elapsed, 3),
+        "requests_per_second": round(succeeded / elapsed, 2) if elapsed else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    batches = build_batches(args.ids, args.batch_size)
+    report = []
+
+    with MockBlingServer(MockBlingState(total_orders=args.ids, latency=args.latency)) as server:
+        for engine in ("threads", "async"):
+            report.append(run_engine(engine, server.base_url, batches, args))
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
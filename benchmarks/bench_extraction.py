@@ -0,0 +1,148 @@
+"""
+End-to-end extraction benchmark against the local mock Bling API.
+
+Each (scenario, engine) pair runs `products_extraction` and `sales_extraction`
+in a fresh subprocess, writing to a LocalBucket, and reports throughput,
+client-side p50/p99 request latency, peak RSS and wall time as JSON so runs
+can be compared over time.
+
+    python -m benchmarks.bench_extraction --orders 2000 --output bench_report.json
+    python -m benchmarks.bench_extraction --scenarios faults --engines async
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+SCENARIOS = {
+    "baseline": {},
+    "faults": {"error_rate_429": 0.02, "error_rate_5xx": 0.01},
+    "rate_limited": {"rate_limit": 20.0}
+}
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def record_latencies(metrics) -> List[float]:
+    """Keeps every request latency the clients report to `metrics`."""
+    samples: List[float] = []
+    observe_request = metrics.observe_request
+
+    def observe(endpoint, status, seconds, response_bytes=0):
+        samples.append(seconds)
+        observe_request(endpoint, status, seconds, response_bytes)
+
+    metrics.observe_request = observe
+    return samples
+
+def run_scenario(scenario: str, engine: str, args) -> Dict:
+    from benchmarks.bench_engines import build_client
+    from benchmarks.local_bucket import LocalBucket
+    from benchmarks.mock_bling_server import MockBlingServer, MockBlingState
+    from src.extraction import products, sales
+    from src.extraction.common.metrics import METRICS
+
+    latencies = record_latencies(METRICS)
+    state = MockBlingState(
+        total_orders=args.orders,
+        total_products=args.products,
+        latency=args.latency,
+        jitter=args.jitter,
+        seed=args.seed,
+        **SCENARIOS[scenario]
+    )
+
+    with MockBlingServer(state) as server, tempfile.TemporaryDirectory() as root:
+        bucket = LocalBucket(root)
+        client = build_client(server.base_url, args.rate)
+
+        start = time.perf_counter()
+        products_data = products.products_extraction(client, bucket, engine=engine)
+        sales_data = sales.sales_extraction(client, "2024-01-01", "2024-01-31", bucket, engine=engine)
+        elapsed = time.perf_counter() - start
+
+        output_bytes = sum(blob.size or 0 for blob in bucket.list_blobs())
+
+    records = sum(data["metadata"]["successful_extractions"] for data in (products_data, sales_data))
+
+    return {
+        "scenario": scenario,
+        "engine": engine,
+        "orders": args.orders,
+        "products": args.products,
+        "records": records,
+        "failed": sum(data["metadata"]["failed_extractions"] for data in (products_data, sales_data)),
+        "requests": len(latencies),
+        "wall_seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "output_bytes": output_bytes,
+        "server_responses": {str(status): count for status, count in sorted(state.responses.items())}
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--engines", nargs="+", choices=("threads", "async"), default=["threads", "async"])
+    parser.add_argument("--output")
+    parser.add_argument("--child", nargs=2, metavar=("SCENARIO", "ENGINE"))
+    args = parser.parse_args()
+
+    if args.child:
+        logging.basicConfig(level=logging.WARNING)
+        print(json.dumps(run_scenario(args.child[0], args.child[1], args)))
+        return
+
+    forwarded = [
+        "--orders", str(args.orders), "--products", str(args.products), "--latency", str(args.latency),
+        "--jitter", str(args.jitter), "--rate", str(args.rate), "--seed", str(args.seed)
+    ]
+
+    results = []
+    for scenario in args.scenarios:
+        for engine in args.engines:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_extraction", *forwarded, "--child", scenario, engine],
+                cwd=ROOT_PATH, check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {key: getattr(args, key) for key in ("orders", "products", "latency", "jitter", "rate", "seed")},
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Microbenchmark of the JSON codecs on realistic order payloads.
+
+Parses the raw detail-response bytes and serializes the NDJSON lines with the
+stdlib, orjson and msgspec (when installed) and with `codec.dumps`, and checks
+that `codec.dumps` is byte-identical to the stdlib on the synthetic orders and
+on a float corpus covering the exponent-form edge cases.
+
+    python -m benchmarks.bench_json_codec --orders 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.synthetic_data import build_order
+from src.extraction.common import codec
+
+SEPARATORS = (',', ':')
+
+def edge_records(count: int, seed: int):
+    rng = random.Random(seed)
+    fixed = [0.0, -0.0, 1e-4, 9.999999999999999e-05, 1e-05, 1e16, 9999999999999998.0, 2 ** 63, 2 ** 70, -2 ** 64]
+    floats = fixed + [rng.uniform(-1, 1) * 10 ** rng.randint(-12, 20) for _ in range(count)]
+    return [{"data": {"id": i, "valor": value, "texto": "1e5 :0.0000 é\x1f \U0001f600"}} for i, value in enumerate(floats)]
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    orders = [build_order(order_id, seed=args.seed) for order_id in range(1, args.orders + 1)]
+    bodies = [json.dumps(order).encode("utf-8") for order in orders]
+    total_mb = sum(map(len, bodies)) / 1024 / 1024
+
+    mismatches = sum(
+        codec.dumps(record, SEPARATORS) != json.dumps(record, ensure_ascii=False, separators=SEPARATORS).encode("utf-8")
+        for record in orders + edge_records(20000, args.seed)
+    )
+    mismatches += sum(
+        codec.dumps(record) != json.dumps(record, ensure_ascii=False).encode("utf-8")
+        for record in orders[:1000]
+    )
+
+    available = ["stdlib"] + [name for name, module in (("orjson", codec.orjson), ("msgspec", codec.msgspec)) if module is not None]
+    print(f"{args.orders} pedidos, {total_mb:.1f} MB de JSON; codec ativo: {codec.CODEC}; divergências de bytes: {mismatches}")
+
+    raw_dumps = {
+        "stdlib": lambda record: json.dumps(record, ensure_ascii=False, separators=SEPARATORS).encode("utf-8"),
+        "orjson": lambda record: codec.orjson.dumps(record),
+        "msgspec": lambda record: codec.msgspec.json.encode(record)
+    }
+
+    for name in available:
+        parse = timed(lambda: [codec.loads(body, codec=name) for body in bodies], args.repeat)
+        serialize = timed(lambda: [raw_dumps[name](order) for order in orders], args.repeat)
+        print(f"  {name:<8} parse {total_mb / parse:8.1f} MB/s   serialize {total_mb / serialize:8.1f} MB/s")
+
+    guarded = timed(lambda: [codec.dumps(order, SEPARATORS) for order in orders], args.repeat)
+    print(f"  {'codec':<8} {'':>21}   serialize {total_mb / guarded:8.1f} MB/s (byte-identical)")
+
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Peak RSS of the legacy in-memory NDJSON upload against the streaming sink,
+measured in a fresh subprocess per (mode, record count).
+
+    python -m benchmarks.bench_ndjson_sink_memory --counts 10000 50000 100000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+def synthetic_order(order_id: int) -> dict:
+    return {
+        "data": {
+            "id": order_id,
+            "numero": order_id,
+            "data": "2024-01-01",
+            "total": 199.9,
+            "observacoes": "x" * 200,
+            "contato": {"id": order_id % 997, "nome": "Cliente Exemplo"},
+            "itens": [{"produto": {"id": i}, "quantidade": 1, "valor": 19.99, "descricao": "Produto exemplo"} for i in range(5)],
+            "taxas": {"taxaComissao": 1.5, "custoFrete": 12.0, "valorBase": 199.9}
+        }
+    }
+
+def run_legacy(bucket, count: int):
+    orders = [synthetic_order(i) for i in range(count)]
+    lines = [json.dumps({"metadata": {"total_orders": count}}, ensure_ascii=False)]
+    lines.extend(json.dumps(record, ensure_ascii=False, separators=(',', ':')) for record in orders)
+    bucket.blob("raw/legacy.ndjson").upload_from_string("\n".join(lines))
+
+def run_streaming(bucket, count: int):
+    from src.extraction.common.sinks import NdjsonBlobSink
+
+    with NdjsonBlobSink(bucket, "raw/streaming.ndjson", chunk_size=8 * 1024 * 1024) as sink:
+        for i in range(count):
+            sink.write(synthetic_order(i))
+        sink.close(metadata={"total_orders": count})
+
+def child(mode: str, count: int):
+    from benchmarks.local_bucket import LocalBucket
+
+    with tempfile.TemporaryDirectory() as root:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        (run_legacy if mode == "legacy" else run_streaming)(LocalBucket(root), count)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({"mode": mode, "records": count, "peak_rss_mb": round(peak / 1024, 1), "baseline_rss_mb": round(baseline / 1024, 1)}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COUNT"))
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    report = []
+    for count in args.counts:
+        for mode in ("legacy", "streaming"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_ndjson_sink_memory", "--child", mode, str(count)],
+                cwd=ROOT_PATH, check=True, capture_output=True, text=True
+            ).stdout
+            report.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
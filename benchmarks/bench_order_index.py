@@ -0,0 +1,109 @@
+"""
+Runs the same sales date window twice against the local mock Bling API with
+the order index enabled, changing a fraction of the orders in between, and
+checks that the second run rewrites only those orders while every unchanged
+one is still in the NDJSON partitions and in the (local) warehouse tables.
+Prints both runs as JSON and exits with 1 when any order went missing.
+
+    python -m benchmarks.bench_order_index --orders 500 --changed 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.bench_engines import build_client
+from benchmarks.local_bucket import LocalBucket
+from benchmarks.local_warehouse import LocalWarehouse
+from benchmarks.mock_bling_server import MockBlingServer, MockBlingState
+from src.extraction import sales
+from src.extraction.common import config, engine
+from src.extraction.common.codec import loads
+from src.extraction.common.compression import decompress_bytes, normalize_compression
+from src.extraction.entities import SALES_ORDERS
+
+def ndjson_orders(bucket: LocalBucket) -> list:
+    prefix = SALES_ORDERS.output_path.split("{", 1)[0]
+    order_ids = []
+
+    for blob in bucket.list_blobs(prefix=prefix):
+        for line in decompress_bytes(blob.download_as_bytes(), normalize_compression(config.BLING_NDJSON_COMPRESSION)).splitlines():
+            document = loads(line) if line.strip() else {}
+            if "data" in document:
+                order_ids.append(document["data"]["id"])
+
+    return order_ids
+
+def run_window(client, bucket: LocalBucket, warehouse: LocalWarehouse, args) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = sales.sales_extraction(client, args.start, args.end, bucket, engine=args.engine)
+
+    order_ids = ndjson_orders(bucket)
+
+    return {
+        "extracted": data["metadata"]["successful_extractions"],
+        "order_index": data["metadata"].get("order_index"),
+        "ndjson_records": len(order_ids),
+        "ndjson_distinct_orders": len(set(order_ids)),
+        "warehouse_rows": {name: len(rows) for name, rows in sorted(warehouse.tables.items())}
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-01-31")
+    parser.add_argument("--changed", type=float, default=0.1, help="Fração dos pedidos alterada entre as execuções")
+    parser.add_argument("--rate", type=float, default=500.0)
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    root = tempfile.mkdtemp(prefix="bench-order-index-")
+    bucket = LocalBucket(os.path.join(root, "bucket"))
+    warehouse = LocalWarehouse(bucket)
+
+    config.BLING_PARTITION_BY_RECORD_DATE = True
+    config.BLING_ORDER_INDEX_ENABLED = True
+    config.BLING_ORDER_INDEX_LOCAL_DIR = os.path.join(root, "state")
+    config.BLING_DETAIL_CACHE_ENABLED = False
+    config.BLING_CHECKPOINT_ENABLED = False
+    config.BLING_BIGQUERY_LOAD_ENABLED = True
+    engine.open_warehouse = lambda: warehouse
+
+    state = MockBlingState(total_orders=args.orders, total_products=args.products, latency=0.0)
+
+    with MockBlingServer(state) as server:
+        client = build_client(server.base_url, args.rate)
+        first = run_window(client, bucket, warehouse, args)
+
+        step = max(1, round(1 / args.changed)) if args.changed > 0 else args.orders + 1
+        state.changed_orders = set(range(1, args.orders + 1, step))
+        second = run_window(client, bucket, warehouse, args)
+
+    runs = [first, second]
+    kept = (
+        second["order_index"]["changed"] == len(state.changed_orders)
+        and second["ndjson_distinct_orders"] == first["ndjson_distinct_orders"] == first["extracted"]
+        and second["ndjson_records"] == second["ndjson_distinct_orders"]
+        and second["warehouse_rows"] == first["warehouse_rows"]
+    )
+
+    print(json.dumps({"runs": runs, "unchanged_orders_kept": kept}, indent=2))
+
+    if not kept:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Checks the projection paths declared in `entities.py` against the JSON paths
+the dbt staging models actually read, and measures the NDJSON bytes of full
+versus projected synthetic orders and products.
+
+    python -m benchmarks.bench_projection --orders 5000
+    python -m benchmarks.bench_projection --print-paths
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.synthetic_data import build_order, build_product
+from src.extraction.common.codec import dumps
+from src.extraction.common.projection import Projection, paths_from_dbt_models
+from src.extraction.entities import PRODUCTS, SALES_ORDERS
+
+MODELS_DIR = os.path.join(ROOT_PATH, "dbt_project", "models")
+SOURCES = ((SALES_ORDERS, "raw_sales", build_order), (PRODUCTS, "raw_products", build_product))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--print-paths", action="store_true")
+    args = parser.parse_args()
+
+    drift = False
+    report = []
+
+    for spec, source_table, build in SOURCES:
+        generated = paths_from_dbt_models(MODELS_DIR, source_table)
+
+        if args.print_paths:
+            print(f"{spec.name} ({source_table}): {json.dumps(generated)}")
+            continue
+
+        missing = sorted(set(generated) - set(spec.projection))
+        unused = sorted(set(spec.projection) - set(generated))
+        drift = drift or bool(missing)
+
+        projection = Projection(spec.projection)
+        records = [build(object_id) for object_id in range(1, args.orders + 1)]
+        full_bytes = sum(len(dumps(record, spec.separators)) + 1 for record in records)
+        projected_bytes = sum(len(dumps(projection.apply(record), spec.separators)) + 1 for record in records)
+
+        report.append({
+            "entity": spec.name,
+            "records": len(records),
+            "paths": len(spec.projection),
+            "missing_paths": missing,
+            "unused_paths": unused,
+            "full_mb": round(full_bytes / 1024 / 1024, 2),
+            "projected_mb": round(projected_bytes / 1024 / 1024, 2),
+            "reduction": round(1 - projected_bytes / full_bytes, 3)
+        })
+
+    if report:
+        print(json.dumps(report, indent=2))
+
+    if drift:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
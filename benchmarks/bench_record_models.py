@@ -0,0 +1,66 @@
+"""
+Bytes per order held in memory as the parsed dict versus the typed
+SalesOrder model (common/models.py), measured with tracemalloc while decoding
+synthetic detail bodies, plus the decode time of each representation.
+
+    python -m benchmarks.bench_record_models --orders 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.synthetic_data import build_order
+from src.extraction.common import models
+from src.extraction.common.codec import loads
+from src.extraction.common.models import RecordDecoder, SalesOrder
+
+def measure(name: str, decode, bodies) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = [decode(body) for body in bodies]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "representation": name,
+        "orders": len(records),
+        "bytes_per_order": round(current / len(records)),
+        "total_mb": round(current / (1024 * 1024), 1),
+        "decode_seconds": round(elapsed, 2)
+    }
+    del records
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bodies = [json.dumps(build_order(order_id, seed=args.seed)).encode("utf-8") for order_id in range(1, args.orders + 1)]
+
+    report = [
+        measure("dict", loads, bodies),
+        measure("model", RecordDecoder(SalesOrder), bodies),
+        measure("model_keep_raw", RecordDecoder(SalesOrder, keep_raw=True), bodies)
+    ]
+
+    print(json.dumps({
+        "msgspec": models.msgspec is not None,
+        "body_bytes_per_order": round(sum(map(len, bodies)) / len(bodies)),
+        "results": report
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
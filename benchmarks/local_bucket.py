@@ -0,0 +1,106 @@
+import os
+from typing import Optional
+
+class LocalBlobWriter:
+    def __init__(self, path: str, chunk_size: Optional[int] = None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._tmp_path = f"{path}.part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self._tmp_path, "wb", buffering=chunk_size or -1)
+
+    def __enter__(self) -> "LocalBlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def writable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+class LocalBlob:
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.root, name)
+        self.content_type = None
+
+    def open(self, mode: str = "rb", chunk_size: Optional[int] = None, content_type: Optional[str] = None, **kwargs):
+        if "w" in mode:
+            return LocalBlobWriter(self.path, chunk_size)
+        return open(self.path, mode)
+
+    def upload_from_string(self, data, content_type: Optional[str] = None, **kwargs):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        payload = data.encode("utf-8") if isinstance(data, str) else data
+        with open(self.path, "wb") as file:
+            file.write(payload)
+
+    def compose(self, sources, **kwargs):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.part"
+        with open(tmp_path, "wb") as destination:
+            for source in sources:
+                with open(source.path, "rb") as file:
+                    destination.write(file.read())
+        os.replace(tmp_path, self.path)
+
+    def download_as_bytes(self, **kwargs) -> bytes:
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def exists(self, **kwargs) -> bool:
+        return os.path.exists(self.path)
+
+    def delete(self, **kwargs):
+        os.remove(self.path)
+
+    @property
+    def size(self) -> Optional[int]:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else None
+
+    @property
+    def generation(self) -> Optional[int]:
+        return os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+
+class LocalBucket:
+    """Filesystem stand-in for google.cloud.storage.Bucket used by the benchmarks."""
+
+    def __init__(self, root: str, name: str = "local-bucket"):
+        self.root = root
+        self.name = name
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self, name)
+
+    def get_blob(self, name: str) -> Optional[LocalBlob]:
+        blob = LocalBlob(self, name)
+        return blob if blob.exists() else None
+
+    def list_blobs(self, prefix: str = ""):
+        for directory, _, files in os.walk(self.root):
+            for file_name in files:
+                if file_name.endswith(".part"):
+                    continue
+                name = os.path.relpath(os.path.join(directory, file_name), self.root).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    yield LocalBlob(self, name)
@@ -0,0 +1,43 @@
+from typing import Dict, List
+import os
+
+import pyarrow.parquet as pq
+
+from .local_bucket import LocalBucket
+
+class LocalWarehouse:
+    """
+    In-memory stand-in for BigQueryWarehouse. Reads the Parquet files written to
+    a LocalBucket and applies the same staging → target replacement semantics,
+    so BigQueryLoadSink can be exercised without BigQuery.
+    """
+
+    def __init__(self, bucket: LocalBucket, project: str = "local", dataset: str = "bronze_bling"):
+        self.bucket = bucket
+        self.project = project
+        self.dataset = dataset
+        self.tables: Dict[str, List[Dict]] = {}
+
+    def table_id(self, table_name: str) -> str:
+        return f"{self.project}.{self.dataset}.{table_name}"
+
+    def load_parquet(self, source_uri: str, table_name: str) -> int:
+        blob_name = source_uri.split(f"gs://{self.bucket.name}/", 1)[1]
+        rows = pq.ParquetFile(os.path.join(self.bucket.root, blob_name)).read().to_pylist()
+        self.tables[table_name] = rows
+        return len(rows)
+
+    def merge_staging(self, staging_name: str, target_name: str, partition_column: str, key_column: str, mode: str):
+        staging = self.tables[staging_name]
+        target = self.tables.setdefault(target_name, [])
+
+        keys = {row[key_column] for row in staging}
+        partitions = {row[partition_column] for row in staging if row[partition_column] is not None}
+
+        def replaced(row: Dict) -> bool:
+            return row[key_column] in keys or (mode == "replace_partitions" and row[partition_column] in partitions)
+
+        self.tables[target_name] = [row for row in target if not replaced(row)] + list(staging)
+
+    def drop(self, table_name: str):
+        self.tables.pop(table_name, None)
@@ -0,0 +1,189 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+from .synthetic_data import build_order, build_product, category_row, channel_row, order_summary, product_summary, status_rows
+
+class MockBlingState:
+    """
+    Configuration and counters of the mock API.
+
+    Besides latency and jitter, GET requests can be rejected with a 429 or a
+    503 at the given rates, and `rate_limit` enforces a server-side requests
+    per second budget (token bucket) that answers 429 with Retry-After, as
+    Bling does when the plan's quota is exceeded. Orders in `changed_orders`
+    are served with another status, to simulate edits between two runs.
+    """
+
+    def __init__(
+        self,
+        total_orders: int = 1000,
+        total_products: int = 500,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate_429: float = 0.0,
+        error_rate_5xx: float = 0.0,
+        rate_limit: Optional[float] = None,
+        seed: int = 0,
+        total_categories: int = 140,
+        total_channels: int = 12
+    ):
+        self.total_orders = total_orders
+        self.total_products = total_products
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.rate_limit = rate_limit
+        self.seed = seed
+        self.total_categories = total_categories
+        self.total_channels = total_channels
+        self.changed_orders: Set[int] = set()
+        self.requests_served = 0
+        self.responses: Dict[int, int] = {}
+        self.lock = threading.Lock()
+
+        self._random = random.Random(seed)
+        self._tokens = float(rate_limit or 0)
+        self._last_refill = time.monotonic()
+
+    def sleep(self):
+        with self.lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttle(self) -> Optional[float]:
+        """Seconds the client should wait, or None when the request is admitted."""
+        if not self.rate_limit:
+            return None
+
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+            self._last_refill = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate_limit
+
+    def injected_fault(self) -> Optional[int]:
+        with self.lock:
+            roll = self._random.random()
+        if roll < self.error_rate_429:
+            return 429
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            return 503
+        return None
+
+    def count_response(self, status: int):
+        with self.lock:
+            self.responses[status] = self.responses.get(status, 0) + 1
+
+class MockBlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockBling/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> MockBlingState:
+        return self.server.state
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.state.count_response(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self):
+        with self.state.lock:
+            self.state.requests_served += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self._count()
+
+        if self.path.endswith("/oauth/token"):
+            self._send_json(200, {"access_token": "mock-access", "refresh_token": "mock-refresh", "expires_in": 21600})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_GET(self):
+        self._count()
+
+        if (retry_after := self.state.throttle()) is not None:
+            self._send_json(429, {"error": {"type": "TOO_MANY_REQUESTS"}}, {"Retry-After": f"{retry_after:.3f}"})
+            return
+
+        self.state.sleep()
+
+        if (fault := self.state.injected_fault()) is not None:
+            headers = {"Retry-After": "0.1"} if fault == 429 else None
+            self._send_json(fault, {"error": {"type": "INJECTED_FAULT"}}, headers)
+            return
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path
+
+        if match := re.search(r"/pedidos/vendas/(\d+)$", path):
+            order = build_order(int(match.group(1)), seed=self.state.seed, total_products=self.state.total_products)
+            if order["data"]["id"] in self.state.changed_orders:
+                order["data"]["situacao"]["valor"] += 1
+            self._send_json(200, order)
+        elif match := re.search(r"/produtos/(\d+)$", path):
+            self._send_json(200, build_product(int(match.group(1)), seed=self.state.seed))
+        elif path.endswith("/pedidos/vendas"):
+            self._send_json(200, self._page(query, self.state.total_orders, lambda object_id: order_summary(object_id, self.state.seed, self.state.total_products)))
+        elif path.endswith("/categorias/produtos"):
+            self._send_json(200, self._page(query, self.state.total_categories, lambda object_id: category_row(object_id, self.state.seed)))
+        elif path.endswith("/canais-venda"):
+            self._send_json(200, self._page(query, self.state.total_channels, lambda object_id: channel_row(object_id, self.state.seed)))
+        elif re.search(r"/situacoes/modulos/\d+$", path):
+            self._send_json(200, {"data": status_rows()})
+        elif path.endswith("/produtos"):
+            self._send_json(200, self._page(query, self.state.total_products, lambda object_id: product_summary(object_id, self.state.seed)))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _page(self, query: Dict, total: int, summary) -> Dict:
+        page = int(query.get("pagina", ["1"])[0])
+        limit = int(query.get("limite", ["100"])[0])
+        start = (page - 1) * limit
+        ids = range(start + 1, min(start + limit, total) + 1)
+        return {"data": [summary(object_id) for object_id in ids]}
+
+class MockBlingServer:
+    def __init__(self, state: Optional[MockBlingState] = None, host: str = "127.0.0.1", port: int = 0):
+        self.state = state or MockBlingState()
+        self.httpd = ThreadingHTTPServer((host, port), MockBlingHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/Api/v3"
+
+    def __enter__(self) -> "MockBlingServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,119 @@
+"""
+Deterministic generator of Bling-shaped order and product payloads for the
+mock server. Each document is derived from (seed, id) only, so repeated
+detail requests for the same ID return the same JSON.
+"""
+from datetime import date, timedelta
+from typing import Dict
+import random
+
+WORDS = ("Cabo", "Tomada", "Disjuntor", "Lâmpada", "Fita", "Interruptor", "Conector", "Plugue", "Extensão", "Quadro")
+BRANDS = ("Tramontina", "Pial", "Siemens", "Philips", "Steck", "Margirius")
+STATUS_IDS = (6, 9, 12, 15, 24)
+CHANNEL_IDS = (0, 203536978, 204218540, 204507631)
+
+def _rng(seed: int, kind: str, object_id: int) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{object_id}")
+
+def _money(rng: random.Random, low: float, high: float) -> float:
+    return round(rng.uniform(low, high), 2)
+
+def build_order(order_id: int, seed: int = 0, start: date = date(2024, 1, 1), days: int = 31, total_products: int = 500) -> Dict:
+    rng = _rng(seed, "order", order_id)
+    order_date = start + timedelta(days=rng.randrange(days))
+
+    items = []
+    for item_index in range(rng.choice((1, 1, 1, 2, 2, 3, 5, 8))):
+        product_id = rng.randint(1, max(1, total_products))
+        quantity = rng.choice((1, 1, 2, 3, 5, 10))
+        unit_price = _money(rng, 2, 450)
+        items.append({
+            "id": order_id * 100 + item_index,
+            "codigo": f"P{product_id}",
+            "unidade": "UN",
+            "quantidade": quantity,
+            "desconto": _money(rng, 0, 5) if rng.random() < 0.2 else 0,
+            "valor": unit_price,
+            "aliquotaIPI": 0,
+            "descricao": f"{rng.choice(WORDS)} {rng.choice(BRANDS)} {product_id}",
+            "produto": {"id": product_id}
+        })
+
+    total_products_value = round(sum(item["valor"] * item["quantidade"] for item in items), 2)
+    shipping = _money(rng, 0, 60)
+    discount = _money(rng, 0, total_products_value * 0.1) if rng.random() < 0.3 else 0
+
+    return {
+        "data": {
+            "id": order_id,
+            "numero": 100000 + order_id,
+            "numeroLoja": f"LJ-{order_id:08d}",
+            "data": order_date.isoformat(),
+            "dataSaida": (order_date + timedelta(days=rng.randint(0, 3))).isoformat(),
+            "dataPrevista": (order_date + timedelta(days=rng.randint(3, 15))).isoformat(),
+            "totalProdutos": total_products_value,
+            "total": round(total_products_value + shipping - discount, 2),
+            "contato": {"id": rng.randint(1, 20000), "nome": f"Cliente {rng.randint(1, 20000)}", "tipoPessoa": rng.choice("FJ")},
+            "situacao": {"id": rng.choice(STATUS_IDS), "valor": 1},
+            "loja": {"id": rng.choice(CHANNEL_IDS)},
+            "desconto": {"valor": discount, "unidade": "REAL"},
+            "observacoes": "Entrega em horário comercial." * rng.randint(0, 4),
+            "itens": items,
+            "parcelas": [{"id": order_id * 10 + i, "dataVencimento": order_date.isoformat(), "valor": 0} for i in range(rng.randint(1, 3))],
+            "transporte": {"fretePorConta": 0, "frete": shipping, "volumes": [{"id": order_id, "servico": "SEDEX"}]},
+            "taxas": {"taxaComissao": _money(rng, 0, 30), "custoFrete": shipping, "valorBase": total_products_value}
+        }
+    }
+
+def build_product(product_id: int, seed: int = 0) -> Dict:
+    rng = _rng(seed, "product", product_id)
+    is_kit = rng.random() < 0.1
+    price = _money(rng, 2, 900)
+
+    product = {
+        "id": product_id,
+        "nome": f"{rng.choice(WORDS)} {rng.choice(BRANDS)} {product_id}",
+        "codigo": f"P{product_id}",
+        "preco": price,
+        "tipo": "P",
+        "situacao": rng.choice("AAAAI"),
+        "formato": "E" if is_kit else "S",
+        "marca": rng.choice(BRANDS),
+        "unidade": "UN",
+        "pesoLiquido": round(rng.uniform(0.05, 12), 3),
+        "categoria": {"id": rng.randint(1, 40)},
+        "estoque": {"minimo": rng.randint(0, 10), "maximo": rng.randint(20, 500)},
+        "fornecedor": {
+            "contato": {"id": rng.randint(1, 300), "nome": f"Fornecedor {rng.randint(1, 300)}"},
+            "codigo": f"F{product_id}",
+            "precoCusto": round(price * 0.6, 2),
+            "precoCompra": round(price * 0.55, 2)
+        }
+    }
+
+    if is_kit:
+        product["estrutura"] = {
+            "tipoEstoque": "V",
+            "componentes": [{"produto": {"id": rng.randint(1, 5000)}, "quantidade": rng.randint(1, 4)} for _ in range(rng.randint(2, 4))]
+        }
+
+    return {"data": product}
+
+def order_summary(order_id: int, seed: int = 0, total_products: int = 500) -> Dict:
+    data = build_order(order_id, seed=seed, total_products=total_products)["data"]
+    return {key: data[key] for key in ("id", "numero", "numeroLoja", "data", "dataSaida", "dataPrevista", "total", "contato", "situacao", "loja")}
+
+def product_summary(product_id: int, seed: int = 0) -> Dict:
+    data = build_product(product_id, seed=seed)["data"]
+    return {key: data[key] for key in ("id", "nome", "codigo", "preco", "tipo", "situacao", "formato")}
+
+def category_row(category_id: int, seed: int = 0) -> Dict:
+    rng = _rng(seed, "category", category_id)
+    return {"id": category_id, "descricao": f"{rng.choice(WORDS)} {category_id}", "categoriaPai": {"id": rng.randint(0, category_id - 1) if category_id > 1 else 0}}
+
+def channel_row(channel_id: int, seed: int = 0) -> Dict:
+    rng = _rng(seed, "channel", channel_id)
+    return {"id": channel_id, "descricao": f"Loja {rng.choice(BRANDS)} {channel_id}", "tipo": rng.choice(("Api", "Shopee", "MercadoLivre")), "situacao": 1}
+
+def status_rows() -> list:
+    return [{"id": status_id, "nome": f"Situação {status_id}", "idHerdado": 0, "cor": "#000000"} for status_id in STATUS_IDS]
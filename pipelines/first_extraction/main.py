@@ -1,27 +1,97 @@
+import argparse
 import subprocess
 import sys
 import os
+from datetime import date
 from google.cloud import storage
 
 ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if ROOT_PATH not in sys.path:
     sys.path.insert(0, ROOT_PATH)
 
+from src.extraction.common import config
 from src.extraction.common.bling_api_client import BlingClient
-from src.extraction import sales, sales_channels, products, product_categories, sales_status
-from src.extraction.common.secret_manager import SecretManagerStateManager
+from src.extraction.common.dag import DagRunner, Stage
+from src.extraction import sales, products
+from src.extraction.common.engine import run_extraction
+from src.extraction.entities import DIMENSIONS
+from src.extraction.common.gcs_lock import GcsLock
+from src.extraction.common.state import build_state_store
+from src.extraction.common.sharding import resolve_shard, shard_run_id, split_date_range, verify_shards
 
-def extraction(project_id: str, bucket_name: str, secret_id: str):
-    state_manager = SecretManagerStateManager(project_id=project_id, secret_id=secret_id)
+TOKEN_LOCK_BLOB = "state/locks/bling_token.lock"
+
+def extraction(
+    project_id: str,
+    bucket_name: str,
+    secret_id: str,
+    dataInicial: str = "2024-01-01",
+    dataFinal: str = "2024-08-17",
+    granularity: str = None,
+    shard: str = None
+):
     cloud_storage_client = storage.Client(project=project_id)
     bucket = cloud_storage_client.bucket(bucket_name)
-    client = BlingClient(state_manager=state_manager)
+    state_manager = build_state_store(project_id=project_id, secret_id=secret_id, storage_bucket=bucket)
+
+    task_index, task_count = resolve_shard(shard)
+    token_lock = GcsLock(bucket, TOKEN_LOCK_BLOB) if task_count > 1 else None
+    client = BlingClient(state_manager=state_manager, token_lock=token_lock)
+
+    stages = []
+
+    if task_index == 0:
+        stages += [
+            Stage(spec.name, lambda spec=spec: run_extraction(client=client, spec=spec, storage_bucket=bucket))
+            for spec in DIMENSIONS
+        ]
+        stages.append(Stage("products", lambda: products.products_extraction(client=client, storage_bucket=bucket)))
+
+    if granularity:
+        run_sales = lambda: sales.sharded_sales_extraction(
+            client=client,
+            start=date.fromisoformat(dataInicial),
+            end=date.fromisoformat(dataFinal),
+            storage_bucket=bucket,
+            granularity=granularity,
+            task_index=task_index,
+            task_count=task_count
+        )
+    elif task_index == 0:
+        run_sales = lambda: sales.sales_extraction(client=client, dataInicial=dataInicial, dataFinal=dataFinal, storage_bucket=bucket)
+    else:
+        # Without --granularity sales is not split, so like the other unsharded
+        # entities it only runs on task 0 instead of once per task.
+        print(f"Task {task_index}/{task_count}: vendas sem --granularity são extraídas apenas pela task 0.", file=sys.stderr)
+        run_sales = None
+
+    # Detail stages share the adaptive concurrency controller and the detail
+    # worker budget, so sales waits for products; the dimensions overlap both.
+    if run_sales is not None:
+        stages.append(Stage("sales", run_sales, depends_on=("products",) if task_index == 0 else ()))
+
+    DagRunner(stages, max_workers=config.BLING_DAG_MAX_WORKERS).run()
+
+    client.token_manager.flush()
+    state_manager.flush()
 
-    product_categories.extract_product_categories(client=client, storage_bucket=bucket)
-    sales_channels.extract_sales_channels(client=client, storage_bucket=bucket)
-    sales_status.extract_sales_status(client=client, storage_bucket=bucket)
-    products.products_extraction(client=client, storage_bucket=bucket)    
-    sales.sales_extraction(client=client, dataInicial="2024-01-01", dataFinal="2024-08-17", storage_bucket=bucket)
+    return task_index, task_count
+
+def verify_extraction(project_id: str, bucket_name: str, dataInicial: str, dataFinal: str, granularity: str) -> bool:
+    bucket = storage.Client(project=project_id).bucket(bucket_name)
+    start, end = date.fromisoformat(dataInicial), date.fromisoformat(dataFinal)
+
+    missing = verify_shards(bucket, "sales", shard_run_id(start, end, granularity), split_date_range(start, end, granularity))
+    return not missing
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extração completa do Bling.")
+    parser.add_argument("--start", default="2024-01-01", help="dataInicial das vendas (YYYY-MM-DD)")
+    parser.add_argument("--end", default="2024-08-17", help="dataFinal das vendas (YYYY-MM-DD)")
+    parser.add_argument("--granularity", choices=["day", "week", "month"], help="Divide as vendas em shards por período")
+    parser.add_argument("--shard", help="Shard local no formato i/N (padrão: CLOUD_RUN_TASK_INDEX/CLOUD_RUN_TASK_COUNT)")
+    parser.add_argument("--verify", action="store_true", help="Apenas verifica se todos os shards foram concluídos e roda o dbt")
+    return parser.parse_args()
 
 def run_transformation(dbt_project_path: str):
     command = ["dbt", "run"]
@@ -62,11 +132,36 @@ if __name__ == "__main__":
         print("ERRO: As variáveis de ambiente GCP_PROJECT_ID, GCS_BUCKET_NAME e SECRET_ID_BLING devem ser definidas.", file=sys.stderr)
         sys.exit(1)
         
+    args = parse_args()
+        
     try:
+        if args.verify:
+            if not args.granularity:
+                print("ERRO: --verify exige --granularity.", file=sys.stderr)
+                sys.exit(1)
+
+            if not verify_extraction(PROJECT_ID, BUCKET_NAME, args.start, args.end, args.granularity):
+                print("Extração incompleta: há shards pendentes.", file=sys.stderr)
+                sys.exit(1)
+
+            run_transformation(DBT_PROJECT_PATH)
+            print("Pipeline de ETL concluída com sucesso!")
+            sys.exit(0)
+
         print("Pipeline de ETL iniciada.")
-        extraction(PROJECT_ID, BUCKET_NAME, SECRET_ID)
-        run_transformation(DBT_PROJECT_PATH)
-        print("Pipeline de ETL concluída com sucesso!")
+        task_index, task_count = extraction(
+            PROJECT_ID, BUCKET_NAME, SECRET_ID,
+            dataInicial=args.start,
+            dataFinal=args.end,
+            granularity=args.granularity,
+            shard=args.shard
+        )
+
+        if task_count > 1:
+            print(f"Task {task_index}/{task_count} concluída. Rode com --verify para validar os shards e transformar.")
+        else:
+            run_transformation(DBT_PROJECT_PATH)
+            print("Pipeline de ETL concluída com sucesso!")
     except Exception as e:
         print(f"Pipeline falhou com o erro: {e}", file=sys.stderr)
         sys.exit(1)
\ No newline at end of file
@@ -10,14 +10,21 @@ if ROOT_PATH not in sys.path:
 from google.cloud import storage
 from src.extraction.common.bling_api_client import BlingClient
 from src.extraction import sales
-from src.extraction.common.secret_manager import SecretManagerStateManager
+from src.extraction.common import config
+from src.extraction.common.state import build_state_store
 
 def run_weekly_extraction(project_id: str, bucket_name: str, secret_id: str):
-    state_manager = SecretManagerStateManager(project_id=project_id, secret_id=secret_id)
     cloud_storage_client = storage.Client(project=project_id)
     bucket = cloud_storage_client.bucket(bucket_name)
+    state_manager = build_state_store(project_id=project_id, secret_id=secret_id, storage_bucket=bucket)
     client = BlingClient(state_manager=state_manager)
 
+    if config.BLING_SALES_EXTRACTION_MODE == "incremental":
+        sales.incremental_sales_extraction(client=client, storage_bucket=bucket)
+        client.token_manager.flush()
+        state_manager.flush()
+        return
+
     dataFinal = datetime.today() - timedelta(days=1)
     dataInicial = dataFinal - timedelta(days=6)
     
@@ -30,6 +37,9 @@ def run_weekly_extraction(project_id: str, bucket_name: str, secret_id: str):
         storage_bucket=bucket
     )
 
+    client.token_manager.flush()
+    state_manager.flush()
+
 def run_transformation(dbt_project_path: str):
     command = ["dbt", "run", "--select", "tag:semanal", "--target", "prod"]
 
@@ -0,0 +1,187 @@
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from threading import Condition
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from . import config
+from .rate_limiter import TokenBucketRateLimiter
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD controller for the number of concurrent Bling requests and the
+    request rate of the shared token bucket.
+
+    Every response reports its latency and status. After `window` healthy
+    responses (no 429/5xx and p95 latency within `target_p95_ms`) the
+    concurrency limit grows by one and the rate by `rate_step`. A 429 or 5xx
+    multiplies both by `decrease_factor` at once, at most once per window so
+    the requests already in flight do not collapse the limit. A p95 above
+    target only takes one slot away. Every change goes to `timeline`.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucketRateLimiter,
+        min_concurrency: int = 1,
+        max_concurrency: int = 12,
+        initial_concurrency: int = 3,
+        min_rate: float = 1.0,
+        max_rate: float = 10.0,
+        rate_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        target_p95_ms: float = 1500.0,
+        window: int = 20
+    ):
+        if not 1 <= min_concurrency <= max_concurrency or not 0 < min_rate <= max_rate or not 0 < decrease_factor < 1:
+            raise ValueError("Parâmetros inválidos para o controle adaptativo de concorrência.")
+
+        self.rate_limiter = rate_limiter
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.decrease_factor = decrease_factor
+        self.target_p95_ms = target_p95_ms
+        self.window = window
+
+        self.limit = min(max(initial_concurrency, min_concurrency), max_concurrency)
+        self.rate = min(max(rate_limiter.rate, min_rate), max_rate)
+        self.rate_limiter.set_rate(self.rate)
+
+        self.in_flight = 0
+        self._condition = Condition()
+        self._latencies: deque = deque(maxlen=window)
+        self._healthy = 0
+        self._since_decrease = window
+        self._run_start = time.monotonic()
+
+        self.increases = 0
+        self.decreases = 0
+        self.timeline: List[Dict[str, Any]] = []
+
+    def begin_run(self):
+        with self._condition:
+            self._run_start = time.monotonic()
+            self.increases = 0
+            self.decreases = 0
+            self.timeline = []
+            self._record_change("inicio")
+
+    def _try_acquire_slot(self) -> bool:
+        if self.in_flight < self.limit:
+            self.in_flight += 1
+            return True
+        return False
+
+    def _release_slot(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        with self._condition:
+            self._condition.wait_for(self._try_acquire_slot)
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        while True:
+            with self._condition:
+                if self._try_acquire_slot():
+                    break
+            await asyncio.sleep(0.01)
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    def _p95_ms(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+
+    def _record_change(self, reason: str):
+        p95 = self._p95_ms()
+        self.timeline.append({
+            "elapsed_seconds": round(time.monotonic() - self._run_start, 2),
+            "concurrency": self.limit,
+            "rate": round(self.rate, 2),
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "reason": reason
+        })
+
+    def _apply(self, limit: int, rate: float, reason: str) -> bool:
+        limit = min(max(limit, self.min_concurrency), self.max_concurrency)
+        rate = min(max(rate, self.min_rate), self.max_rate)
+        if limit == self.limit and rate == self.rate:
+            return False
+
+        self.limit, self.rate = limit, rate
+        self.rate_limiter.set_rate(rate)
+        self._condition.notify_all()
+        self._record_change(reason)
+        logger.info(f"Concorrência adaptativa: {limit} requisições simultâneas, {rate:.2f} req/s ({reason})")
+        return True
+
+    def record(self, latency: float, status: Optional[int]):
+        """`status` is None when the request failed without a response (connection error, timeout)."""
+        with self._condition:
+            self._latencies.append(latency)
+            self._since_decrease += 1
+
+            if status is None or status == 429 or status >= 500:
+                self._healthy = 0
+                if self._since_decrease >= self.window:
+                    self._since_decrease = 0
+                    reason = f"HTTP {status}" if status is not None else "erro de conexão"
+                    self.decreases += self._apply(int(self.limit * self.decrease_factor), self.rate * self.decrease_factor, reason)
+                return
+
+            self._healthy += 1
+            if self._healthy < self.window:
+                return
+            self._healthy = 0
+
+            if self._p95_ms() <= self.target_p95_ms:
+                self.increases += self._apply(self.limit + 1, self.rate + self.rate_step, "saudável")
+            else:
+                self.decreases += self._apply(self.limit - 1, self.rate, "latência p95 acima do alvo")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "final_concurrency": self.limit,
+                "final_rate": round(self.rate, 2),
+                "peak_concurrency": max((point["concurrency"] for point in self.timeline), default=self.limit),
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "timeline": list(self.timeline)
+            }
+
+def build_controller(rate_limiter: TokenBucketRateLimiter) -> Optional[AdaptiveConcurrencyController]:
+    if not config.BLING_ADAPTIVE_CONCURRENCY_ENABLED:
+        return None
+
+    return AdaptiveConcurrencyController(
+        rate_limiter=rate_limiter,
+        min_concurrency=config.BLING_ADAPTIVE_MIN_CONCURRENCY,
+        max_concurrency=config.BLING_ADAPTIVE_MAX_CONCURRENCY,
+        initial_concurrency=config.BLING_ADAPTIVE_INITIAL_CONCURRENCY,
+        min_rate=config.BLING_ADAPTIVE_MIN_RATE,
+        max_rate=config.BLING_ADAPTIVE_MAX_RATE,
+        rate_step=config.BLING_ADAPTIVE_RATE_STEP,
+        decrease_factor=config.BLING_ADAPTIVE_DECREASE_FACTOR,
+        target_p95_ms=config.BLING_ADAPTIVE_TARGET_P95_MS,
+        window=config.BLING_ADAPTIVE_WINDOW
+    )
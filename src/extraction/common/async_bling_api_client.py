@@ -0,0 +1,130 @@
+from contextlib import asynccontextmanager, nullcontext
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+
+from . import config
+from .bling_api_client import BlingClient
+from .codec import loads
+from .metrics import METRICS
+from .rate_limiter import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+class AsyncBlingClient:
+    """
+    Async counterpart of BlingClient for the detail-fetch path.
+
+    Authentication and the rate limiter are shared with the wrapped BlingClient,
+    so both engines draw from the same quota. Requests go through a bounded
+    HTTP/1.1 keep-alive connection pool.
+    """
+
+    SERVER_ERROR_RETRIES = 3
+
+    def __init__(self, client: BlingClient, max_connections: int = 8, timeout: float = 60.0):
+        self.client = client
+        self.rate_limiter = client.rate_limiter
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncBlingClient":
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections,
+            keepalive_timeout=30
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._auth_lock = asyncio.Lock()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    async def _refresh_access_token(self, stale_token: Optional[str]):
+        async with self._auth_lock:
+            if self.client.access_token == stale_token:
+                logger.warning("Access Token expirado. Tentando renovar.")
+                await asyncio.to_thread(self.client.token_manager.invalidate, stale_token)
+
+    @asynccontextmanager
+    async def _timed_get(self, url: str, headers: Dict, params: Optional[Dict]):
+        controller = self.client.concurrency_controller
+
+        async with controller.slot_async() if controller is not None else nullcontext():
+            start = time.monotonic()
+            try:
+                response = await self._session.get(url, headers=headers, params=params)
+                body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                latency = time.monotonic() - start
+                if controller is not None:
+                    controller.record(latency, None)
+                METRICS.observe_request(url[len(self.client.BASE_URL):], "error", latency)
+                raise
+            latency = time.monotonic() - start
+
+            try:
+                if controller is not None:
+                    controller.record(latency, response.status)
+                METRICS.observe_request(url[len(self.client.BASE_URL):], response.status, latency, len(body))
+
+                yield response
+            finally:
+                response.release()
+
+    async def _send(self, url: str, params: Optional[Dict], allow_unauthorized: bool, decode: Callable[[bytes], Any] = loads) -> Any:
+        server_errors = 0
+        throttles = 0
+
+        while True:
+            wait_start = time.monotonic()
+            await self.rate_limiter.acquire_async()
+            METRICS.add_rate_limit_wait(time.monotonic() - wait_start)
+
+            token = self.client.access_token
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async with self._timed_get(url, headers, params) as response:
+                if response.status == 429 and throttles < config.BLING_MAX_THROTTLE_RETRIES:
+                    throttles += 1
+                    METRICS.count_retry(url[len(self.client.BASE_URL):], "429")
+                    self.rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
+                    continue
+
+                if response.status == 401 and allow_unauthorized:
+                    return response.status, token, None
+
+                if response.status < 500 or server_errors >= self.SERVER_ERROR_RETRIES:
+                    response.raise_for_status()
+                    body = await response.read()
+                    return response.status, token, decode(body) if body.strip() else None
+
+            server_errors += 1
+            METRICS.count_retry(url[len(self.client.BASE_URL):], "5xx")
+            await asyncio.sleep(2 ** (server_errors - 1))
+
+    async def get(self, endpoint: str, params: Dict = None, decode: Callable[[bytes], Any] = loads) -> Any:
+        if not self.client.access_token:
+            await self._refresh_access_token(None)
+
+        url = f"{self.client.BASE_URL}/{endpoint}"
+        query = {key: str(value) for key, value in params.items()} if params else None
+
+        status, token, payload = await self._send(url, query, allow_unauthorized=True, decode=decode)
+
+        if status == 401:
+            METRICS.count_retry(endpoint, "401")
+            await self._refresh_access_token(token)
+            status, token, payload = await self._send(url, query, allow_unauthorized=False, decode=decode)
+
+        return payload
@@ -0,0 +1,154 @@
+from typing import Any, Callable, Dict, List
+import asyncio
+import logging
+
+import aiohttp
+
+from .async_bling_api_client import AsyncBlingClient
+from .bling_api_client import BlingClient
+from .codec import loads
+from .concurrency import ProgressTracker, ResultAggregator, worker_count
+
+logger = logging.getLogger(__name__)
+
+async def process_pre_batched_async(
+    batched_dict: Dict[str, List[str]],
+    endpoint: str,
+    client: BlingClient,
+    concurrency: int = 8,
+    max_connections: int = None,
+    show_progress: bool = True,
+    sink=None,
+    retry_stage=None,
+    decode: Callable[[bytes], Any] = loads
+) -> ResultAggregator:
+
+    total_batches = len(batched_dict)
+    total_ids = sum(len(batch) for batch in batched_dict.values())
+    concurrency = worker_count(client, concurrency)
+
+    if show_progress:
+        progress_tracker = ProgressTracker(total_batches, total_ids)
+        print("\n" + "="*100)
+        print(f"Iniciando extração assíncrona em lotes ({concurrency} requisições simultâneas)")
+        print("="*100)
+        print(f"📊 Total de lotes: {total_batches}")
+        print(f"📊 Total de IDs: {total_ids:,}")
+        print("="*100)
+        print()
+
+    results = ResultAggregator(keep_records=sink is None)
+    in_progress = {batch_name: {'success': [], 'success_count': 0, 'failed': []} for batch_name in batched_dict}
+    remaining = {batch_name: len(id_batch) for batch_name, id_batch in batched_dict.items()}
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch_name, id_batch in batched_dict.items():
+        for object_id in id_batch:
+            queue.put_nowait((batch_name, object_id))
+
+    # Sink writes (e.g. a CheckpointSink upload per batch) block, so they run in
+    # a thread, one at a time, fed through a small queue that applies backpressure.
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+
+    async def writer():
+        error = None
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                break
+            if error is None:
+                try:
+                    await asyncio.to_thread(sink.write_batch, *item)
+                except Exception as e:
+                    error = e
+        if error is not None:
+            raise error
+
+    async def complete_batch(batch_name: str):
+        batch = in_progress.pop(batch_name)
+        success_count = batch['success_count']
+        failed_count = len(batch['failed'])
+
+        if retry_stage is not None:
+            retry_stage.record_batch(success_count, failed_count)
+            retry_stage.submit_many(batch['failed'])
+
+        if sink is not None:
+            await write_queue.put((batch_name, batch['success'], batch['failed']))
+            results.add_batch(success_count, batch['failed'])
+        else:
+            results.add_batch(success_count, batch['failed'], batch['success'])
+
+        if show_progress:
+            progress_tracker.update_batch(success_count, failed_count, batch_name)
+        else:
+            logger.info(f"Batch {batch_name} completed: {success_count} success, {failed_count} failed")
+
+    async def worker(async_client: AsyncBlingClient):
+        while True:
+            try:
+                batch_name, object_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                payload = await async_client.get(endpoint=f"{endpoint}/{object_id}", decode=decode)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Request failed for ID {object_id}: {str(e)[:100]}...")
+                in_progress[batch_name]['failed'].append(object_id)
+            except Exception as e:
+                logger.error(f"Unexpected error with ID {object_id}: {e}")
+                in_progress[batch_name]['failed'].append(object_id)
+            else:
+                in_progress[batch_name]['success'].append(payload)
+                in_progress[batch_name]['success_count'] += 1
+
+            remaining[batch_name] -= 1
+            if remaining[batch_name] == 0:
+                await complete_batch(batch_name)
+
+    writer_task = asyncio.create_task(writer()) if sink is not None else None
+
+    try:
+        for batch_name, pending in list(remaining.items()):
+            if pending == 0:
+                await complete_batch(batch_name)
+
+        async with AsyncBlingClient(client, max_connections=max_connections or concurrency) as async_client:
+            await asyncio.gather(*(worker(async_client) for _ in range(concurrency)))
+    finally:
+        if writer_task is not None:
+            await write_queue.put(None)
+            await writer_task
+
+    if show_progress:
+        progress_tracker.final_report()
+
+    logger.info(f"Rate limiter: {client.rate_limiter.snapshot()}")
+
+    return results
+
+def run_pre_batched_async(
+    batched_dict: Dict[str, List[str]],
+    endpoint: str,
+    client: BlingClient,
+    concurrency: int = 8,
+    max_connections: int = None,
+    show_progress: bool = True,
+    sink=None,
+    retry_stage=None,
+    decode: Callable[[bytes], Any] = loads
+) -> ResultAggregator:
+    return asyncio.run(
+        process_pre_batched_async(
+            batched_dict=batched_dict,
+            endpoint=endpoint,
+            client=client,
+            concurrency=concurrency,
+            max_connections=max_connections,
+            show_progress=show_progress,
+            sink=sink,
+            retry_stage=retry_stage,
+            decode=decode
+        )
+    )
@@ -2,40 +2,74 @@ from typing import Dict
 import requests
 import base64
 
-from .secret_manager import SecretManagerStateManager
+from .state import StateStore
 
 import base64
 import logging
+import time
+from contextlib import nullcontext
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from typing import Dict
+from typing import Dict, Optional
 
 from . import config
+from .adaptive_concurrency import AdaptiveConcurrencyController, build_controller
+from .rate_limiter import TokenBucketRateLimiter, parse_retry_after
+from .gcs_lock import GcsLock
+from .metrics import METRICS
+from .token_manager import REFRESH_TOKEN_KEY, SHARED_ACCESS_TOKEN_KEY, TokenManager
 
 logger = logging.getLogger(__name__)
 
 class BlingClient:
     BASE_URL = "https://api.bling.com.br/Api/v3"
+    REFRESH_TOKEN_KEY = REFRESH_TOKEN_KEY
+    SHARED_ACCESS_TOKEN_KEY = SHARED_ACCESS_TOKEN_KEY
+    SERVER_ERROR_RETRIES = 3
+    SERVER_ERROR_BACKOFF = 1.0
 
-    def __init__(self, state_manager: SecretManagerStateManager):
+    def __init__(
+        self,
+        state_manager: StateStore,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        token_lock: Optional[GcsLock] = None,
+        concurrency_controller: Optional[AdaptiveConcurrencyController] = None
+    ):
         self.state_manager = state_manager
-        
-        self._access_token = None
-        self._refresh_token = self.state_manager.get_state("ELETROFOR_BLING_REFRESH_TOKEN")
+        self.token_lock = token_lock
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(
+            rate=config.BLING_RATE_LIMIT_PER_SECOND,
+            burst=config.BLING_RATE_LIMIT_BURST,
+            daily_quota=config.BLING_DAILY_QUOTA
+        )
+        self.concurrency_controller = concurrency_controller or build_controller(self.rate_limiter)
 
         self.session = self._create_resilient_session()
+        self.token_manager = TokenManager(
+            state_manager=state_manager,
+            request_token=self._request_token,
+            token_lock=token_lock,
+            refresh_margin=config.BLING_TOKEN_REFRESH_MARGIN_SECONDS
+        )
         self.authenticate()
 
     def _create_resilient_session(self) -> requests.Session:
+        # Server errors and connection failures are retried in `_send`, so every
+        # attempt goes through the rate limiter, the concurrency controller and
+        # the metrics instead of being hidden inside urllib3.
+        # Mounted on BASE_URL, so a client pointed elsewhere (e.g. the benchmark
+        # mock over plain http) goes through the same adapter.
         session = requests.Session()
-        retry_strategy = Retry(
-            total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(max_retries=Retry(total=0, raise_on_status=False))
         session.mount("https://", adapter)
+        session.mount(self.BASE_URL, adapter)
         return session
 
+    @property
+    def access_token(self) -> Optional[str]:
+        return self.token_manager.access_token
+
     def _get_auth_headers(self) -> Dict[str, str]:
         credentials = f"{config.BLING_CLIENT_ID}:{config.BLING_CLIENT_SECRET}"
         b64_creds = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
@@ -47,53 +81,90 @@ class BlingClient:
             }
 
     def authenticate(self):
-        if not self._refresh_token:
-            raise ValueError("Refresh Token não encontrado. Gere um novo com o Auth Code.")
-        
         try:
-            self._perform_token_refresh()
+            self.token_manager.get_token()
         except requests.exceptions.HTTPError as e:
             logger.error(f"Falha ao renovar token. Verifique seu REFRESH_TOKEN. Erro: {e}")
             raise
 
-    def _perform_token_refresh(self):
+    def _request_token(self, refresh_token: str) -> Dict:
         url = f"{self.BASE_URL}/oauth/token"
         data = {
             "grant_type": "refresh_token",
-            "refresh_token": self._refresh_token,
+            "refresh_token": refresh_token,
         }
         headers = self._get_auth_headers()
         
+        self.rate_limiter.acquire()
         response = self.session.post(url, data=data, headers=headers)
         response.raise_for_status()
         
-        payload = response.json()
-        self._access_token = payload["access_token"]
-        
-        self._refresh_token = payload["refresh_token"]
-        self.state_manager.set_state("ELETROFOR_BLING_REFRESH_TOKEN", self._refresh_token)
-        
-        logger.info("Access Token do Bling renovado com sucesso!")
+        return response.json()
 
-    def get(self, endpoint: str, params: Dict = None) -> requests.Response:
-        if not self._access_token:
-            self.authenticate()
+    def _timed_get(self, url: str, headers: Dict, params: Dict = None) -> requests.Response:
+        controller = self.concurrency_controller
+        status, response_bytes = "error", 0
+
+        with controller.slot() if controller is not None else nullcontext():
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, params=params)
+                status, response_bytes = response.status_code, len(response.content)
+                return response
+            finally:
+                latency = time.monotonic() - start
+                if controller is not None:
+                    controller.record(latency, status if status != "error" else None)
+                METRICS.observe_request(url[len(self.BASE_URL):], status, latency, response_bytes)
+
+    def _send(self, url: str, token: str, params: Dict = None) -> requests.Response:
+        endpoint = url[len(self.BASE_URL):]
+        throttles = 0
+        server_errors = 0
+
+        while True:
+            wait_start = time.monotonic()
+            self.rate_limiter.acquire()
+            METRICS.add_rate_limit_wait(time.monotonic() - wait_start)
+
+            headers = {"Authorization": f"Bearer {token}"}
+            try:
+                response = self._timed_get(url, headers, params)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if server_errors >= self.SERVER_ERROR_RETRIES:
+                    raise
+                METRICS.count_retry(endpoint, "error")
+            else:
+                if response.status_code == 429 and throttles < config.BLING_MAX_THROTTLE_RETRIES:
+                    throttles += 1
+                    METRICS.count_retry(endpoint, "429")
+                    self.rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
+                    continue
 
+                if response.status_code < 500 or server_errors >= self.SERVER_ERROR_RETRIES:
+                    return response
+
+                METRICS.count_retry(endpoint, "5xx")
+
+            server_errors += 1
+            time.sleep(self.SERVER_ERROR_BACKOFF * 2 ** (server_errors - 1))
+
+    def get(self, endpoint: str, params: Dict = None) -> requests.Response:
         url = f"{self.BASE_URL}/{endpoint}"
-        headers = {"Authorization": f"Bearer {self._access_token}"}
+        token = self.token_manager.get_token()
         
         try:
-            response = self.session.get(url, headers=headers, params=params)
+            response = self._send(url, token, params=params)
             response.raise_for_status()
             return response
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
                 logger.warning("Access Token expirado. Tentando renovar.")
-                self.authenticate()
+                METRICS.count_retry(endpoint, "401")
+                self.token_manager.invalidate(token)
 
-                headers["Authorization"] = f"Bearer {self._access_token}"
-                response = self.session.get(url, headers=headers, params=params)
+                response = self._send(url, self.token_manager.get_token(), params=params)
                 response.raise_for_status()
                 return response
             else:
-                raise
\ No newline at end of file
+                raise
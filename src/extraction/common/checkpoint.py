@@ -0,0 +1,232 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+
+from google.cloud.storage import Bucket
+
+from . import config
+from .codec import dumps_lines
+from .models import record_id
+from .compression import compress_bytes, compressed_blob_name, content_type_for, normalize_compression
+
+logger = logging.getLogger(__name__)
+
+GCS_COMPOSE_MAX_SOURCES = 32
+
+def run_key(entity: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps({"entity": entity, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def compose_blobs(storage_bucket: Bucket, source_names: List[str], destination_blob_name: str, content_type: str, scratch_prefix: str):
+    """
+    Concatenates `source_names` into `destination_blob_name` server-side.
+
+    GCS composes at most 32 objects per call, so larger inputs are composed in
+    rounds through intermediate objects under `scratch_prefix`.
+    """
+    sources = [storage_bucket.blob(name) for name in source_names]
+    intermediates = []
+    level = 0
+
+    while len(sources) > GCS_COMPOSE_MAX_SOURCES:
+        next_sources = []
+        for group_index in range(0, len(sources), GCS_COMPOSE_MAX_SOURCES):
+            group = sources[group_index:group_index + GCS_COMPOSE_MAX_SOURCES]
+            intermediate = storage_bucket.blob(f"{scratch_prefix}/compose-{level}-{group_index // GCS_COMPOSE_MAX_SOURCES:06d}")
+            intermediate.content_type = content_type
+            intermediate.compose(group)
+            next_sources.append(intermediate)
+        intermediates.extend(next_sources)
+        sources = next_sources
+        level += 1
+
+    destination = storage_bucket.blob(destination_blob_name)
+    destination.content_type = content_type
+    destination.compose(sources)
+
+    for intermediate in intermediates:
+        intermediate.delete()
+
+class CheckpointSink:
+    """
+    Sink that persists every completed batch as its own part object plus a small
+    manifest entry (IDs extracted and IDs that failed).
+
+    A run is identified by the entity and its extraction params, so a restarted
+    run with the same params finds the previous parts, skips IDs that were
+    already extracted (`should_fetch`) and only fetches the rest. On `close`
+    the final NDJSON is assembled by composing the parts server-side, without
+    re-serializing records, and the checkpoint is removed. An aborted run keeps
+    its checkpoint for the next attempt; a checkpoint whose last batch is older
+    than `max_age_hours` is discarded instead of resumed, since its records
+    would be stale by now. With `compression` each part is
+    compressed on its own, so the composed object is a multi-member gzip or
+    multi-frame zstd stream.
+    """
+
+    CONTENT_TYPE = "application/x-ndjson"
+    LOOSE_RECORDS_PART_SIZE = 100
+
+    def __init__(
+        self,
+        storage_bucket: Bucket,
+        entity: str,
+        params: Dict[str, Any],
+        destination_blob_name: str,
+        separators: Optional[Tuple[str, str]] = (',', ':'),
+        compression: str = None,
+        max_age_hours: float = None
+    ):
+        self.storage_bucket = storage_bucket
+        self.max_age_hours = config.BLING_CHECKPOINT_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        self.compression = normalize_compression(config.BLING_NDJSON_COMPRESSION if compression is None else compression)
+        self.destination_blob_name = compressed_blob_name(destination_blob_name, self.compression)
+        self.content_type = content_type_for(self.compression, self.CONTENT_TYPE)
+        self.separators = separators
+        self.run_key = run_key(entity, params)
+        self.prefix = f"{config.BLING_CHECKPOINT_PREFIX}/{entity}/{self.run_key}"
+
+        self._parts: List[str] = []
+        self._done_ids = set()
+        self._failed_ids = set()
+        self._loose_records: List[Dict[str, Any]] = []
+        self._closed = False
+
+        self.records_written = 0
+        self.resumed_records = 0
+        self._load_manifest()
+
+    def _load_manifest(self):
+        entries = sorted(
+            self.storage_bucket.list_blobs(prefix=f"{self.prefix}/manifest/"),
+            key=lambda blob: blob.name
+        )
+
+        manifest = [json.loads(blob.download_as_bytes()) for blob in entries]
+
+        if manifest and self.max_age_hours > 0:
+            last_batch = max(datetime.fromisoformat(entry["completed_at"]) for entry in manifest)
+            age_hours = (datetime.now(timezone.utc) - last_batch).total_seconds() / 3600
+
+            if age_hours > self.max_age_hours:
+                logger.warning(
+                    f"Checkpoint {self.run_key} expirado: último lote há {age_hours:.1f}h "
+                    f"(máximo {self.max_age_hours:g}h). Descartando e extraindo do zero."
+                )
+                self._clear()
+                return
+
+        for entry in manifest:
+            self._parts.append(entry["part"])
+            self._done_ids.update(str(object_id) for object_id in entry["ids"])
+            self._failed_ids.update(str(object_id) for object_id in entry["failed"])
+
+        self._failed_ids -= self._done_ids
+        self.resumed_records = len(self._done_ids)
+        self.records_written = self.resumed_records
+
+        if entries:
+            logger.info(
+                f"Checkpoint {self.run_key} encontrado: {len(self._parts)} lotes e {self.resumed_records} registros "
+                f"já extraídos, {len(self._failed_ids)} IDs com falha pendentes"
+            )
+
+    def __enter__(self) -> "CheckpointSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._closed:
+            return
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def should_fetch(self, summary_row: Dict[str, Any]) -> bool:
+        return str(summary_row['id']) not in self._done_ids
+
+    def _serialize(self, records: List[Dict[str, Any]]) -> bytes:
+        return compress_bytes(dumps_lines(records, self.separators), self.compression)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        sequence = len(self._parts)
+        part_name = f"{self.prefix}/parts/{sequence:06d}.ndjson"
+        ids = [record_id(record) for record in records]
+
+        if records:
+            self.storage_bucket.blob(part_name).upload_from_string(self._serialize(records), content_type=self.content_type)
+
+        entry = {
+            "batch_name": str(batch_name),
+            "part": part_name if records else None,
+            "ids": ids,
+            "failed": list(failed_ids),
+            "completed_at": datetime.now(timezone.utc).isoformat()
+        }
+        self.storage_bucket.blob(f"{self.prefix}/manifest/{sequence:06d}.json").upload_from_string(
+            json.dumps(entry, ensure_ascii=False, default=str), content_type="application/json"
+        )
+
+        self._parts.append(entry["part"])
+        self._done_ids.update(str(object_id) for object_id in ids)
+        self._failed_ids.update(str(object_id) for object_id in failed_ids)
+        self._failed_ids -= self._done_ids
+        self.records_written += len(records)
+
+    def write(self, record: Dict[str, Any]):
+        self._loose_records.append(record)
+        if len(self._loose_records) >= self.LOOSE_RECORDS_PART_SIZE:
+            self._flush_loose_records()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def _flush_loose_records(self):
+        if self._loose_records:
+            self.write_batch("loose", self._loose_records, [])
+            self._loose_records = []
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        self._closed = True
+        self._flush_loose_records()
+
+        sources = [part for part in self._parts if part]
+        if not sources:
+            logger.warning(f"Nenhum registro escrito. gs://{self.storage_bucket.name}/{self.destination_blob_name} não foi criado.")
+            self._clear()
+            return
+
+        if metadata is not None:
+            metadata = {
+                **metadata,
+                "checkpoint": {"run_key": self.run_key, "parts": len(sources), "resumed_records": self.resumed_records}
+            }
+            metadata_part = f"{self.prefix}/parts/metadata.ndjson"
+            self.storage_bucket.blob(metadata_part).upload_from_string(
+                compress_bytes(json.dumps({"metadata": metadata}, ensure_ascii=False).encode("utf-8"), self.compression),
+                content_type=self.content_type
+            )
+            sources.append(metadata_part)
+
+        compose_blobs(self.storage_bucket, sources, self.destination_blob_name, self.content_type, f"{self.prefix}/compose")
+
+        logger.info(
+            f"Salvos {self.records_written} registros ({len(sources)} partes compostas) em: "
+            f"gs://{self.storage_bucket.name}/{self.destination_blob_name}"
+        )
+        self._clear()
+
+    def abort(self):
+        self._closed = True
+        logger.warning(
+            f"Extração interrompida. Checkpoint {self.run_key} mantido com {len(self._done_ids)} registros "
+            f"em gs://{self.storage_bucket.name}/{self.prefix}"
+        )
+
+    def _clear(self):
+        for blob in self.storage_bucket.list_blobs(prefix=f"{self.prefix}/"):
+            blob.delete()
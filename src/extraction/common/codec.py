@@ -0,0 +1,107 @@
+"""
+JSON codec shared by the API clients and the NDJSON writers.
+
+Parsing goes from the raw response bytes straight to Python objects with
+orjson or msgspec when installed, falling back to the stdlib. Serialization
+returns UTF-8 bytes that are byte-identical to
+`json.dumps(obj, ensure_ascii=False, separators=...).encode("utf-8")`, which is
+what the dbt external tables were built against: orjson is only used for the
+compact separators, and its output is discarded in favour of the stdlib's
+whenever it may differ (exponent-form floats, integers beyond 64 bits, non-str
+keys). NaN and Infinity, which are not valid JSON and never come from the API,
+are the only values that would still be written differently (null).
+"""
+from typing import Any, Iterable, Optional, Tuple
+import json
+import logging
+
+from . import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+COMPACT_SEPARATORS = (",", ":")
+CODECS = ("auto", "orjson", "msgspec", "stdlib")
+
+# orjson writes floats outside [1e-4, 1e16) as 1e16 / 0.00001 where repr() writes
+# 1e+16 / 1e-05. With every digit mapped to 0 those always contain "0e" or
+# "0.0000"; a match inside a string only costs a fallback to the stdlib.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+
+def _may_differ(encoded: bytes) -> bool:
+    normalized = encoded.translate(_DIGITS_TO_ZERO)
+    return b"0e" in normalized or b"0.0000" in normalized
+
+def _resolve(name: str) -> str:
+    name = (name or "auto").lower()
+    if name not in CODECS:
+        raise ValueError(f"Codec JSON inválido: {name}. Use um de {CODECS}.")
+
+    if name == "auto":
+        return "orjson" if orjson is not None else "msgspec" if msgspec is not None else "stdlib"
+
+    if (name == "orjson" and orjson is None) or (name == "msgspec" and msgspec is None):
+        logger.warning(f"Codec JSON '{name}' não está instalado. Usando a biblioteca padrão.")
+        return "stdlib"
+
+    return name
+
+CODEC = _resolve(config.BLING_JSON_CODEC)
+
+def loads(data: Any, codec: Optional[str] = None) -> Any:
+    """Parses bytes (or str) into Python objects, retrying with the stdlib on anything the fast parser rejects."""
+    codec = codec or CODEC
+
+    if codec == "orjson":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    elif codec == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except (msgspec.DecodeError, TypeError):
+            pass
+
+    return json.loads(data)
+
+def _to_dict(obj: Any) -> Any:
+    # Typed record models (common/models.py) serialize as their document.
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _stdlib_dumps(obj: Any, separators: Optional[Tuple[str, str]]) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=separators, default=_to_dict).encode("utf-8")
+
+def dumps(obj: Any, separators: Optional[Tuple[str, str]] = None, codec: Optional[str] = None) -> bytes:
+    """Serializes to UTF-8 bytes exactly as `json.dumps(obj, ensure_ascii=False, separators=separators)`."""
+    codec = codec or CODEC
+
+    if codec == "orjson" and tuple(separators or ()) == COMPACT_SEPARATORS:
+        try:
+            encoded = orjson.dumps(obj, default=_to_dict, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+        except TypeError:
+            return _stdlib_dumps(obj, separators)
+
+        if not _may_differ(encoded):
+            return encoded
+
+    return _stdlib_dumps(obj, separators)
+
+def dumps_lines(records: Iterable[Any], separators: Optional[Tuple[str, str]] = None, codec: Optional[str] = None) -> bytes:
+    """NDJSON body: one serialized record per line, each followed by a newline."""
+    return b"".join(dumps(record, separators, codec) + b"\n" for record in records)
+
+def response_json(response) -> Any:
+    """Drop-in for `requests.Response.json()` that parses the raw body bytes."""
+    return loads(response.content)
@@ -0,0 +1,49 @@
+from typing import Optional
+
+import pyarrow as pa
+
+CODECS = ("gzip", "zstd")
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+CONTENT_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+def normalize_compression(compression: Optional[str]) -> Optional[str]:
+    if not compression or compression.lower() == "none":
+        return None
+
+    compression = compression.lower()
+    if compression not in CODECS:
+        raise ValueError(f"Compressão inválida: {compression}. Use uma de {CODECS} ou 'none'.")
+
+    return compression
+
+def compressed_blob_name(blob_name: str, compression: Optional[str]) -> str:
+    return blob_name + SUFFIXES[compression]
+
+def content_type_for(compression: Optional[str], default: str) -> str:
+    return CONTENT_TYPES.get(compression, default)
+
+def open_compressed_writer(raw_writer, compression: Optional[str]):
+    """
+    Wraps a writable file object in a streaming gzip/zstd compressor. Closing
+    the returned stream flushes the compressor and closes `raw_writer`.
+    """
+    if compression is None:
+        return raw_writer
+
+    return pa.CompressedOutputStream(pa.PythonFile(raw_writer, mode="w"), compression)
+
+def compress_bytes(data: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return data
+
+    sink = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(sink, compression) as stream:
+        stream.write(data)
+    return sink.getvalue().to_pybytes()
+
+def decompress_bytes(data: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return data
+
+    with pa.CompressedInputStream(pa.BufferReader(data), compression) as stream:
+        return stream.read()
@@ -1,16 +1,15 @@
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 import requests
 from threading import Lock, Semaphore
-from collections import deque
 import concurrent.futures
 import logging
-from time import sleep
 import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 
 from extraction.common.bling_api_client import BlingClient
+from extraction.common.codec import loads
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +43,11 @@ class ProgressTracker:
             
             logger.info(f"✓ Batch '{batch_name}': {success_count} success, {failed_count} failed")
     
+    def add_pending(self, batches: int, ids: int):
+        with self.lock:
+            self.total_batches += batches
+            self.total_ids += ids
+
     def _create_progress_bar(self, percentage: float, width: int = 30) -> str:
         filled = int(width * percentage / 100)
         bar = '█' * filled + '░' * (width - filled)
@@ -60,6 +64,10 @@ class ProgressTracker:
             return f"{hours:.0f}h {minutes:.0f}m"
     
     def final_report(self):
+        if self.total_ids == 0:
+            print("Nenhum ID para extrair.")
+            return
+
         total_time = time.time() - self.start_time
         print("\n" + "="*100)
         print("Extração completa!")
@@ -72,37 +80,43 @@ class ProgressTracker:
         print(f"Taxa de sucesso de extração: {(self.successful_ids/(self.successful_ids + self.failed_ids))*100:.2f}%")
         print("="*100)
 
-class RateLimitedExecutor:
-    def __init__(self, max_workers: int, reqs_per_second: int):
-        self.max_workers = max_workers
-        self.reqs_per_second = reqs_per_second
-        self.request_times = deque()
+class ResultAggregator:
+    """
+    Streaming replacement for the per-batch results dict.
+
+    Completed batches only update counters and the set of failed IDs; their
+    records go to the sink and are released. Without a sink the records are
+    kept in `records`, as the only place left to hold them.
+    """
+
+    def __init__(self, keep_records: bool = False):
+        self.batches_processed = 0
+        self.successful = 0
+        self.failed_ids = set()
+        self.records: Optional[List[Dict[str, Any]]] = [] if keep_records else None
         self.lock = Lock()
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
 
-    def _wait_for_rate_limit(self):
+    def add_batch(self, success_count: int, failed_ids: Iterable[Any], records: List[Dict[str, Any]] = None):
         with self.lock:
-            now = time.time()
-            while self.request_times and now - self.request_times[0] >= 1.0:
-                self.request_times.popleft()
-            
-            if len(self.request_times) >= self.reqs_per_second:
-                sleep_time = 1.0 - (now - self.request_times[0]) + 0.01
-                if sleep_time > 0:
-                    sleep(sleep_time)
-                    now = time.time()
-                    while self.request_times and now - self.request_times[0] >= 1.0:
-                        self.request_times.popleft()
-            
-            self.request_times.append(now)
+            self.batches_processed += 1
+            self.successful += success_count
+            self.failed_ids.update(failed_ids)
+            if self.records is not None and records:
+                self.records.extend(records)
+
+    @property
+    def failed(self) -> int:
+        return len(self.failed_ids)
 
-    def submit(self, fn, *args, **kwargs):
-        def wrapped_fn():
-            self._wait_for_rate_limit()
-            return fn(*args, **kwargs)
-        return self.executor.submit(wrapped_fn)
+def worker_count(client: BlingClient, max_workers: int) -> int:
+    """
+    With an adaptive controller the pool is sized for its ceiling and the
+    controller's slots decide how many requests actually run at once.
+    """
+    controller = getattr(client, "concurrency_controller", None)
+    return controller.max_concurrency if controller is not None else max_workers
 
-def process_batch(client: BlingClient, endpoint: str, id_batch: List[str], batch_name: str) -> Dict:
+def process_batch(client: BlingClient, endpoint: str, id_batch: List[str], batch_name: str, decode: Callable[[bytes], Any] = loads) -> Dict:
     results = {'success': [], 'failed': [], 'batch_name': batch_name}
     
     for object_id in id_batch:
@@ -111,7 +125,7 @@ def process_batch(client: BlingClient, endpoint: str, id_batch: List[str], batch
                 
             response = client.get(endpoint=full_endpoint)
 
-            results['success'].append(response.json())
+            results['success'].append(decode(response.content))
                 
         except requests.exceptions.RequestException as e:
             logger.warning(f"Request failed for ID {object_id}: {str(e)[:100]}...")    
@@ -122,14 +136,60 @@ def process_batch(client: BlingClient, endpoint: str, id_batch: List[str], batch
 
     return results
 
+def collect_batch_result(
+    future: concurrent.futures.Future,
+    batch_name: str,
+    id_batch: List[str],
+    results: ResultAggregator,
+    sink=None,
+    progress_tracker: ProgressTracker = None,
+    retry_stage=None
+):
+    try:
+        batch_result = future.result()
+    except Exception as e:
+        logger.error(f"Catastrophic failure in batch {batch_name}: {e}")
+        results.add_batch(0, id_batch)
+
+        if retry_stage is not None:
+            retry_stage.record_batch(0, len(id_batch))
+            retry_stage.submit_many(id_batch)
+        
+        if progress_tracker:
+            progress_tracker.update_batch(0, len(id_batch), batch_name)
+        return
+
+    success_count = len(batch_result['success'])
+    failed_count = len(batch_result['failed'])
+
+    if retry_stage is not None:
+        retry_stage.record_batch(success_count, failed_count)
+        retry_stage.submit_many(batch_result['failed'])
+
+    if sink is not None:
+        sink.write_batch(batch_name, batch_result['success'], batch_result['failed'])
+        results.add_batch(success_count, batch_result['failed'])
+    else:
+        results.add_batch(success_count, batch_result['failed'], batch_result['success'])
+
+    batch_result['success'] = []
+    
+    if progress_tracker:
+        progress_tracker.update_batch(success_count, failed_count, batch_name)
+    else:
+        logger.info(f"Batch {batch_name} completed: {success_count} success, {failed_count} failed")
+
 def process_pre_batched(
     batched_dict: Dict[str, List[str]], 
     endpoint: str, 
     client: BlingClient,
     max_workers: int = 3,
     reqs_per_second: int = 3,
-    show_progress: bool = True
-) -> Dict:
+    show_progress: bool = True,
+    sink=None,
+    retry_stage=None,
+    decode: Callable[[bytes], Any] = loads
+) -> ResultAggregator:
     
     total_batches = len(batched_dict)
     total_ids = sum(len(batch) for batch in batched_dict.values())
@@ -145,9 +205,10 @@ def process_pre_batched(
         print("="*100)
         print()
     
-    executor = RateLimitedExecutor(min(max_workers, 3), reqs_per_second)
+    # The client's token bucket paces every request, retries included.
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=worker_count(client, max_workers))
     futures = {}
-    results = {}
+    results = ResultAggregator(keep_records=sink is None)
     
     for batch_name, id_batch in batched_dict.items():
         future = executor.submit(
@@ -155,43 +216,90 @@ def process_pre_batched(
             id_batch=id_batch,
             endpoint=endpoint,
             client=client,
-            batch_name=batch_name
+            batch_name=batch_name,
+            decode=decode
         )
         futures[future] = batch_name
-        results[batch_name] = {'success': [], 'failed': []}
 
     for future in concurrent.futures.as_completed(futures):
         batch_name = futures[future]
-        
-        try:
-            batch_result = future.result()
-            results[batch_name] = {
-                'success': batch_result['success'],
-                'failed': batch_result['failed']
-            }
-            
-            success_count = len(batch_result['success'])
-            failed_count = len(batch_result['failed'])
-            
-            if show_progress:
-                progress_tracker.update_batch(success_count, failed_count, batch_name)
-            else:
-                logger.info(f"Batch {batch_name} completed: {success_count} success, {failed_count} failed")
-            
-        except Exception as e:
-            logger.error(f"Catastrophic failure in batch {batch_name}: {e}")
-            batch_size = len(batched_dict[batch_name])
-            results[batch_name] = {
-                'success': [], 
-                'failed': batched_dict[batch_name]
-            }
-            
-            if show_progress:
-                progress_tracker.update_batch(0, batch_size, batch_name)
+        collect_batch_result(future, batch_name, batched_dict[batch_name], results, sink, progress_tracker if show_progress else None, retry_stage)
     
-    executor.executor.shutdown(wait=True)
+    executor.shutdown(wait=True)
     
     if show_progress:
         progress_tracker.final_report()
+
+    rate_limiter = getattr(client, "rate_limiter", None)
+    if rate_limiter is not None:
+        logger.info(f"Rate limiter: {rate_limiter.snapshot()}")
     
-    return results
\ No newline at end of file
+    return results
+
+def process_batch_stream(
+    batches: Iterable[Tuple[str, List[str]]],
+    endpoint: str,
+    client: BlingClient,
+    max_workers: int = 3,
+    show_progress: bool = True,
+    sink=None,
+    retry_stage=None,
+    decode: Callable[[bytes], Any] = loads
+) -> ResultAggregator:
+    """
+    Detail-fetch stage fed by a stream of `(batch_name, ids)` pairs, e.g. a
+    PrefetchingLister. Batches are submitted as soon as they arrive and at most
+    `2 * max_workers` are in flight, so a slow detail stage applies backpressure
+    to the listing queue instead of buffering every ID. Failed IDs are handed
+    to `retry_stage` as soon as their batch completes.
+    """
+    progress_tracker = ProgressTracker(0, 0) if show_progress else None
+    if show_progress:
+        print("\n" + "="*100)
+        print(f"Iniciando extração em lotes (listagem e detalhes em paralelo)")
+        print("="*100)
+        print()
+
+    max_workers = worker_count(client, max_workers)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    max_in_flight = max_workers * 2
+    in_flight = {}
+    results = ResultAggregator(keep_records=sink is None)
+
+    def drain():
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            batch_name, id_batch = in_flight.pop(future)
+            collect_batch_result(future, batch_name, id_batch, results, sink, progress_tracker, retry_stage)
+
+    try:
+        for batch_name, id_batch in batches:
+            if progress_tracker:
+                progress_tracker.add_pending(1, len(id_batch))
+
+            future = executor.submit(
+                process_batch,
+                id_batch=id_batch,
+                endpoint=endpoint,
+                client=client,
+                batch_name=batch_name,
+                decode=decode
+            )
+            in_flight[future] = (batch_name, id_batch)
+
+            if len(in_flight) >= max_in_flight:
+                drain()
+
+        while in_flight:
+            drain()
+    finally:
+        executor.shutdown(wait=True)
+
+    if show_progress:
+        progress_tracker.final_report()
+
+    rate_limiter = getattr(client, "rate_limiter", None)
+    if rate_limiter is not None:
+        logger.info(f"Rate limiter: {rate_limiter.snapshot()}")
+
+    return results
@@ -6,4 +6,95 @@ load_dotenv()
 BLING_CLIENT_ID = os.getenv("BLING_CLIENT_ID")
 BLING_CLIENT_SECRET = os.getenv("BLING_CLIENT_SECRET")
 BLING_REFRESH_TOKEN = os.getenv("BLING_REFRESH_TOKEN")
-BLING_AUTH_CODE = os.getenv("BLING_AUTH_CODE")
\ No newline at end of file
+BLING_AUTH_CODE = os.getenv("BLING_AUTH_CODE")
+
+BLING_RATE_LIMIT_PER_SECOND = float(os.getenv("BLING_RATE_LIMIT_PER_SECOND", "3"))
+BLING_RATE_LIMIT_BURST = int(os.getenv("BLING_RATE_LIMIT_BURST", "3"))
+BLING_DAILY_QUOTA = int(os.getenv("BLING_DAILY_QUOTA", "120000")) or None
+BLING_MAX_THROTTLE_RETRIES = int(os.getenv("BLING_MAX_THROTTLE_RETRIES", "5"))
+
+BLING_EXTRACTION_ENGINE = os.getenv("BLING_EXTRACTION_ENGINE", "threads")
+BLING_ASYNC_CONCURRENCY = int(os.getenv("BLING_ASYNC_CONCURRENCY", "8"))
+
+GCS_UPLOAD_CHUNK_SIZE = int(os.getenv("GCS_UPLOAD_CHUNK_SIZE_MB", "8")) * 1024 * 1024
+
+BLING_SALES_EXTRACTION_MODE = os.getenv("BLING_SALES_EXTRACTION_MODE", "window")
+BLING_INCREMENTAL_OVERLAP_DAYS = int(os.getenv("BLING_INCREMENTAL_OVERLAP_DAYS", "1"))
+BLING_INCREMENTAL_BOOTSTRAP_DAYS = int(os.getenv("BLING_INCREMENTAL_BOOTSTRAP_DAYS", "7"))
+
+BLING_DETAIL_CACHE_ENABLED = os.getenv("BLING_DETAIL_CACHE_ENABLED", "false").lower() == "true"
+BLING_DETAIL_CACHE_PREFIX = os.getenv("BLING_DETAIL_CACHE_PREFIX", "state/detail_cache")
+BLING_DETAIL_CACHE_LOCAL_DIR = os.getenv("BLING_DETAIL_CACHE_LOCAL_DIR")
+BLING_DETAIL_CACHE_MAX_ENTRIES = int(os.getenv("BLING_DETAIL_CACHE_MAX_ENTRIES", "200000"))
+BLING_DETAIL_CACHE_TTL_HOURS = float(os.getenv("BLING_DETAIL_CACHE_TTL_HOURS", "720"))
+
+BLING_ORDER_INDEX_ENABLED = os.getenv("BLING_ORDER_INDEX_ENABLED", "false").lower() == "true"
+BLING_ORDER_INDEX_PREFIX = os.getenv("BLING_ORDER_INDEX_PREFIX", "state/order_index")
+BLING_ORDER_INDEX_LOCAL_DIR = os.getenv("BLING_ORDER_INDEX_LOCAL_DIR")
+
+BLING_PIPELINED_LISTING = os.getenv("BLING_PIPELINED_LISTING", "true").lower() == "true"
+BLING_LISTING_PREFETCH_PAGES = int(os.getenv("BLING_LISTING_PREFETCH_PAGES", "3"))
+BLING_STREAM_MAX_WORKERS = int(os.getenv("BLING_STREAM_MAX_WORKERS", "3"))
+BLING_DAG_MAX_WORKERS = int(os.getenv("BLING_DAG_MAX_WORKERS", "4"))
+
+BLING_RETRY_MAX_ATTEMPTS = int(os.getenv("BLING_RETRY_MAX_ATTEMPTS", "3"))
+BLING_RETRY_BASE_DELAY = float(os.getenv("BLING_RETRY_BASE_DELAY", "1"))
+BLING_RETRY_MAX_DELAY = float(os.getenv("BLING_RETRY_MAX_DELAY", "30"))
+BLING_RETRY_MAX_WORKERS = int(os.getenv("BLING_RETRY_MAX_WORKERS", "2"))
+BLING_CIRCUIT_BREAKER_ERROR_RATE = float(os.getenv("BLING_CIRCUIT_BREAKER_ERROR_RATE", "0.5"))
+BLING_CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("BLING_CIRCUIT_BREAKER_COOLDOWN", "30"))
+
+BLING_CHECKPOINT_ENABLED = os.getenv("BLING_CHECKPOINT_ENABLED", "false").lower() == "true"
+BLING_CHECKPOINT_PREFIX = os.getenv("BLING_CHECKPOINT_PREFIX", "state/checkpoints")
+BLING_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("BLING_CHECKPOINT_MAX_AGE_HOURS", "24"))
+
+BLING_PARQUET_ENABLED = os.getenv("BLING_PARQUET_ENABLED", "false").lower() == "true"
+BLING_PARQUET_ROW_GROUP_SIZE = int(os.getenv("BLING_PARQUET_ROW_GROUP_SIZE", "10000"))
+BLING_PARQUET_COMPRESSION = os.getenv("BLING_PARQUET_COMPRESSION", "zstd")
+
+BLING_BIGQUERY_LOAD_ENABLED = os.getenv("BLING_BIGQUERY_LOAD_ENABLED", "false").lower() == "true"
+BLING_BIGQUERY_PROJECT = os.getenv("BLING_BIGQUERY_PROJECT", os.getenv("GCP_PROJECT_ID"))
+BLING_BIGQUERY_DATASET = os.getenv("BLING_BIGQUERY_DATASET", "bronze_bling")
+BLING_BIGQUERY_LOCATION = os.getenv("BLING_BIGQUERY_LOCATION")
+BLING_BIGQUERY_API_ENDPOINT = os.getenv("BLING_BIGQUERY_API_ENDPOINT")
+
+BLING_PARTITION_BY_RECORD_DATE = os.getenv("BLING_PARTITION_BY_RECORD_DATE", "false").lower() == "true"
+BLING_PARTITION_MAX_OPEN = int(os.getenv("BLING_PARTITION_MAX_OPEN", "16"))
+
+BLING_NDJSON_COMPRESSION = os.getenv("BLING_NDJSON_COMPRESSION", "none")
+BLING_COMPOSITE_UPLOAD_ENABLED = os.getenv("BLING_COMPOSITE_UPLOAD_ENABLED", "false").lower() == "true"
+BLING_COMPOSITE_UPLOAD_PART_SIZE = int(os.getenv("BLING_COMPOSITE_UPLOAD_PART_SIZE_MB", "32")) * 1024 * 1024
+BLING_COMPOSITE_UPLOAD_MAX_WORKERS = int(os.getenv("BLING_COMPOSITE_UPLOAD_MAX_WORKERS", "4"))
+
+BLING_ADAPTIVE_CONCURRENCY_ENABLED = os.getenv("BLING_ADAPTIVE_CONCURRENCY_ENABLED", "false").lower() == "true"
+BLING_ADAPTIVE_MIN_CONCURRENCY = int(os.getenv("BLING_ADAPTIVE_MIN_CONCURRENCY", "1"))
+BLING_ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("BLING_ADAPTIVE_MAX_CONCURRENCY", "12"))
+BLING_ADAPTIVE_INITIAL_CONCURRENCY = int(os.getenv("BLING_ADAPTIVE_INITIAL_CONCURRENCY", "3"))
+BLING_ADAPTIVE_MIN_RATE = float(os.getenv("BLING_ADAPTIVE_MIN_RATE", "1"))
+BLING_ADAPTIVE_MAX_RATE = float(os.getenv("BLING_ADAPTIVE_MAX_RATE", "10"))
+BLING_ADAPTIVE_RATE_STEP = float(os.getenv("BLING_ADAPTIVE_RATE_STEP", "0.5"))
+BLING_ADAPTIVE_DECREASE_FACTOR = float(os.getenv("BLING_ADAPTIVE_DECREASE_FACTOR", "0.5"))
+BLING_ADAPTIVE_TARGET_P95_MS = float(os.getenv("BLING_ADAPTIVE_TARGET_P95_MS", "1500"))
+BLING_ADAPTIVE_WINDOW = int(os.getenv("BLING_ADAPTIVE_WINDOW", "20"))
+
+BLING_METRICS_PROMETHEUS_TEXTFILE = os.getenv("BLING_METRICS_PROMETHEUS_TEXTFILE")
+BLING_METRICS_OTEL_EXPORTER = os.getenv("BLING_METRICS_OTEL_EXPORTER", "none").lower()
+BLING_METRICS_OTEL_EXPORT_INTERVAL_MS = int(os.getenv("BLING_METRICS_OTEL_EXPORT_INTERVAL_MS", "60000"))
+
+BLING_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("BLING_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+BLING_STATE_BACKEND = os.getenv("BLING_STATE_BACKEND", "secret_manager").lower()
+BLING_STATE_GCS_BLOB = os.getenv("BLING_STATE_GCS_BLOB", "state/bling_state.json")
+BLING_STATE_LOCAL_PATH = os.getenv("BLING_STATE_LOCAL_PATH", ".bling_state.json")
+BLING_STATE_KEEP_VERSIONS = int(os.getenv("BLING_STATE_KEEP_VERSIONS", "5"))
+BLING_STATE_WRITE_BEHIND = os.getenv("BLING_STATE_WRITE_BEHIND", "true").lower() == "true"
+BLING_STATE_SNAPSHOT_PATH = os.getenv("BLING_STATE_SNAPSHOT_PATH")
+BLING_STATE_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("BLING_STATE_SNAPSHOT_MAX_AGE_SECONDS", "300"))
+
+BLING_JSON_CODEC = os.getenv("BLING_JSON_CODEC", "auto").lower()
+
+BLING_TYPED_RECORDS = os.getenv("BLING_TYPED_RECORDS", "false").lower() == "true"
+BLING_TYPED_RECORDS_KEEP_RAW = os.getenv("BLING_TYPED_RECORDS_KEEP_RAW", "false").lower() == "true"
+
+BLING_PROJECTION = os.getenv("BLING_PROJECTION", "full").lower()
+BLING_PROJECTION_EXTRA_PATHS = [path.strip() for path in os.getenv("BLING_PROJECTION_EXTRA_PATHS", "").split(",") if path.strip()]
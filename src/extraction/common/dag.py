@@ -0,0 +1,175 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import concurrent.futures
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED, SKIPPED = "pending", "running", "done", "failed", "skipped"
+
+@dataclass
+class Stage:
+    """One node of the extraction DAG: `run` starts once every stage in `depends_on` is done."""
+
+    name: str
+    run: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+    status: str = PENDING
+    result: Any = None
+    error: Optional[BaseException] = None
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+@dataclass
+class DagReport:
+    stages: Dict[str, Stage]
+    wall_seconds: float
+    critical_path: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "critical_path": self.critical_path,
+            "critical_path_seconds": round(sum(self.stages[name].duration for name in self.critical_path), 3),
+            "stages": {
+                name: {
+                    "status": stage.status,
+                    "depends_on": list(stage.depends_on),
+                    "start": round(stage.started_at, 3),
+                    "seconds": round(stage.duration, 3)
+                }
+                for name, stage in self.stages.items()
+            }
+        }
+
+class DagRunner:
+    """
+    Runs extraction stages as a dependency graph on a thread pool.
+
+    Independent stages run concurrently (all of them share the client's rate
+    limiter, so the API budget is unchanged); a failed stage skips everything
+    that depends on it, and `run` re-raises the first failure after the other
+    branches finish. Timings are relative to the start of the run, and the
+    critical path is the chain of stages that determined the wall time.
+    """
+
+    def __init__(self, stages: Iterable[Stage], max_workers: int = 4):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Etapa duplicada no DAG: '{stage.name}'.")
+            self.stages[stage.name] = stage
+
+        self.max_workers = max(1, max_workers)
+        self._validate()
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Etapa '{stage.name}' depende de '{dependency}', que não existe no DAG.")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependências no DAG envolvendo '{name}'.")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _ready(self) -> List[Stage]:
+        return [
+            stage for stage in self.stages.values()
+            if stage.status == PENDING and all(self.stages[dependency].status == DONE for dependency in stage.depends_on)
+        ]
+
+    def _skip_blocked(self):
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages.values():
+                if stage.status == PENDING and any(self.stages[dependency].status in (FAILED, SKIPPED) for dependency in stage.depends_on):
+                    stage.status = SKIPPED
+                    changed = True
+                    logger.warning(f"Etapa '{stage.name}' ignorada: uma dependência falhou.")
+
+    def _critical_path(self) -> List[str]:
+        finished = [stage for stage in self.stages.values() if stage.status in (DONE, FAILED)]
+        if not finished:
+            return []
+
+        path = []
+        stage = max(finished, key=lambda item: item.finished_at)
+        while stage is not None:
+            path.append(stage.name)
+            dependencies = [self.stages[dependency] for dependency in stage.depends_on]
+            stage = max(dependencies, key=lambda item: item.finished_at) if dependencies else None
+
+        return path[::-1]
+
+    def run(self) -> DagReport:
+        start = time.monotonic()
+
+        def execute(stage: Stage):
+            stage.started_at = time.monotonic() - start
+            try:
+                return stage.run()
+            finally:
+                stage.finished_at = time.monotonic() - start
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag") as pool:
+            running: Dict[concurrent.futures.Future, Stage] = {}
+
+            while True:
+                for stage in self._ready():
+                    stage.status = RUNNING
+                    running[pool.submit(execute, stage)] = stage
+
+                if not running:
+                    break
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        stage.result = future.result()
+                        stage.status = DONE
+                    except BaseException as e:
+                        stage.error = e
+                        stage.status = FAILED
+                        logger.error(f"Etapa '{stage.name}' falhou após {stage.duration:.2f} segundos: {e!r}")
+
+                self._skip_blocked()
+
+        report = DagReport(stages=self.stages, wall_seconds=time.monotonic() - start, critical_path=self._critical_path())
+        self._log(report)
+
+        failed = [stage for stage in self.stages.values() if stage.status == FAILED]
+        if failed:
+            raise failed[0].error
+
+        return report
+
+    def _log(self, report: DagReport):
+        lines = [
+            f"  {name:<20} {stage.status:<8} início {stage.started_at:7.2f}s  duração {stage.duration:7.2f}s"
+            + ("  *" if name in report.critical_path else "")
+            for name, stage in sorted(report.stages.items(), key=lambda item: item[1].started_at)
+        ]
+        logger.info(
+            f"DAG de extração concluído em {report.wall_seconds:.2f} segundos. "
+            f"Caminho crítico (*): {' -> '.join(report.critical_path)}\n" + "\n".join(lines)
+        )
@@ -0,0 +1,256 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from threading import Lock
+
+from google.api_core import exceptions
+from google.cloud.storage import Bucket
+
+from . import config
+from .codec import dumps, loads
+from .gcs_lock import GcsLock
+from .models import as_record, record_id
+
+logger = logging.getLogger(__name__)
+
+def fingerprint(summary_row: Dict[str, Any]) -> str:
+    payload = json.dumps(summary_row, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class DetailCache:
+    """
+    Detail JSON keyed by object ID, stored next to the fingerprint of the listing
+    row it was fetched for.
+
+    During listing, `check` marks an ID as a hit when the listing row still has
+    the cached fingerprint, so its detail request can be skipped; `record` stores
+    freshly fetched details under the fingerprint seen during listing. Entries
+    are evicted by LRU order (`max_entries`) and age (`ttl_seconds`). The cache
+    is persisted as gzipped NDJSON in GCS or on the local filesystem; loading
+    keeps the details recorded by this run on top of the stored entries, so
+    parallel tasks can merge into the same object.
+    """
+
+    MERGE_ATTEMPTS = 3
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending_fingerprints: Dict[str, str] = {}
+        self._hits: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._recorded = set()
+        self._generation: Optional[int] = None
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.stored = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry["cached_at"] > self.ttl_seconds
+
+    def _evict_overflow(self):
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            key, entry = self._entries.popitem(last=False)
+            if key in self._hits:
+                # A hit of this run still has to be written; keep only its detail.
+                self._hits[key] = entry["detail"]
+            self.evictions += 1
+
+    def check(self, object_id: Any, row_fingerprint: str) -> bool:
+        key = str(object_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self._is_expired(entry, time.time()):
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+
+            if entry is not None and entry["fingerprint"] == row_fingerprint:
+                self._entries.move_to_end(key)
+                self._hits[key] = None
+                self.hits += 1
+                return True
+
+            self._pending_fingerprints[key] = row_fingerprint
+            self.misses += 1
+            return False
+
+    def should_fetch(self, summary_row: Dict[str, Any]) -> bool:
+        return not self.check(summary_row['id'], fingerprint(summary_row))
+
+    def record(self, detail: Dict[str, Any]):
+        key = str(record_id(detail))
+
+        with self._lock:
+            row_fingerprint = self._pending_fingerprints.pop(key, None)
+
+            if row_fingerprint is None:
+                return
+
+            self._entries[key] = {"fingerprint": row_fingerprint, "cached_at": time.time(), "detail": as_record(detail)}
+            self._entries.move_to_end(key)
+            self._recorded.add(key)
+            self.stored += 1
+            self._evict_overflow()
+
+    def cached_details(self) -> Iterator[Dict[str, Any]]:
+        """Details of this run's hits, read from the entries at write time instead of being copied at lookup."""
+        for key, evicted_detail in self._hits.items():
+            yield evicted_detail if evicted_detail is not None else self._entries[key]["detail"]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "stored": self.stored
+        }
+
+    def _load_lines(self, stream: io.BufferedIOBase):
+        """Replaces the entries with the stored ones, keeping the details recorded by this run on top of them."""
+        now = time.time()
+        entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        with gzip.GzipFile(fileobj=stream, mode="rb") as gz:
+            for line in gz:
+                entry = loads(line)
+                if self._is_expired(entry, now):
+                    self.expired += 1
+                    continue
+                entries[str(entry.pop("id"))] = entry
+
+        with self._lock:
+            for key in self._recorded:
+                if key in self._entries:
+                    entries[key] = self._entries[key]
+                    entries.move_to_end(key)
+            self._entries = entries
+            self._evict_overflow()
+
+    def _dump_lines(self, stream: io.BufferedIOBase):
+        now = time.time()
+        with gzip.GzipFile(fileobj=stream, mode="wb") as gz:
+            for key, entry in self._entries.items():
+                if self._is_expired(entry, now):
+                    continue
+                gz.write(dumps({"id": key, **entry}, separators=(',', ':')))
+                gz.write(b"\n")
+
+    def load_file(self, path: str) -> "DetailCache":
+        if os.path.exists(path):
+            with open(path, "rb") as stream:
+                self._load_lines(stream)
+        return self
+
+    def save_file(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as stream:
+            self._dump_lines(stream)
+        os.replace(tmp_path, path)
+
+    def load_blob(self, storage_bucket: Bucket, blob_name: str) -> "DetailCache":
+        blob = storage_bucket.get_blob(blob_name)
+        self._generation = blob.generation if blob is not None else 0
+
+        if blob is not None:
+            with blob.open("rb", if_generation_match=self._generation) as stream:
+                self._load_lines(stream)
+        return self
+
+    def save_blob(self, storage_bucket: Bucket, blob_name: str):
+        """Writes the cache, only over the object generation last loaded when there is one."""
+        blob = storage_bucket.blob(blob_name)
+        preconditions = {} if self._generation is None else {"if_generation_match": self._generation}
+
+        with blob.open("wb", chunk_size=config.GCS_UPLOAD_CHUNK_SIZE, content_type="application/gzip", **preconditions) as stream:
+            self._dump_lines(stream)
+
+class CachingSink:
+    """Sink wrapper that records every fetched detail in a DetailCache before forwarding it."""
+
+    def __init__(self, sink, detail_cache: DetailCache):
+        self.sink = sink
+        self.detail_cache = detail_cache
+
+    def write(self, record: Dict[str, Any]):
+        self.detail_cache.record(record)
+        self.sink.write(record)
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        for record in records:
+            self.detail_cache.record(record)
+        self.sink.write_batch(batch_name, records, failed_ids)
+
+def detail_cache_location(entity: str) -> str:
+    return f"{config.BLING_DETAIL_CACHE_PREFIX}/{entity}_details.ndjson.gz"
+
+def open_detail_cache(storage_bucket: Bucket, entity: str) -> Optional[DetailCache]:
+    if not config.BLING_DETAIL_CACHE_ENABLED:
+        return None
+
+    detail_cache = DetailCache(
+        max_entries=config.BLING_DETAIL_CACHE_MAX_ENTRIES,
+        ttl_seconds=config.BLING_DETAIL_CACHE_TTL_HOURS * 3600 if config.BLING_DETAIL_CACHE_TTL_HOURS else None
+    )
+
+    location = detail_cache_location(entity)
+    if config.BLING_DETAIL_CACHE_LOCAL_DIR:
+        detail_cache.load_file(os.path.join(config.BLING_DETAIL_CACHE_LOCAL_DIR, location))
+    else:
+        detail_cache.load_blob(storage_bucket, location)
+
+    logger.info(f"Cache de detalhes '{entity}' carregado com {len(detail_cache)} entradas")
+    return detail_cache
+
+def persist_detail_cache(detail_cache: Optional[DetailCache], storage_bucket: Bucket, entity: str):
+    """
+    Saves the cache. In GCS, parallel tasks update the same object, so the
+    latest version is reloaded under a lock and this run's details are merged
+    on top of it before writing over that exact generation.
+    """
+    if detail_cache is None:
+        return
+
+    location = detail_cache_location(entity)
+    if config.BLING_DETAIL_CACHE_LOCAL_DIR:
+        detail_cache.save_file(os.path.join(config.BLING_DETAIL_CACHE_LOCAL_DIR, location))
+    else:
+        with GcsLock(storage_bucket, f"{location}.lock"):
+            for attempt in range(1, DetailCache.MERGE_ATTEMPTS + 1):
+                detail_cache.load_blob(storage_bucket, location)
+                try:
+                    detail_cache.save_blob(storage_bucket, location)
+                    break
+                except exceptions.PreconditionFailed:
+                    if attempt == DetailCache.MERGE_ATTEMPTS:
+                        raise
+                    logger.warning(
+                        f"Cache de detalhes '{entity}' alterado por outra task durante a escrita. "
+                        f"Relendo (tentativa {attempt + 1}/{DetailCache.MERGE_ATTEMPTS})."
+                    )
+
+    logger.info(f"Cache de detalhes '{entity}': {detail_cache.stats()}")
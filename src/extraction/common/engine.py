@@ -0,0 +1,345 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+import sys
+import time
+
+import requests
+from google.cloud.storage import Bucket
+
+from . import config
+from .async_concurrency import run_pre_batched_async
+from .bigquery_sink import REPLACE_PARTITIONS, UPSERT, BigQueryLoadSink, open_warehouse
+from .bling_api_client import BlingClient
+from .checkpoint import CheckpointSink
+from .codec import response_json
+from .concurrency import ResultAggregator, process_batch_stream, process_pre_batched
+from .detail_cache import CachingSink, open_detail_cache, persist_detail_cache
+from .entity import EntitySpec
+from .listing import PrefetchingLister, combine_filters
+from .metrics import METRICS
+from .models import record_decoder
+from .order_index import IndexingSink, OrderIndex, open_order_index, persist_order_index
+from .parquet_sink import ParquetSink
+from .partitioned_sink import PartitionedNdjsonSink
+from .projection import ProjectingSink, build_projection
+from .retry import RetryStage, retry_failed_ids
+from .sinks import NdjsonBlobSink, TeeSink, open_sink
+
+logger = logging.getLogger(__name__)
+
+def extract_all_ids(client: BlingClient, spec: EntitySpec, params: Dict[str, Any], id_filter: Callable[[Dict], bool] = None) -> Dict[int, List[str]]:
+    start_time = datetime.now(timezone.utc)
+
+    lister = PrefetchingLister(
+        client=client,
+        endpoint=spec.list_endpoint,
+        initial_params=params,
+        prefetch_pages=config.BLING_LISTING_PREFETCH_PAGES,
+        id_filter=id_filter
+    )
+    all_ids = dict(lister)
+
+    duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+    logger.info(f"\nExtração de {lister.ids_listed} IDs de {spec.label} completa em {duration:.2f} segundos")
+
+    return all_ids
+
+def consolidate_results(
+    results: ResultAggregator,
+    params: Dict,
+    spec: EntitySpec,
+    client: BlingClient = None,
+    sink: NdjsonBlobSink = None,
+    retry_stage: RetryStage = None
+) -> Dict[str, Any]:
+    """
+    Builds the extraction metadata from the aggregator's counters. Records were
+    already streamed to `sink` as each batch finished; without a sink they are
+    taken from `results.records`. Memory is bounded by the failed-ID set.
+    """
+    failed_ids = results.failed_ids
+
+    if retry_stage is not None:
+        retry_results = retry_stage.wait()
+    elif failed_ids and client:
+        logger.info(f"Encontrados {len(failed_ids)} IDs falhados. Iniciando processo de retry...")
+        retry_results = retry_failed_ids(client=client, endpoint=spec.detail_endpoint, failed_ids=list(failed_ids), params=params)
+    else:
+        retry_results = None
+
+    successful = results.successful
+    permanent_failures = sorted(failed_ids, key=str)
+    records = results.records if sink is None else None
+
+    if retry_results is not None and retry_results["retry_summary"]["total_retried"] > 0:
+        if sink is not None:
+            sink.write_many(retry_results["success"])
+        else:
+            records.extend(retry_results["success"])
+
+        successful += retry_results["retry_summary"]["successful_retries"]
+        permanent_failures = retry_results["failed"]
+
+    consolidated = {
+        "metadata": {
+            "extraction_timestamp": datetime.now().isoformat(),
+            "extraction_params": params,
+            "successful_extractions": successful,
+            "failed_extractions": len(permanent_failures),
+            "batches_processed": results.batches_processed
+        },
+        spec.records_key: records if records is not None else [],
+        "processing_summary": {
+            "batches_processed": results.batches_processed,
+            "failed_count": len(permanent_failures),
+            "failed_ids": permanent_failures
+        }
+    }
+
+    if retry_results is not None and retry_results["retry_summary"]["total_retried"] > 0:
+        consolidated["metadata"]["retry_summary"] = retry_results["retry_summary"]
+
+    consolidated["metadata"][spec.total_key] = successful
+
+    logger.info(f"Consolidação completa: {consolidated['metadata'][spec.total_key]} {spec.label} extraídos com sucesso")
+    if consolidated["metadata"]["failed_extractions"] > 0:
+        logger.warning(f"{consolidated['metadata']['failed_extractions']} extrações permanentemente falharam")
+
+    return consolidated
+
+def handle_requests(
+    client: BlingClient,
+    spec: EntitySpec,
+    ids_dict: Union[Dict[str, List[str]], Iterable[Tuple[str, List[str]]]],
+    params: Dict[str, Any],
+    engine: str = None,
+    sink: NdjsonBlobSink = None
+) -> Dict[str, Any]:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    engine = engine or config.BLING_EXTRACTION_ENGINE
+    endpoint = spec.detail_endpoint
+    decode = record_decoder(spec.model, config.BLING_TYPED_RECORDS, keep_raw=config.BLING_TYPED_RECORDS_KEEP_RAW)
+
+    retry_stage = RetryStage(client=client, endpoint=endpoint, params=params, decode=decode).start()
+
+    controller = getattr(client, "concurrency_controller", None)
+    if controller is not None:
+        controller.begin_run()
+
+    detail_start = time.monotonic()
+
+    try:
+        if engine == "async":
+            results = run_pre_batched_async(
+                batched_dict=dict(ids_dict),
+                endpoint=endpoint,
+                client=client,
+                concurrency=config.BLING_ASYNC_CONCURRENCY,
+                show_progress=True,
+                sink=sink,
+                retry_stage=retry_stage,
+                decode=decode
+            )
+        elif not isinstance(ids_dict, dict):
+            results = process_batch_stream(
+                batches=ids_dict,
+                endpoint=endpoint,
+                client=client,
+                max_workers=config.BLING_STREAM_MAX_WORKERS,
+                show_progress=True,
+                sink=sink,
+                retry_stage=retry_stage,
+                decode=decode
+            )
+        else:
+            results = process_pre_batched(
+                batched_dict=ids_dict,
+                endpoint=endpoint,
+                client=client,
+                max_workers=config.BLING_STREAM_MAX_WORKERS,
+                reqs_per_second=config.BLING_RATE_LIMIT_PER_SECOND,
+                show_progress=True,
+                sink=sink,
+                retry_stage=retry_stage,
+                decode=decode
+            )
+
+        METRICS.record_stage("detail", results.successful + results.failed, time.monotonic() - detail_start)
+
+        data = consolidate_results(
+            results=results,
+            params=params,
+            spec=spec,
+            client=client,
+            sink=sink,
+            retry_stage=retry_stage
+        )
+
+        if controller is not None:
+            summary = controller.summary()
+            data["metadata"]["adaptive_concurrency"] = summary
+            logger.info(f"Série de limites da concorrência adaptativa: {summary['timeline']}")
+
+        return data
+
+    except Exception as e:
+        logger.error(f"Erro: {e}")
+        sys.exit(1)
+
+def open_output_sink(storage_bucket: Bucket, spec: EntitySpec, params: Dict[str, Any], merge_only: bool = False):
+    if not (spec.partition_field and config.BLING_PARTITION_BY_RECORD_DATE):
+        return open_sink(storage_bucket, spec.name, params, spec.blob_name(params), separators=spec.separators)
+
+    if config.BLING_CHECKPOINT_ENABLED:
+        logger.warning(f"Checkpoint ignorado para {spec.label}: incompatível com o particionamento por data do registro.")
+
+    # A date window covers whole days, so those partitions are replaced; anything
+    # else (alteration-date runs, records dated outside the window) is merged.
+    # `merge_only` is used when unchanged records are not written again.
+    window = (params.get("dataInicial"), params.get("dataFinal"))
+
+    return PartitionedNdjsonSink(
+        storage_bucket,
+        spec.output_path,
+        spec.partition_field,
+        replace_range=window if all(window) and not merge_only else None,
+        separators=spec.separators
+    )
+
+def open_entity_order_index(storage_bucket: Bucket, spec: EntitySpec) -> Optional[OrderIndex]:
+    if not spec.partition_field:
+        return None
+
+    if config.BLING_ORDER_INDEX_ENABLED and not config.BLING_PARTITION_BY_RECORD_DATE:
+        logger.warning(f"Índice de pedidos ignorado para {spec.label}: exige BLING_PARTITION_BY_RECORD_DATE=true.")
+        return None
+
+    return open_order_index(storage_bucket, spec.name)
+
+def run_detail_extraction(client: BlingClient, spec: EntitySpec, storage_bucket: Bucket, params: Dict[str, Any] = None, engine: str = None) -> Dict[str, Any]:
+    params = spec.build_params(params)
+    engine = engine or config.BLING_EXTRACTION_ENGINE
+
+    detail_cache = open_detail_cache(storage_bucket, spec.name)
+    order_index = open_entity_order_index(storage_bucket, spec)
+    output_sink = open_output_sink(storage_bucket, spec, params, merge_only=order_index is not None)
+    checkpoint = output_sink if isinstance(output_sink, CheckpointSink) else None
+
+    # Only the merged NDJSON partitions keep the unchanged orders, so the index
+    # filters what reaches them; Parquet and BigQuery still get every record.
+    if order_index is not None:
+        output_sink = IndexingSink(output_sink, order_index, spec.partition_field, on_move=output_sink.discard)
+
+    projection = build_projection(config.BLING_PROJECTION, spec.projection, config.BLING_PROJECTION_EXTRA_PATHS)
+    if projection is not None:
+        logger.info(f"Projeção de campos ativa para {spec.label}: {len(projection.paths)} caminhos mantidos no NDJSON")
+        output_sink = ProjectingSink(output_sink, projection)
+
+    id_filter = combine_filters(
+        checkpoint.should_fetch if checkpoint is not None else None,
+        detail_cache.should_fetch if detail_cache is not None else None
+    )
+
+    if spec.parquet_tables and (config.BLING_PARQUET_ENABLED or config.BLING_BIGQUERY_LOAD_ENABLED):
+        if checkpoint is not None and checkpoint.resumed_records:
+            logger.warning("Checkpoint retomado: a saída Parquet desta execução não conteria os registros já extraídos e não será gerada.")
+        else:
+            columnar_sink = ParquetSink(storage_bucket, spec.parquet_tables, spec.partition(params))
+            if config.BLING_BIGQUERY_LOAD_ENABLED:
+                mode = UPSERT if "dataAlteracaoInicial" in params else REPLACE_PARTITIONS
+                columnar_sink = BigQueryLoadSink(columnar_sink, open_warehouse(), mode=mode)
+            output_sink = TeeSink(output_sink, columnar_sink)
+
+    if config.BLING_PIPELINED_LISTING and engine != "async":
+        ids_dict = PrefetchingLister(
+            client=client,
+            endpoint=spec.list_endpoint,
+            initial_params=params,
+            prefetch_pages=config.BLING_LISTING_PREFETCH_PAGES,
+            id_filter=id_filter
+        )
+    else:
+        ids_dict = extract_all_ids(client=client, spec=spec, params=params, id_filter=id_filter)
+
+    with output_sink as sink:
+        data = handle_requests(
+            client=client, spec=spec, ids_dict=ids_dict, params=params, engine=engine,
+            sink=CachingSink(sink, detail_cache) if detail_cache is not None else sink
+        )
+
+        if detail_cache is not None:
+            sink.write_many(detail_cache.cached_details())
+            data["metadata"][spec.total_key] += detail_cache.hits
+            data["metadata"]["detail_cache"] = detail_cache.stats()
+
+        if checkpoint is not None and checkpoint.resumed_records:
+            # The resumed parts are composed into the final NDJSON too.
+            data["metadata"]["successful_extractions"] += checkpoint.resumed_records
+            data["metadata"][spec.total_key] += checkpoint.resumed_records
+
+        if order_index is not None:
+            data["metadata"]["order_index"] = order_index.stats()
+
+        sink.close(metadata=data["metadata"])
+
+    persist_detail_cache(detail_cache, storage_bucket, spec.name)
+    persist_order_index(order_index, storage_bucket, spec.name)
+
+    return data
+
+def list_rows(client: BlingClient, spec: EntitySpec, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if not spec.paginated:
+        response = client.get(endpoint=spec.list_endpoint, params=params or None)
+        response.raise_for_status()
+        yield from response_json(response).get('data') or []
+        return
+
+    lister = PrefetchingLister(
+        client=client,
+        endpoint=spec.list_endpoint,
+        initial_params=params,
+        prefetch_pages=config.BLING_LISTING_PREFETCH_PAGES,
+        select=lambda row: row
+    )
+
+    for _, rows in lister:
+        yield from rows
+
+def run_listing_extraction(client: BlingClient, spec: EntitySpec, storage_bucket: Bucket, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    params = spec.build_params(params)
+
+    try:
+        logger.info(f"Extraindo {spec.label} no Bling!")
+        records = list(list_rows(client, spec, params))
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Erro ao extrair {spec.label}: {e}")
+        return None
+
+    data = {
+        "metadata": {
+            "extraction_timestamp_utc": datetime.now(timezone.utc).isoformat(),
+            "extraction_params": params,
+            spec.total_key: len(records)
+        },
+        spec.records_key: records
+    }
+
+    with NdjsonBlobSink(storage_bucket, spec.blob_name(params), separators=spec.separators) as sink:
+        sink.write_many(records)
+        sink.close(metadata=data["metadata"])
+
+    return data
+
+def run_extraction(client: BlingClient, spec: EntitySpec, storage_bucket: Bucket, params: Dict[str, Any] = None, engine: str = None) -> Optional[Dict[str, Any]]:
+    try:
+        if spec.detail_endpoint is None:
+            return run_listing_extraction(client=client, spec=spec, storage_bucket=storage_bucket, params=params)
+
+        return run_detail_extraction(client=client, spec=spec, storage_bucket=storage_bucket, params=params, engine=engine)
+    finally:
+        METRICS.export()
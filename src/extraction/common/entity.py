@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """
+    Declarative description of a Bling entity for the generic extraction engine.
+
+    Entities with a `detail_endpoint` are listed first and then fetched one ID at
+    a time (listing → detail → retry → sink); entities without one are stored
+    straight from the listing rows. `output_path` may contain `{partition}`,
+    filled from the first of `partition_keys` present in the run params, or
+    per record from the date at `partition_field` when
+    `BLING_PARTITION_BY_RECORD_DATE` is enabled.
+    `parquet_tables` optionally adds flattened Parquet outputs next to the NDJSON.
+    `model` is the typed record model details are decoded into when
+    `BLING_TYPED_RECORDS` is enabled, and `projection` lists the JSON paths
+    the warehouse reads, kept in the NDJSON when `BLING_PROJECTION=dbt`.
+    """
+
+    name: str
+    list_endpoint: str
+    output_path: str
+    detail_endpoint: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=lambda: {"limite": 100})
+    partition_keys: Tuple[str, ...] = ()
+    partition_field: Optional[str] = None
+    records_key: str = "data"
+    total_key: str = "total_records"
+    label: str = "registros"
+    separators: Optional[Tuple[str, str]] = None
+    paginated: bool = True
+    parquet_tables: Tuple[Any, ...] = ()
+    model: Optional[type] = None
+    projection: Tuple[str, ...] = ()
+
+    def build_params(self, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {**self.params, **(overrides or {})}
+
+    def partition(self, params: Optional[Dict[str, Any]] = None) -> str:
+        partition = next((params[key] for key in self.partition_keys if params and params.get(key)), None)
+        return partition or "unknown_date"
+
+    def blob_name(self, params: Optional[Dict[str, Any]] = None) -> str:
+        return self.output_path.format(partition=self.partition(params))
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import socket
+import time
+
+from google.api_core import exceptions
+from google.cloud.storage import Bucket
+
+logger = logging.getLogger(__name__)
+
+class GcsLock:
+    """
+    Cross-process mutex backed by a GCS object created with `if_generation_match=0`.
+
+    Only one worker can create the object; the others poll until it is deleted.
+    A lock older than `ttl_seconds` is considered abandoned by a crashed worker
+    and is broken.
+    """
+
+    def __init__(self, storage_bucket: Bucket, blob_name: str, ttl_seconds: float = 120, poll_interval: float = 1.0, timeout: float = 600):
+        self.storage_bucket = storage_bucket
+        self.blob_name = blob_name
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._generation = None
+
+    def _owner(self) -> str:
+        return json.dumps({
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "task_index": os.getenv("CLOUD_RUN_TASK_INDEX"),
+            "acquired_at": datetime.now(timezone.utc).isoformat()
+        })
+
+    def _break_if_stale(self):
+        blob = self.storage_bucket.get_blob(self.blob_name)
+        if blob is None or blob.updated is None:
+            return
+
+        age = (datetime.now(timezone.utc) - blob.updated).total_seconds()
+        if age > self.ttl_seconds:
+            logger.warning(f"Lock gs://{self.storage_bucket.name}/{self.blob_name} abandonado há {age:.0f}s. Removendo.")
+            try:
+                blob.delete(if_generation_match=blob.generation)
+            except (exceptions.NotFound, exceptions.PreconditionFailed):
+                pass
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        blob = self.storage_bucket.blob(self.blob_name)
+
+        while True:
+            try:
+                blob.upload_from_string(self._owner(), content_type="application/json", if_generation_match=0)
+                self._generation = blob.generation
+                return
+            except exceptions.PreconditionFailed:
+                pass
+
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timeout aguardando o lock gs://{self.storage_bucket.name}/{self.blob_name}")
+
+            self._break_if_stale()
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        try:
+            self.storage_bucket.blob(self.blob_name).delete(if_generation_match=self._generation)
+        except (exceptions.NotFound, exceptions.PreconditionFailed):
+            logger.warning(f"Lock gs://{self.storage_bucket.name}/{self.blob_name} já havia sido liberado.")
+        finally:
+            self._generation = None
+
+    def __enter__(self) -> "GcsLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,141 @@
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from threading import Event, Thread
+import concurrent.futures
+import logging
+import queue
+import time
+
+from .bling_api_client import BlingClient
+from .codec import response_json
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+def combine_filters(*filters: Optional[Callable[[Dict[str, Any]], bool]]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    active = [row_filter for row_filter in filters if row_filter is not None]
+
+    if not active:
+        return None
+
+    return lambda row: all(row_filter(row) for row_filter in active)
+
+class PrefetchingLister:
+    """
+    Walks a paginated Bling listing with up to `prefetch_pages` pages in flight.
+
+    Pages are fetched speculatively under the client's shared rate limiter and
+    handed out in page order as `(page, ids)` through a bounded queue, so a
+    detail-fetch stage can consume IDs while later pages are still being listed.
+    Listing stops at the first short or empty page; pages requested beyond it are
+    discarded. `id_filter` decides, per listing row, whether it is emitted, and
+    `select` maps each emitted row to what is handed out (its ID by default).
+    """
+
+    def __init__(
+        self,
+        client: BlingClient,
+        endpoint: str,
+        initial_params: Dict[str, Any],
+        prefetch_pages: int = 3,
+        queue_size: int = 10,
+        id_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        select: Callable[[Dict[str, Any]], Any] = lambda row: row['id']
+    ):
+        self.client = client
+        self.endpoint = endpoint
+        self.initial_params = initial_params
+        self.limit = initial_params.get('limite', 100)
+        self.prefetch_pages = max(1, prefetch_pages)
+        self.id_filter = id_filter
+        self.select = select
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stop = Event()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[Thread] = None
+
+        self.pages_fetched = 0
+        self.pages_discarded = 0
+        self.ids_listed = 0
+        self.ids_emitted = 0
+        self.duration = 0.0
+
+    def _fetch_page(self, page: int) -> List[Dict[str, Any]]:
+        params = self.initial_params.copy()
+        params['pagina'] = page
+
+        response = self.client.get(endpoint=self.endpoint, params=params)
+        response.raise_for_status()
+
+        return response_json(response).get('data') or []
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        start_time = time.monotonic()
+        pending = deque()
+        next_page = 1
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.prefetch_pages) as pool:
+                try:
+                    while True:
+                        while len(pending) < self.prefetch_pages:
+                            pending.append((next_page, pool.submit(self._fetch_page, next_page)))
+                            next_page += 1
+
+                        page, future = pending.popleft()
+                        rows = future.result()
+                        self.pages_fetched += 1
+                        self.ids_listed += len(rows)
+
+                        ids = [self.select(row) for row in rows if self.id_filter is None or self.id_filter(row)]
+                        if ids:
+                            self.ids_emitted += len(ids)
+                            if not self._put((page, ids)):
+                                break
+
+                        if len(rows) < self.limit:
+                            break
+                finally:
+                    for _, future in pending:
+                        future.cancel()
+                    self.pages_discarded = len(pending)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.duration = time.monotonic() - start_time
+            METRICS.record_stage("listing", self.ids_listed, self.duration)
+            self._put(_DONE)
+
+    def __iter__(self) -> Iterator[Tuple[int, List[Any]]]:
+        self._thread = Thread(target=self._produce, name=f"lister-{self.endpoint}", daemon=True)
+        self._thread.start()
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            self._thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        logger.info(
+            f"Listagem de '{self.endpoint}': {self.ids_listed} IDs em {self.pages_fetched} páginas "
+            f"({self.pages_discarded} especulativas descartadas) em {self.duration:.2f} segundos"
+        )
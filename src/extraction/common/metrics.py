@@ -0,0 +1,205 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Optional, Tuple, Union
+import logging
+import os
+import re
+import tempfile
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def endpoint_template(endpoint: str) -> str:
+    """`pedidos/vendas/123` -> `pedidos/vendas/{id}`, so IDs do not become label values."""
+    return _NUMERIC_SEGMENT.sub("/{id}", endpoint.split("?", 1)[0].strip("/"))
+
+def _labels(**labels: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _render_labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    rendered = (f'{key}="{_escape(str(value))}"' for key, value in pairs)
+    return "{" + ",".join(rendered) + "}"
+
+class Metrics:
+    """
+    In-process registry for Bling request and pipeline stage metrics.
+
+    Request latency histograms and status counts are keyed by endpoint
+    template. `export` writes the Prometheus text format to a textfile
+    (node_exporter textfile collector / Cloud Run sidecar) and flushes the
+    OpenTelemetry mirror when one is enabled.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = Lock()
+
+        self._latency_buckets: Dict[Tuple, list] = defaultdict(lambda: [0] * len(self.buckets))
+        self._latency_sum: Dict[Tuple, float] = defaultdict(float)
+        self._latency_count: Dict[Tuple, int] = defaultdict(int)
+        self._requests: Dict[Tuple, int] = defaultdict(int)
+        self._retries: Dict[Tuple, int] = defaultdict(int)
+        self._bytes: Dict[Tuple, int] = defaultdict(int)
+        self._rate_limit_wait = 0.0
+        self._stage_records: Dict[Tuple, int] = defaultdict(int)
+        self._stage_seconds: Dict[Tuple, float] = defaultdict(float)
+
+        self._otel = None
+
+    def observe_request(self, endpoint: str, status: Union[int, str], seconds: float, response_bytes: int = 0):
+        """`status` is the HTTP status, or "error" for requests that failed without a response."""
+        template = endpoint_template(endpoint)
+        endpoint_labels = _labels(endpoint=template)
+
+        with self._lock:
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self._latency_buckets[endpoint_labels][index] += 1
+            self._latency_sum[endpoint_labels] += seconds
+            self._latency_count[endpoint_labels] += 1
+            self._requests[_labels(endpoint=template, status=str(status))] += 1
+            self._bytes[endpoint_labels] += response_bytes
+
+        if self._otel is not None:
+            attributes = {"endpoint": template, "status": str(status)}
+            self._otel["duration"].record(seconds, attributes)
+            self._otel["requests"].add(1, attributes)
+            self._otel["bytes"].add(response_bytes, {"endpoint": template})
+
+    def count_retry(self, endpoint: str, reason: str, amount: int = 1):
+        template = endpoint_template(endpoint)
+
+        with self._lock:
+            self._retries[_labels(endpoint=template, reason=reason)] += amount
+
+        if self._otel is not None:
+            self._otel["retries"].add(amount, {"endpoint": template, "reason": reason})
+
+    def add_rate_limit_wait(self, seconds: float):
+        if seconds <= 0:
+            return
+
+        with self._lock:
+            self._rate_limit_wait += seconds
+
+        if self._otel is not None:
+            self._otel["rate_limit_wait"].add(seconds)
+
+    def record_stage(self, stage: str, records: int, seconds: float):
+        stage_labels = _labels(stage=stage)
+
+        with self._lock:
+            self._stage_records[stage_labels] += records
+            self._stage_seconds[stage_labels] += seconds
+
+        if self._otel is not None:
+            self._otel["stage_records"].add(records, {"stage": stage})
+            if seconds > 0:
+                self._otel["stage_throughput"].set(records / seconds, {"stage": stage})
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            header("bling_request_duration_seconds", "histogram", "Latência das requisições à API do Bling.")
+            for labels, counts in sorted(self._latency_buckets.items()):
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"bling_request_duration_seconds_bucket{_render_labels(labels, le=str(bound))} {count}")
+                lines.append(f"bling_request_duration_seconds_bucket{_render_labels(labels, le='+Inf')} {self._latency_count[labels]}")
+                lines.append(f"bling_request_duration_seconds_sum{_render_labels(labels)} {self._latency_sum[labels]:.6f}")
+                lines.append(f"bling_request_duration_seconds_count{_render_labels(labels)} {self._latency_count[labels]}")
+
+            header("bling_requests_total", "counter", "Respostas da API do Bling por endpoint e status HTTP.")
+            for labels, value in sorted(self._requests.items()):
+                lines.append(f"bling_requests_total{_render_labels(labels)} {value}")
+
+            header("bling_request_retries_total", "counter", "Novas tentativas por endpoint e motivo.")
+            for labels, value in sorted(self._retries.items()):
+                lines.append(f"bling_request_retries_total{_render_labels(labels)} {value}")
+
+            header("bling_response_bytes_total", "counter", "Bytes baixados da API do Bling.")
+            for labels, value in sorted(self._bytes.items()):
+                lines.append(f"bling_response_bytes_total{_render_labels(labels)} {value}")
+
+            header("bling_rate_limiter_wait_seconds_total", "counter", "Tempo bloqueado esperando o rate limiter.")
+            lines.append(f"bling_rate_limiter_wait_seconds_total {self._rate_limit_wait:.6f}")
+
+            header("bling_stage_records_total", "counter", "Registros processados por etapa do pipeline.")
+            for labels, value in sorted(self._stage_records.items()):
+                lines.append(f"bling_stage_records_total{_render_labels(labels)} {value}")
+
+            header("bling_stage_records_per_second", "gauge", "Vazão média por etapa do pipeline.")
+            for labels, seconds in sorted(self._stage_seconds.items()):
+                throughput = self._stage_records[labels] / seconds if seconds > 0 else 0.0
+                lines.append(f"bling_stage_records_per_second{_render_labels(labels)} {throughput:.3f}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_textfile(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as handle:
+            handle.write(self.render_prometheus())
+        os.replace(handle.name, path)
+
+    def enable_otel(self, exporter: str, export_interval_ms: int = 60000):
+        """
+        Mirrors every measurement into OpenTelemetry instruments exported by
+        `console` or `otlp` (OTLP/HTTP; endpoint and headers come from the
+        standard OTEL_EXPORTER_OTLP_* variables).
+        """
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+
+        if exporter == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+            metric_exporter = OTLPMetricExporter()
+        elif exporter == "console":
+            metric_exporter = ConsoleMetricExporter()
+        else:
+            raise ValueError(f"Exportador OpenTelemetry inválido: {exporter}. Use 'otlp', 'console' ou 'none'.")
+
+        provider = MeterProvider(metric_readers=[PeriodicExportingMetricReader(metric_exporter, export_interval_millis=export_interval_ms)])
+        meter = provider.get_meter("bling_extraction")
+
+        self._otel = {
+            "provider": provider,
+            "duration": meter.create_histogram("bling.request.duration", unit="s", description="Latência das requisições à API do Bling."),
+            "requests": meter.create_counter("bling.requests", description="Respostas da API do Bling por endpoint e status HTTP."),
+            "retries": meter.create_counter("bling.request.retries", description="Novas tentativas por endpoint e motivo."),
+            "bytes": meter.create_counter("bling.response.bytes", unit="By", description="Bytes baixados da API do Bling."),
+            "rate_limit_wait": meter.create_counter("bling.rate_limiter.wait", unit="s", description="Tempo bloqueado esperando o rate limiter."),
+            "stage_records": meter.create_counter("bling.stage.records", description="Registros processados por etapa do pipeline."),
+            "stage_throughput": meter.create_gauge("bling.stage.throughput", unit="{record}/s", description="Vazão por etapa do pipeline.")
+        }
+
+    def export(self, textfile: Optional[str] = None):
+        textfile = textfile or config.BLING_METRICS_PROMETHEUS_TEXTFILE
+
+        if textfile:
+            self.write_prometheus_textfile(textfile)
+            logger.info(f"Métricas Prometheus salvas em {textfile}")
+
+        if self._otel is not None:
+            self._otel["provider"].force_flush()
+
+METRICS = Metrics()
+
+if config.BLING_METRICS_OTEL_EXPORTER != "none":
+    METRICS.enable_otel(config.BLING_METRICS_OTEL_EXPORTER, config.BLING_METRICS_OTEL_EXPORT_INTERVAL_MS)
@@ -0,0 +1,188 @@
+"""
+Typed, slotted record models for the Bling detail documents.
+
+Each model keeps only the fields that the dbt staging models
+(`stg_bling_sales_orders`, `stg_bling_order_items`, `stg_bling_products`,
+`stg_bling_products_components`) and the Parquet tables read. Attribute names
+mirror the Bling JSON keys, so `to_dict` rebuilds a `{"data": {...}}` document
+with the same paths the external tables query. With msgspec installed, bodies
+are decoded straight from bytes into the models and unknown fields are skipped
+without being materialized. Otherwise the stdlib/orjson dict is converted.
+
+With `keep_raw` the full document is kept in `raw` and written unchanged.
+"""
+from dataclasses import dataclass, field, fields, is_dataclass, make_dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin, get_type_hints
+
+from .codec import loads
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+Number = Union[int, float]
+
+class Model:
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        raw = getattr(self, "raw", None)
+        return raw if raw is not None else {"data": _dump(self)}
+
+@dataclass(slots=True)
+class Ref:
+    id: Optional[int] = None
+
+@dataclass(slots=True)
+class OrderItem:
+    id: Optional[int] = None
+    codigo: Optional[str] = None
+    quantidade: Optional[Number] = None
+    desconto: Optional[Number] = None
+    valor: Optional[Number] = None
+    descricao: Optional[str] = None
+    produto: Optional[Ref] = None
+
+@dataclass(slots=True)
+class OrderDiscount:
+    valor: Optional[Number] = None
+
+@dataclass(slots=True)
+class OrderFees:
+    taxaComissao: Optional[Number] = None
+    custoFrete: Optional[Number] = None
+    valorBase: Optional[Number] = None
+
+@dataclass(slots=True)
+class SalesOrder(Model):
+    id: Optional[int] = None
+    numero: Optional[int] = None
+    data: Optional[str] = None
+    dataSaida: Optional[str] = None
+    dataPrevista: Optional[str] = None
+    totalProdutos: Optional[Number] = None
+    total: Optional[Number] = None
+    contato: Optional[Ref] = None
+    situacao: Optional[Ref] = None
+    loja: Optional[Ref] = None
+    desconto: Optional[OrderDiscount] = None
+    itens: List[OrderItem] = field(default_factory=list)
+    taxas: Optional[OrderFees] = None
+    raw: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+@dataclass(slots=True)
+class SupplierContact:
+    nome: Optional[str] = None
+
+@dataclass(slots=True)
+class Supplier:
+    contato: Optional[SupplierContact] = None
+    codigo: Optional[str] = None
+    precoCusto: Optional[Number] = None
+    precoCompra: Optional[Number] = None
+
+@dataclass(slots=True)
+class ProductComponent:
+    produto: Optional[Ref] = None
+    quantidade: Optional[Number] = None
+
+@dataclass(slots=True)
+class ProductStructure:
+    componentes: List[ProductComponent] = field(default_factory=list)
+
+@dataclass(slots=True)
+class Product(Model):
+    id: Optional[int] = None
+    nome: Optional[str] = None
+    codigo: Optional[str] = None
+    preco: Optional[Number] = None
+    situacao: Optional[str] = None
+    formato: Optional[str] = None
+    marca: Optional[str] = None
+    categoria: Optional[Ref] = None
+    fornecedor: Optional[Supplier] = None
+    estrutura: Optional[ProductStructure] = None
+    raw: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+def _dump(value: Any) -> Any:
+    if is_dataclass(value):
+        return {item.name: _dump(getattr(value, item.name)) for item in fields(value) if item.name != "raw"}
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+@lru_cache(maxsize=None)
+def _field_types(cls) -> Dict[str, Any]:
+    return {name: hint for name, hint in get_type_hints(cls).items() if name != "raw"}
+
+def _build(hint: Any, value: Any) -> Any:
+    if value is None:
+        return None
+
+    if get_origin(hint) is Union:
+        nested = [arg for arg in get_args(hint) if is_dataclass(arg) or get_origin(arg) is list]
+        return _build(nested[0], value) if nested else value
+
+    if get_origin(hint) in (list, List):
+        (item_hint,) = get_args(hint)
+        return [_build(item_hint, item) for item in value] if isinstance(value, list) else []
+
+    if is_dataclass(hint):
+        if not isinstance(value, dict):
+            return None
+        return hint(**{name: _build(item_hint, value[name]) for name, item_hint in _field_types(hint).items() if name in value})
+
+    return value
+
+def from_dict(cls, document: Dict[str, Any], keep_raw: bool = False):
+    """Builds a model from an already parsed `{"data": {...}}` document."""
+    record = _build(cls, document.get("data") if isinstance(document, dict) else None) or cls()
+    if keep_raw:
+        record.raw = document
+    return record
+
+class RecordDecoder:
+    """
+    Turns a detail response body into a model. Bodies msgspec rejects (e.g. a
+    string where a number is declared) fall back to the lenient dict path, so
+    decoding never fails where `codec.loads` would succeed.
+    """
+
+    def __init__(self, cls, keep_raw: bool = False):
+        self.cls = cls
+        self.keep_raw = keep_raw
+        self._decoder = None
+
+        if msgspec is not None:
+            envelope = make_dataclass(f"{cls.__name__}Envelope", [("data", Optional[cls], None)], slots=True)
+            self._decoder = msgspec.json.Decoder(envelope)
+
+    def __call__(self, body: bytes) -> Model:
+        if self._decoder is not None:
+            try:
+                record = self._decoder.decode(body).data or self.cls()
+            except msgspec.ValidationError:
+                pass
+            else:
+                if self.keep_raw:
+                    record.raw = loads(body)
+                return record
+
+        return from_dict(self.cls, loads(body), keep_raw=self.keep_raw)
+
+def record_decoder(model: Optional[type], typed: bool, keep_raw: bool = False) -> Callable[[bytes], Any]:
+    """Decoder for detail bodies: the typed model when enabled, otherwise a plain dict."""
+    if model is None or not typed:
+        return loads
+    return RecordDecoder(model, keep_raw=keep_raw)
+
+def as_record(record: Any) -> Dict[str, Any]:
+    """The `{"data": {...}}` dict of a model, or the record itself when it is already a dict."""
+    return record.to_dict() if isinstance(record, Model) else record
+
+def record_id(record: Any) -> Any:
+    if isinstance(record, Model):
+        return record.id
+    return (record.get("data") or {}).get("id")
@@ -0,0 +1,301 @@
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import io
+import logging
+import os
+import struct
+import sys
+import zlib
+from threading import Lock
+
+from google.cloud.storage import Bucket
+
+from . import config
+from .codec import dumps
+from .gcs_lock import GcsLock
+from .models import as_record, record_id
+from .partitioned_sink import UNKNOWN_PARTITION, partition_value
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BLOI1"
+HEADER = struct.Struct("<5sQ")
+CONTENT_TYPE = "application/octet-stream"
+
+def content_hash(record: Any) -> int:
+    """64-bit BLAKE2 digest of the record's compact JSON, as an unsigned integer."""
+    encoded = dumps(as_record(record), separators=(',', ':'))
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+def _day_number(partition: str) -> int:
+    try:
+        return date.fromisoformat(partition).toordinal()
+    except ValueError:
+        return 0
+
+def _day(number: int) -> str:
+    return date.fromordinal(number).isoformat() if number else UNKNOWN_PARTITION
+
+class OrderIndex:
+    """
+    Compact, persistent index of every order already written to bronze:
+    order ID → (partition day, content hash, last seen day).
+
+    Entries are kept as four parallel arrays sorted by ID (28 bytes per order)
+    and searched with bisect; the observations of the current run are buffered
+    in a dict and merged into the arrays when the index is saved. `observe`
+    tells whether an order is new or changed and therefore has to be written.
+    The index is persisted as a zlib-compressed binary object in GCS or on the
+    local filesystem.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._partitions = array("i")
+        self._hashes = array("Q")
+        self._last_seen = array("i")
+        self._updates: Dict[int, Tuple[int, int, int]] = {}
+        self._lock = Lock()
+
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.moved = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids) + sum(1 for order_id in self._updates if self._position(order_id) < 0)
+
+    def _position(self, order_id: int) -> int:
+        index = bisect_left(self._ids, order_id)
+        return index if index < len(self._ids) and self._ids[index] == order_id else -1
+
+    def _entry(self, order_id: int) -> Optional[Tuple[int, int, int]]:
+        entry = self._updates.get(order_id)
+        if entry is not None:
+            return entry
+
+        position = self._position(order_id)
+        if position < 0:
+            return None
+        return self._partitions[position], self._hashes[position], self._last_seen[position]
+
+    def lookup(self, order_id: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entry(int(order_id))
+
+        if entry is None:
+            return None
+
+        partition, digest, last_seen = entry
+        return {"partition": _day(partition), "content_hash": f"{digest:016x}", "last_seen": _day(last_seen)}
+
+    def observe(self, order_id: Any, digest: int, partition: str) -> Tuple[bool, Optional[str]]:
+        """
+        Records that `order_id` was seen with content `digest` in `partition`.
+        Returns whether it is new or changed, and its previous partition when
+        the order moved to another one.
+        """
+        order_id = int(order_id)
+        day = _day_number(partition)
+        today = datetime.now(timezone.utc).date().toordinal()
+
+        with self._lock:
+            previous = self._entry(order_id)
+            self._updates[order_id] = (day, digest, today)
+
+            if previous is None:
+                self.new += 1
+                return True, None
+
+            if previous[1] == digest and previous[0] == day:
+                self.unchanged += 1
+                return False, None
+
+            self.changed += 1
+            if previous[0] != day:
+                self.moved += 1
+                return True, _day(previous[0])
+            return True, None
+
+    def _compact(self):
+        if not self._updates:
+            return
+
+        ids, partitions, hashes, last_seen = array("q"), array("i"), array("Q"), array("i")
+        start = 0
+
+        for order_id, (partition, digest, seen) in sorted(self._updates.items()):
+            position = bisect_left(self._ids, order_id, start)
+            ids.extend(self._ids[start:position])
+            partitions.extend(self._partitions[start:position])
+            hashes.extend(self._hashes[start:position])
+            last_seen.extend(self._last_seen[start:position])
+
+            ids.append(order_id)
+            partitions.append(partition)
+            hashes.append(digest)
+            last_seen.append(seen)
+
+            start = position + 1 if position < len(self._ids) and self._ids[position] == order_id else position
+
+        ids.extend(self._ids[start:])
+        partitions.extend(self._partitions[start:])
+        hashes.extend(self._hashes[start:])
+        last_seen.extend(self._last_seen[start:])
+
+        self._ids, self._partitions, self._hashes, self._last_seen = ids, partitions, hashes, last_seen
+        self._updates = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "distinct_orders": len(self),
+            "new": self.new,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "moved": self.moved
+        }
+
+    def _columns(self) -> List[array]:
+        return [self._ids, self._partitions, self._hashes, self._last_seen]
+
+    def _load_bytes(self, payload: bytes):
+        """Replaces the stored entries with `payload`, keeping this run's observations on top of them."""
+        payload = zlib.decompress(payload)
+        magic, count = HEADER.unpack_from(payload)
+        if magic != MAGIC:
+            raise ValueError(f"Índice de pedidos com formato desconhecido: {magic!r}")
+
+        offset = HEADER.size
+        columns = [array(column.typecode) for column in self._columns()]
+        for column in columns:
+            size = count * column.itemsize
+            column.frombytes(payload[offset:offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            offset += size
+
+        with self._lock:
+            self._ids, self._partitions, self._hashes, self._last_seen = columns
+
+    def _dump_bytes(self) -> bytes:
+        with self._lock:
+            self._compact()
+            stream = io.BytesIO()
+            stream.write(HEADER.pack(MAGIC, len(self._ids)))
+            for column in self._columns():
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                stream.write(column.tobytes())
+        return zlib.compress(stream.getvalue(), 6)
+
+    def load_file(self, path: str) -> "OrderIndex":
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                self._load_bytes(file.read())
+        return self
+
+    def save_file(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self._dump_bytes())
+        os.replace(tmp_path, path)
+
+    def load_blob(self, storage_bucket: Bucket, blob_name: str) -> "OrderIndex":
+        blob = storage_bucket.blob(blob_name)
+        if blob.exists():
+            self._load_bytes(blob.download_as_bytes())
+        return self
+
+    def save_blob(self, storage_bucket: Bucket, blob_name: str):
+        storage_bucket.blob(blob_name).upload_from_string(self._dump_bytes(), content_type=CONTENT_TYPE)
+
+class IndexingSink:
+    """
+    Sink wrapper that forwards only the records the OrderIndex reports as new
+    or changed. Orders whose partition changed are passed to `on_move` with
+    their previous partition, so the old copy can be dropped.
+    """
+
+    def __init__(self, sink, order_index: OrderIndex, partition_field: str, on_move: Optional[Callable[[str, Any], None]] = None):
+        self.sink = sink
+        self.order_index = order_index
+        self.partition_field = partition_field
+        self.on_move = on_move
+
+    def __enter__(self) -> "IndexingSink":
+        self.sink.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.sink.__exit__(exc_type, exc, tb)
+
+    def _admit(self, record: Any) -> bool:
+        order_id = record_id(record)
+        if order_id is None:
+            return True
+
+        changed, previous_partition = self.order_index.observe(
+            order_id, content_hash(record), partition_value(record, self.partition_field)
+        )
+        if previous_partition is not None and self.on_move is not None:
+            self.on_move(previous_partition, order_id)
+        return changed
+
+    def write(self, record: Dict[str, Any]):
+        if self._admit(record):
+            self.sink.write(record)
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.sink.write_batch(batch_name, [record for record in records if self._admit(record)], failed_ids)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        self.sink.close(metadata)
+
+    def abort(self):
+        self.sink.abort()
+
+def order_index_location(entity: str) -> str:
+    return f"{config.BLING_ORDER_INDEX_PREFIX}/{entity}_index.bin.z"
+
+def load_order_index(storage_bucket: Bucket, entity: str) -> OrderIndex:
+    location = order_index_location(entity)
+    if config.BLING_ORDER_INDEX_LOCAL_DIR:
+        return OrderIndex().load_file(os.path.join(config.BLING_ORDER_INDEX_LOCAL_DIR, location))
+    return OrderIndex().load_blob(storage_bucket, location)
+
+def open_order_index(storage_bucket: Bucket, entity: str) -> Optional[OrderIndex]:
+    if not config.BLING_ORDER_INDEX_ENABLED:
+        return None
+
+    order_index = load_order_index(storage_bucket, entity)
+    logger.info(f"Índice de pedidos '{entity}' carregado com {len(order_index)} pedidos distintos")
+    return order_index
+
+def persist_order_index(order_index: Optional[OrderIndex], storage_bucket: Bucket, entity: str):
+    """
+    Saves the index. In GCS, parallel tasks update the same object, so the
+    latest version is reloaded under a lock and this run's observations are
+    merged on top of it before writing.
+    """
+    if order_index is None:
+        return
+
+    location = order_index_location(entity)
+    if config.BLING_ORDER_INDEX_LOCAL_DIR:
+        order_index.save_file(os.path.join(config.BLING_ORDER_INDEX_LOCAL_DIR, location))
+    else:
+        with GcsLock(storage_bucket, f"{location}.lock"):
+            order_index.load_blob(storage_bucket, location)
+            order_index.save_blob(storage_bucket, location)
+
+    logger.info(f"Índice de pedidos '{entity}': {order_index.stats()}")
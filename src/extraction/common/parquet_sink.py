@@ -0,0 +1,248 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import json
+import logging
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud.storage import Bucket
+
+from . import config
+from .models import as_record
+
+logger = logging.getLogger(__name__)
+
+NUMERIC = pa.decimal128(38, 9)
+NUMERIC_SCALE = Decimal("0.000000001")
+
+def to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def to_numeric(value: Any) -> Optional[Decimal]:
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value)).quantize(NUMERIC_SCALE)
+    except (InvalidOperation, ValueError):
+        return None
+
+def to_date(value: Any) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)[:10]) if value else None
+    except ValueError:
+        return None
+
+def nested_id(data: Dict[str, Any], key: str) -> Optional[int]:
+    return to_int((data.get(key) or {}).get("id"))
+
+@dataclass(frozen=True)
+class ParquetTable:
+    """
+    One flattened Parquet output: an Arrow schema, the function that turns a
+    raw API record into zero or more rows of that schema, and the output path
+    (with the same `{partition}` placeholder as the NDJSON path). The partition
+    and key columns are used when the table is loaded into BigQuery.
+    """
+
+    name: str
+    schema: pa.Schema
+    flatten: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]]
+    output_path: str
+    partition_column: str = "order_date"
+    key_column: str = "order_id"
+
+    def blob_name(self, partition: str) -> str:
+        return self.output_path.format(partition=partition)
+
+ORDERS_SCHEMA = pa.schema([
+    ("order_id", pa.int64()),
+    ("order_number", pa.int64()),
+    ("order_date", pa.date32()),
+    ("dispatch_date", pa.date32()),
+    ("estimated_delivery_date", pa.date32()),
+    ("total_products_value", NUMERIC),
+    ("total_order_value", NUMERIC),
+    ("client_id", pa.int64()),
+    ("status_id", pa.int64()),
+    ("sale_channel_id", pa.int64()),
+    ("order_discount_value", NUMERIC),
+    ("order_commission_fee", NUMERIC),
+    ("order_shipping_cost", NUMERIC),
+    ("base_value", NUMERIC)
+])
+
+ORDER_ITEMS_SCHEMA = pa.schema([
+    ("order_id", pa.int64()),
+    ("order_date", pa.date32()),
+    ("item_id", pa.int64()),
+    ("product_id", pa.int64()),
+    ("product_code", pa.string()),
+    ("description", pa.string()),
+    ("quantity", pa.float64()),
+    ("order_unit_price", NUMERIC),
+    ("item_discount", NUMERIC)
+])
+
+def flatten_order(record: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    data = record.get("data") or {}
+    taxas = data.get("taxas") or {}
+
+    yield {
+        "order_id": to_int(data.get("id")),
+        "order_number": to_int(data.get("numero")),
+        "order_date": to_date(data.get("data")),
+        "dispatch_date": to_date(data.get("dataSaida")),
+        "estimated_delivery_date": to_date(data.get("dataPrevista")),
+        "total_products_value": to_numeric(data.get("totalProdutos")),
+        "total_order_value": to_numeric(data.get("total")),
+        "client_id": nested_id(data, "contato"),
+        "status_id": nested_id(data, "situacao"),
+        "sale_channel_id": nested_id(data, "loja"),
+        "order_discount_value": to_numeric((data.get("desconto") or {}).get("valor")),
+        "order_commission_fee": to_numeric(taxas.get("taxaComissao")),
+        "order_shipping_cost": to_numeric(taxas.get("custoFrete")),
+        "base_value": to_numeric(taxas.get("valorBase"))
+    }
+
+def flatten_order_items(record: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    data = record.get("data") or {}
+    order_id = to_int(data.get("id"))
+    order_date = to_date(data.get("data"))
+
+    for item in data.get("itens") or []:
+        yield {
+            "order_id": order_id,
+            "order_date": order_date,
+            "item_id": to_int(item.get("id")),
+            "product_id": nested_id(item, "produto"),
+            "product_code": item.get("codigo"),
+            "description": item.get("descricao"),
+            "quantity": to_float(item.get("quantidade")),
+            "order_unit_price": to_numeric(item.get("valor")),
+            "item_discount": to_numeric(item.get("desconto"))
+        }
+
+SALES_ORDER_TABLES = (
+    ParquetTable("orders", ORDERS_SCHEMA, flatten_order, "columnar/sales_orders/dt={partition}/sales_orders.parquet"),
+    ParquetTable("order_items", ORDER_ITEMS_SCHEMA, flatten_order_items, "columnar/order_items/dt={partition}/order_items.parquet")
+)
+
+class ParquetSink:
+    """
+    Flattens raw records into typed Arrow record batches and streams them to
+    one zstd-compressed Parquet object per table.
+
+    Rows are buffered until `row_group_size` and then written as a row group,
+    so memory is bounded by one row group per table. The extraction metadata is
+    stored in the Parquet key-value metadata when the sink is closed.
+    """
+
+    CONTENT_TYPE = "application/vnd.apache.parquet"
+
+    def __init__(
+        self,
+        storage_bucket: Bucket,
+        tables: Iterable[ParquetTable],
+        partition: str,
+        row_group_size: int = None,
+        compression: str = None,
+        chunk_size: int = None
+    ):
+        self.storage_bucket = storage_bucket
+        self.tables = tuple(tables)
+        self.partition = partition
+        self.row_group_size = row_group_size or config.BLING_PARQUET_ROW_GROUP_SIZE
+        self.compression = compression or config.BLING_PARQUET_COMPRESSION
+        self.chunk_size = chunk_size or config.GCS_UPLOAD_CHUNK_SIZE
+
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {table.name: [] for table in self.tables}
+        self._files: Dict[str, Any] = {}
+        self._writers: Dict[str, pq.ParquetWriter] = {}
+        self._closed = False
+
+        self.rows_written: Dict[str, int] = {table.name: 0 for table in self.tables}
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._closed:
+            return
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _writer(self, table: ParquetTable) -> pq.ParquetWriter:
+        if table.name not in self._writers:
+            blob = self.storage_bucket.blob(table.blob_name(self.partition))
+            self._files[table.name] = blob.open("wb", chunk_size=self.chunk_size, content_type=self.CONTENT_TYPE)
+            self._writers[table.name] = pq.ParquetWriter(self._files[table.name], table.schema, compression=self.compression)
+        return self._writers[table.name]
+
+    def _flush(self, table: ParquetTable):
+        rows = self._buffers[table.name]
+        if not rows:
+            return
+
+        self._writer(table).write_batch(pa.RecordBatch.from_pylist(rows, schema=table.schema))
+        self.rows_written[table.name] += len(rows)
+        self._buffers[table.name] = []
+
+    def uri(self, table: ParquetTable) -> str:
+        return f"gs://{self.storage_bucket.name}/{table.blob_name(self.partition)}"
+
+    def write(self, record: Dict[str, Any]):
+        record = as_record(record)
+        for table in self.tables:
+            rows = self._buffers[table.name]
+            rows.extend(table.flatten(record))
+            if len(rows) >= self.row_group_size:
+                self._flush(table)
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.write_many(records)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        self._closed = True
+
+        for table in self.tables:
+            self._flush(table)
+
+            writer = self._writers.pop(table.name, None)
+            if writer is None:
+                continue
+
+            if metadata is not None:
+                writer.add_key_value_metadata({"bling_extraction_metadata": json.dumps(metadata, ensure_ascii=False, default=str)})
+            writer.close()
+            self._files.pop(table.name).close()
+
+            logger.info(
+                f"Salvas {self.rows_written[table.name]} linhas em: "
+                f"gs://{self.storage_bucket.name}/{table.blob_name(self.partition)}"
+            )
+
+    def abort(self):
+        self._closed = True
+
+        if self._writers:
+            logger.warning(f"Escrita Parquet de {list(self._writers)} abandonada após erro.")
+        self._writers.clear()
+        self._files.clear()
@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, IO, Iterable, List, Optional, Set, Tuple
+import logging
+import os
+import shutil
+import tempfile
+
+from google.api_core import exceptions
+from google.cloud.storage import Bucket
+
+from . import config
+from .codec import dumps, loads
+from .compression import compressed_blob_name, content_type_for, decompress_bytes, normalize_compression, open_compressed_writer
+from .models import Model, record_id
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_PARTITION = "unknown_date"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def partition_value(record: Any, path: str) -> str:
+    """
+    The YYYY-MM-DD partition of a record from the dotted `path` of its
+    document (e.g. `data.data`), or `unknown_date` when it is missing or not a
+    valid date. Typed models are read by attribute, without rebuilding the dict.
+    """
+    segments = path.split(".")
+    value = record
+
+    if isinstance(record, Model):
+        segments = segments[1:]
+
+    for segment in segments:
+        value = value.get(segment) if isinstance(value, dict) else getattr(value, segment, None)
+        if value is None:
+            return UNKNOWN_PARTITION
+
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        return UNKNOWN_PARTITION
+
+class PartitionedNdjsonSink:
+    """
+    Routes each record to the NDJSON object of its own partition, the date at
+    `partition_field` (e.g. `raw/sales_data/dt=<order date>/...`), instead of
+    writing the whole run under a single partition.
+
+    Lines are spooled to one local file per partition and at most
+    `max_open_partitions` of them are open at a time; the least recently used
+    is closed and reopened in append mode when its partition shows up again.
+    On `close` every affected partition is uploaded in one piece, so GCS swaps
+    the object atomically when the upload is finalized and readers never see a
+    half-written day. Every day inside `replace_range` (the days a date-window
+    run fully covers) is replaced, and removed when the run found no orders on
+    it; any other partition (alteration-date runs, orders dated outside the
+    window) is merged, carrying over the lines of the existing object whose IDs
+    were not extracted again. A merge only writes over the object generation it
+    read, so a concurrent writer makes it read and merge again. Each object ends
+    with the run metadata plus its own partition and record count. IDs passed
+    to `discard` are also dropped from their partition's existing object.
+    """
+
+    CONTENT_TYPE = "application/x-ndjson"
+    MERGE_ATTEMPTS = 5
+
+    def __init__(
+        self,
+        storage_bucket: Bucket,
+        output_path: str,
+        partition_field: str,
+        replace_range: Optional[Tuple[str, str]] = None,
+        separators: Optional[Tuple[str, str]] = (',', ':'),
+        compression: str = None,
+        max_open_partitions: int = None,
+        chunk_size: int = None
+    ):
+        self.storage_bucket = storage_bucket
+        self.output_path = output_path
+        self.partition_field = partition_field
+        self.replace_range = replace_range
+        self.separators = separators
+        self.compression = normalize_compression(config.BLING_NDJSON_COMPRESSION if compression is None else compression)
+        self.content_type = content_type_for(self.compression, self.CONTENT_TYPE)
+        self.max_open_partitions = max(1, max_open_partitions or config.BLING_PARTITION_MAX_OPEN)
+        self.chunk_size = chunk_size or config.GCS_UPLOAD_CHUNK_SIZE
+
+        self.records_written = 0
+        self.partition_records: Dict[str, int] = {}
+        self.reopened = 0
+
+        self._ids: Dict[str, Set[Any]] = {}
+        self._discarded: Dict[str, Set[Any]] = {}
+        self._handles: "OrderedDict[str, IO[bytes]]" = OrderedDict()
+        self._spool_dir = None
+        self._closed = False
+
+    def __enter__(self) -> "PartitionedNdjsonSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._closed:
+            return
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def blob_name(self, partition: str) -> str:
+        return compressed_blob_name(self.output_path.format(partition=partition), self.compression)
+
+    def _spool_path(self, partition: str) -> str:
+        return os.path.join(self._spool_dir, f"{partition}.ndjson")
+
+    def _handle(self, partition: str) -> IO[bytes]:
+        handle = self._handles.pop(partition, None)
+
+        if handle is None:
+            if self._spool_dir is None:
+                self._spool_dir = tempfile.mkdtemp(prefix="bling-partitions-")
+
+            while len(self._handles) >= self.max_open_partitions:
+                _, evicted = self._handles.popitem(last=False)
+                evicted.close()
+
+            if partition in self.partition_records:
+                self.reopened += 1
+            handle = open(self._spool_path(partition), "ab")
+
+        self._handles[partition] = handle
+        return handle
+
+    def write(self, record: Dict[str, Any]):
+        partition = partition_value(record, self.partition_field)
+        handle = self._handle(partition)
+
+        if self.partition_records.get(partition):
+            handle.write(b"\n")
+        handle.write(dumps(record, self.separators))
+
+        self.partition_records[partition] = self.partition_records.get(partition, 0) + 1
+        self._ids.setdefault(partition, set()).add(record_id(record))
+        self.records_written += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.write_many(records)
+
+    def discard(self, partition: str, object_id: Any):
+        """Removes `object_id` from `partition`'s existing object, e.g. an order whose date changed."""
+        self._discarded.setdefault(partition, set()).add(object_id)
+
+    def _replaces(self, partition: str) -> bool:
+        return self.replace_range is not None and self.replace_range[0] <= partition <= self.replace_range[1]
+
+    def _replaced_days(self) -> List[str]:
+        if self.replace_range is None:
+            return []
+
+        start, end = (date.fromisoformat(day[:10]) for day in self.replace_range)
+        return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+    def _carried_lines(self, partition: str) -> Tuple[List[bytes], int]:
+        """Lines kept from the existing object and its generation (0 when there is none)."""
+        blob = self.storage_bucket.get_blob(self.blob_name(partition))
+        if blob is None:
+            return [], 0
+
+        superseded = self._ids.get(partition, set()) | self._discarded.get(partition, set())
+        carried = []
+
+        payload = blob.download_as_bytes(if_generation_match=blob.generation)
+        for line in decompress_bytes(payload, self.compression).splitlines():
+            if not line.strip():
+                continue
+            document = loads(line)
+            if "metadata" in document or record_id(document) in superseded:
+                continue
+            carried.append(line)
+
+        return carried, blob.generation
+
+    def _upload(self, partition: str, metadata: Optional[Dict[str, Any]]) -> int:
+        if self._replaces(partition):
+            return self._write(partition, metadata, [], None)
+
+        for attempt in range(1, self.MERGE_ATTEMPTS + 1):
+            try:
+                carried, generation = self._carried_lines(partition)
+                return self._write(partition, metadata, carried, generation)
+            except (exceptions.PreconditionFailed, exceptions.NotFound):
+                if attempt == self.MERGE_ATTEMPTS:
+                    raise
+                logger.warning(
+                    f"Partição {partition} alterada por outra execução durante o merge. "
+                    f"Relendo (tentativa {attempt + 1}/{self.MERGE_ATTEMPTS})."
+                )
+
+    def _write(self, partition: str, metadata: Optional[Dict[str, Any]], carried: List[bytes], generation: Optional[int]) -> int:
+        """Writes the partition; with a `generation`, only over that version of the object."""
+        records = self.partition_records.get(partition, 0)
+        blob = self.storage_bucket.blob(self.blob_name(partition))
+        preconditions = {} if generation is None else {"if_generation_match": generation}
+
+        if not carried and not records:
+            if generation is None:
+                if blob.exists():
+                    blob.delete()
+            elif generation:
+                blob.delete(**preconditions)
+            return 0
+
+        writer = open_compressed_writer(
+            blob.open("wb", chunk_size=self.chunk_size, content_type=self.content_type, **preconditions),
+            self.compression
+        )
+
+        writer.write(b"\n".join(carried))
+
+        if records:
+            if carried:
+                writer.write(b"\n")
+            with open(self._spool_path(partition), "rb") as spool:
+                shutil.copyfileobj(spool, writer, COPY_BUFFER_SIZE)
+
+        if metadata is not None:
+            partition_metadata = {**metadata, "partition": partition, "partition_records": records + len(carried)}
+            writer.write(b"\n" + dumps({"metadata": partition_metadata}))
+
+        writer.close()
+        return len(carried)
+
+    def _release(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+        if self._spool_dir is not None:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            self._spool_dir = None
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        self._closed = True
+
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+        partitions = sorted(set(self.partition_records) | set(self._discarded) | set(self._replaced_days()))
+
+        if not partitions:
+            logger.warning(f"Nenhum registro escrito. Nenhuma partição de gs://{self.storage_bucket.name}/{self.output_path} foi criada.")
+            self._release()
+            return
+
+        try:
+            for partition in partitions:
+                carried = self._upload(partition, metadata)
+                logger.debug(
+                    f"Partição {partition}: {self.partition_records.get(partition, 0)} registros novos"
+                    f"{f', {carried} mantidos do objeto anterior' if carried else ''} em "
+                    f"gs://{self.storage_bucket.name}/{self.blob_name(partition)}"
+                )
+        finally:
+            self._release()
+
+        logger.info(
+            f"Salvos {self.records_written} registros em {len(partitions)} partições ({partitions[0]} a {partitions[-1]}) de: "
+            f"gs://{self.storage_bucket.name}/{self.output_path.format(partition='*')}"
+        )
+
+    def abort(self):
+        self._closed = True
+
+        if self.partition_records:
+            logger.warning(f"Escrita particionada de gs://{self.storage_bucket.name}/{self.output_path} abandonada após erro.")
+        self._release()
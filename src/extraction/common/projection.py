@@ -0,0 +1,132 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+import re
+
+from .models import as_record
+
+KEEP = True
+
+def _segments(path: str) -> List[str]:
+    return [segment[:-2] if segment.endswith("[]") else segment for segment in path.strip().split(".") if segment]
+
+class Projection:
+    """
+    Prunes records to a declarative list of JSON paths before serialization.
+
+    A path such as `data.taxas.valorBase` keeps that leaf; `data.taxas` or
+    `data.taxas.*` keeps the whole subtree. Lists are traversed element-wise,
+    so `data.itens[].produto.id` and `data.itens.produto.id` are equivalent.
+    Kept keys stay in the source order and absent keys are simply omitted, so
+    a projected line reads exactly like the full one for every kept path.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = tuple(sorted({path.strip() for path in paths if path and path.strip()}))
+        self.tree: Dict[str, Any] = {}
+
+        for path in self.paths:
+            node = self.tree
+            segments = _segments(path)
+            for index, segment in enumerate(segments):
+                last = index == len(segments) - 1 or segments[index + 1] == "*"
+                if node.get(segment) is KEEP:
+                    break
+                if last:
+                    node[segment] = KEEP
+                    break
+                node = node.setdefault(segment, {})
+
+    def _apply(self, value: Any, node: Any) -> Any:
+        if node is KEEP:
+            return value
+        if isinstance(value, dict):
+            return {key: self._apply(item, node[key]) for key, item in value.items() if key in node}
+        if isinstance(value, list):
+            return [self._apply(item, node) for item in value]
+        return value
+
+    def apply(self, record: Any) -> Dict[str, Any]:
+        return self._apply(as_record(record), self.tree)
+
+class ProjectingSink:
+    """Sink wrapper that applies a Projection to every record before forwarding it."""
+
+    def __init__(self, sink, projection: Projection):
+        self.sink = sink
+        self.projection = projection
+
+    def __enter__(self) -> "ProjectingSink":
+        self.sink.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.sink.__exit__(exc_type, exc, tb)
+
+    def write(self, record: Dict[str, Any]):
+        self.sink.write(self.projection.apply(record))
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.sink.write_batch(batch_name, [self.projection.apply(record) for record in records], failed_ids)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        if metadata is not None:
+            metadata = {**metadata, "projection": list(self.projection.paths)}
+        self.sink.close(metadata)
+
+    def abort(self):
+        self.sink.abort()
+
+def build_projection(mode: str, declared: Tuple[str, ...], extra_paths: Iterable[str] = ()) -> Optional[Projection]:
+    """`full` keeps whole documents; `dbt` keeps the entity's declared warehouse paths plus `extra_paths`."""
+    mode = (mode or "full").lower()
+
+    if mode == "full" or not declared:
+        return None
+    if mode != "dbt":
+        raise ValueError(f"BLING_PROJECTION inválido: {mode!r}. Use full ou dbt.")
+
+    return Projection((*declared, *extra_paths))
+
+_SOURCE = re.compile(r"source\(\s*'[^']+'\s*,\s*'([^']+)'\s*\)")
+_UNNEST = re.compile(r"UNNEST\(\s*([\w.]+)\s*\)\s+AS\s+(\w+)", re.IGNORECASE)
+_DOTTED = re.compile(r"\b([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+)\b")
+
+def paths_from_dbt_sql(sql: str, root: str = "data") -> List[str]:
+    """JSON paths under `root` that a dbt model reads, resolving UNNEST aliases (`item.valor` → `data.itens[].valor`)."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+
+    aliases, unnested = {}, set()
+    for expression, alias in _UNNEST.findall(sql):
+        segments = expression.split(".")
+        if root in segments:
+            unnested.add(".".join(segments[segments.index(root):]))
+            aliases[alias] = ".".join(segments[segments.index(root):]) + "[]"
+
+    paths = set()
+    for reference in _DOTTED.findall(sql):
+        segments = reference.split(".")
+        if segments[0] in aliases:
+            paths.add(".".join([aliases[segments[0]], *segments[1:]]))
+        elif root in segments[:2]:
+            paths.add(".".join(segments[segments.index(root):]))
+
+    return sorted(path for path in paths - unnested if path.count(".") > 0)
+
+def paths_from_dbt_models(models_dir: str, source_table: str) -> List[str]:
+    """Union of `paths_from_dbt_sql` over the models in `models_dir` that select from `source_table`."""
+    paths = set()
+
+    for directory, _, files in os.walk(models_dir):
+        for name in files:
+            if not name.endswith(".sql"):
+                continue
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                sql = file.read()
+            if source_table in _SOURCE.findall(sql):
+                paths.update(paths_from_dbt_sql(sql))
+
+    return sorted(paths)
@@ -0,0 +1,152 @@
+from typing import Dict, Optional
+from threading import Lock
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class DailyQuotaExceededError(RuntimeError):
+    pass
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket shared by every thread that talks to the Bling API.
+
+    `rate` tokens are refilled per second up to `burst`. A 429 received by any
+    worker calls `penalize`, which empties the bucket and blocks every caller
+    until the Retry-After window has elapsed.
+    """
+
+    def __init__(self, rate: float, burst: int, daily_quota: Optional[int] = None, default_penalty: float = 1.0):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate e burst devem ser maiores que zero.")
+
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self.daily_quota = daily_quota
+        self.default_penalty = default_penalty
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._quota_day = self._today()
+        self._quota_used = 0
+        self._lock = Lock()
+
+        self.requests_granted = 0
+        self.throttled_acquisitions = 0
+        self.tokens_waited = 0.0
+        self.wait_seconds = 0.0
+        self.responses_429 = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _check_daily_quota(self, tokens: int):
+        if self.daily_quota is None:
+            return
+
+        today = self._today()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._quota_used = 0
+
+        if self._quota_used + tokens > self.daily_quota:
+            raise DailyQuotaExceededError(
+                f"Cota diária de {self.daily_quota} requisições do Bling atingida ({self._quota_used} usadas)."
+            )
+
+    def _try_acquire(self, tokens: int, waited: bool) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self._blocked_until:
+                sleep_time = self._blocked_until - now
+            elif self._tokens >= tokens:
+                self._check_daily_quota(tokens)
+                self._tokens -= tokens
+                self._quota_used += tokens
+                self.requests_granted += 1
+                if waited:
+                    self.throttled_acquisitions += 1
+                return None
+            else:
+                deficit = tokens - self._tokens
+                sleep_time = deficit / self.rate
+                if not waited:
+                    self.tokens_waited += deficit
+
+            self.wait_seconds += sleep_time
+            return sleep_time
+
+    def acquire(self, tokens: int = 1):
+        waited = False
+
+        while (sleep_time := self._try_acquire(tokens, waited)) is not None:
+            waited = True
+            time.sleep(sleep_time)
+
+    async def acquire_async(self, tokens: int = 1):
+        waited = False
+
+        while (sleep_time := self._try_acquire(tokens, waited)) is not None:
+            waited = True
+            await asyncio.sleep(sleep_time)
+
+    def set_rate(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero.")
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        penalty = retry_after if retry_after is not None else self.default_penalty
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = 0.0
+            self._last_refill = now
+            self._blocked_until = max(self._blocked_until, now + penalty)
+            self.responses_429 += 1
+
+        logger.warning(f"Limite de requisições do Bling atingido (429). Pausando todos os workers por {penalty:.1f}s")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests_granted": self.requests_granted,
+                "throttled_acquisitions": self.throttled_acquisitions,
+                "tokens_waited": round(self.tokens_waited, 2),
+                "wait_seconds": round(self.wait_seconds, 2),
+                "responses_429": self.responses_429,
+                "daily_quota_used": self._quota_used,
+                "daily_quota": self.daily_quota
+            }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
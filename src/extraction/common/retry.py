@@ -0,0 +1,264 @@
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List
+from threading import Condition, Lock, Thread
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import random
+import time
+
+from . import config
+from .bling_api_client import BlingClient
+from .codec import loads
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+def decorrelated_jitter(previous_delay: float, base_delay: float, max_delay: float) -> float:
+    return min(max_delay, random.uniform(base_delay, previous_delay * 3))
+
+class CircuitBreaker:
+    """
+    Trips when the error rate over the last `window` outcomes reaches
+    `error_threshold`, pausing retries for `cooldown` seconds. After more than
+    `max_trips` trips the breaker is exhausted and pending retries are abandoned,
+    so a broken API does not keep burning the daily quota.
+    """
+
+    def __init__(self, window: int = 50, error_threshold: float = 0.5, min_requests: int = 10, cooldown: float = 30.0, max_trips: int = 5):
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = Lock()
+
+    def record(self, success: bool):
+        self.record_many(int(success), int(not success))
+
+    def record_many(self, successes: int, failures: int):
+        with self._lock:
+            self._outcomes.extend([True] * successes)
+            self._outcomes.extend([False] * failures)
+
+            if self._is_open() or len(self._outcomes) < self.min_requests:
+                return
+
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate >= self.error_threshold:
+                self.trips += 1
+                self._open_until = time.monotonic() + self.cooldown
+                self._outcomes.clear()
+                logger.warning(
+                    f"Circuit breaker aberto ({error_rate:.0%} de erros). "
+                    f"Retries pausados por {self.cooldown:.0f}s (disparo {self.trips}/{self.max_trips})"
+                )
+
+    def _is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._is_open()
+
+    @property
+    def remaining_open_seconds(self) -> float:
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.trips > self.max_trips
+
+class RetryStage:
+    """
+    Concurrent retry stage for IDs whose detail request failed.
+
+    Failed IDs can be submitted while the main stage is still running. Each one
+    is retried on its own worker pool, under the client's shared rate limiter,
+    after a decorrelated-jitter backoff, until it succeeds or exhausts
+    `max_attempts`. `wait` blocks until every submitted ID is settled and returns
+    the same structure as `retry_failed_ids`.
+    """
+
+    def __init__(
+        self,
+        client: BlingClient,
+        endpoint: str,
+        params: Dict = None,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        max_workers: int = None,
+        circuit_breaker: CircuitBreaker = None,
+        decode: Callable[[bytes], Any] = loads
+    ):
+        self.client = client
+        self.endpoint = endpoint
+        self.params = params
+        self.decode = decode
+        self.max_attempts = max_attempts or config.BLING_RETRY_MAX_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else config.BLING_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else config.BLING_RETRY_MAX_DELAY
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            error_threshold=config.BLING_CIRCUIT_BREAKER_ERROR_RATE,
+            cooldown=config.BLING_CIRCUIT_BREAKER_COOLDOWN
+        )
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or config.BLING_RETRY_MAX_WORKERS,
+            thread_name_prefix="retry"
+        )
+        self._condition = Condition()
+        self._heap: List = []
+        self._sequence = itertools.count()
+        self._outstanding = 0
+        self._stopping = False
+        self._scheduler = Thread(target=self._schedule, name="retry-scheduler", daemon=True)
+
+        self.success: List[Dict[str, Any]] = []
+        self.failed: List[Any] = []
+        self.attempts = 0
+        self.busy_seconds = 0.0
+        self._first_submit_at = None
+
+    def start(self) -> "RetryStage":
+        self._scheduler.start()
+        return self
+
+    def record_batch(self, success_count: int, failed_count: int):
+        self.circuit_breaker.record_many(success_count, failed_count)
+
+    def submit(self, object_id: Any):
+        self.submit_many([object_id])
+
+    def submit_many(self, object_ids: Iterable[Any]):
+        with self._condition:
+            now = time.monotonic()
+            for object_id in object_ids:
+                if self._first_submit_at is None:
+                    self._first_submit_at = now
+                delay = decorrelated_jitter(self.base_delay, self.base_delay, self.max_delay)
+                heapq.heappush(self._heap, (now + delay, next(self._sequence), object_id, 1, delay))
+                self._outstanding += 1
+            self._condition.notify_all()
+
+    def _give_up_pending(self):
+        while self._heap:
+            _, _, object_id, _, _ = heapq.heappop(self._heap)
+            self.failed.append(object_id)
+            self._outstanding -= 1
+        self._condition.notify_all()
+
+    def _schedule(self):
+        with self._condition:
+            while True:
+                if self._stopping and self._outstanding == 0:
+                    return
+
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                if self.circuit_breaker.exhausted:
+                    logger.error("Circuit breaker esgotado. Abandonando os retries pendentes.")
+                    self._give_up_pending()
+                    continue
+
+                if self.circuit_breaker.is_open:
+                    self._condition.wait(self.circuit_breaker.remaining_open_seconds)
+                    continue
+
+                ready_at = self._heap[0][0]
+                now = time.monotonic()
+                if ready_at > now:
+                    self._condition.wait(ready_at - now)
+                    continue
+
+                _, _, object_id, attempt, delay = heapq.heappop(self._heap)
+                self._executor.submit(self._attempt, object_id, attempt, delay)
+
+    def _attempt(self, object_id: Any, attempt: int, delay: float):
+        start = time.monotonic()
+
+        try:
+            response = self.client.get(endpoint=f"{self.endpoint}/{object_id}", params=self.params)
+            response.raise_for_status()
+            payload = self.decode(response.content)
+        except Exception as e:
+            self.circuit_breaker.record(False)
+
+            with self._condition:
+                self.attempts += 1
+                self.busy_seconds += time.monotonic() - start
+
+                if attempt >= self.max_attempts:
+                    self.failed.append(object_id)
+                    self._outstanding -= 1
+                    logger.error(f"ID {object_id} falhou permanentemente após {self.max_attempts} tentativas")
+                else:
+                    next_delay = decorrelated_jitter(delay, self.base_delay, self.max_delay)
+                    logger.warning(
+                        f"Retry {attempt}/{self.max_attempts} falhado para ID {object_id}: {str(e)[:100]}. "
+                        f"Nova tentativa em {next_delay:.1f}s"
+                    )
+                    heapq.heappush(self._heap, (time.monotonic() + next_delay, next(self._sequence), object_id, attempt + 1, next_delay))
+
+                self._condition.notify_all()
+            return
+
+        self.circuit_breaker.record(True)
+
+        with self._condition:
+            self.attempts += 1
+            self.busy_seconds += time.monotonic() - start
+            self.success.append(payload)
+            self._outstanding -= 1
+            self._condition.notify_all()
+
+        logger.info(f"Retry bem-sucedido para ID {object_id} na tentativa {attempt}")
+
+    def wait(self) -> Dict[str, Any]:
+        wait_start = time.monotonic()
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            while self._outstanding > 0:
+                self._condition.wait()
+
+        self._scheduler.join()
+        self._executor.shutdown(wait=True)
+
+        end = time.monotonic()
+        retry_summary = {
+            "total_retried": len(self.success) + len(self.failed),
+            "successful_retries": len(self.success),
+            "permanent_failures": len(self.failed),
+            "attempts": self.attempts,
+            "circuit_breaker_trips": self.circuit_breaker.trips,
+            "retry_busy_seconds": round(self.busy_seconds, 2),
+            "retry_wall_seconds": round(end - self._first_submit_at, 2) if self._first_submit_at else 0.0,
+            "wall_seconds_added_after_main_stage": round(end - wait_start, 2)
+        }
+
+        if self.attempts:
+            METRICS.count_retry(f"{self.endpoint}/{{id}}", "retry_stage", self.attempts)
+        METRICS.record_stage("retry", retry_summary["total_retried"], retry_summary["retry_wall_seconds"])
+
+        logger.info(
+            f"Retry concluído: {retry_summary['successful_retries']} sucessos, "
+            f"{retry_summary['permanent_failures']} falhas permanentes, "
+            f"{retry_summary['wall_seconds_added_after_main_stage']}s adicionados ao tempo total"
+        )
+
+        return {"success": self.success, "failed": self.failed, "retry_summary": retry_summary}
+
+def retry_failed_ids(client: BlingClient, endpoint: str, failed_ids: List[str], params: Dict[str, str] = None, max_retries: int = None) -> Dict[str, Any]:
+    retry_stage = RetryStage(client=client, endpoint=endpoint, params=params, max_attempts=max_retries).start()
+    retry_stage.submit_many(failed_ids)
+    return retry_stage.wait()
@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+import json
+import logging
+import os
+
+from google.cloud.storage import Bucket
+
+logger = logging.getLogger(__name__)
+
+SHARD_MARKERS_PREFIX = "state/shards"
+GRANULARITIES = ("day", "week", "month")
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+def split_date_range(start: date, end: date, granularity: str = "month") -> List[Dict[str, str]]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidade inválida: {granularity}. Use uma de {GRANULARITIES}.")
+
+    if start > end:
+        raise ValueError(f"Data inicial {start} posterior à data final {end}.")
+
+    shards = []
+    shard_start = start
+
+    while shard_start <= end:
+        if granularity == "day":
+            next_start = shard_start + timedelta(days=1)
+        elif granularity == "week":
+            next_start = shard_start + timedelta(days=7)
+        else:
+            next_start = _next_month(shard_start)
+
+        shard_end = min(next_start - timedelta(days=1), end)
+        shards.append({"dataInicial": shard_start.isoformat(), "dataFinal": shard_end.isoformat()})
+        shard_start = next_start
+
+    return shards
+
+def parse_shard_arg(value: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard deve estar no formato i/N. Recebido: {value}")
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard fora do intervalo: {value}")
+
+    return index, count
+
+def resolve_shard(shard_arg: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Task position from `--shard i/N` or, on Cloud Run Jobs, from
+    CLOUD_RUN_TASK_INDEX/CLOUD_RUN_TASK_COUNT. Defaults to a single task.
+    """
+    if shard_arg:
+        return parse_shard_arg(shard_arg)
+
+    index = int(os.getenv("CLOUD_RUN_TASK_INDEX", "0"))
+    count = int(os.getenv("CLOUD_RUN_TASK_COUNT", "1"))
+    return index, count
+
+def shards_for_task(shards: List[Dict[str, str]], task_index: int, task_count: int) -> List[Dict[str, str]]:
+    return shards[task_index::task_count]
+
+def shard_run_id(start: date, end: date, granularity: str) -> str:
+    return f"{start.isoformat()}_{end.isoformat()}_{granularity}"
+
+def shard_marker_name(entity: str, run_id: str, shard: Dict[str, str]) -> str:
+    return f"{SHARD_MARKERS_PREFIX}/{entity}/{run_id}/{shard['dataInicial']}_{shard['dataFinal']}.json"
+
+def is_shard_done(storage_bucket: Bucket, entity: str, run_id: str, shard: Dict[str, str]) -> bool:
+    return storage_bucket.blob(shard_marker_name(entity, run_id, shard)).exists()
+
+def mark_shard_done(storage_bucket: Bucket, entity: str, run_id: str, shard: Dict[str, str], summary: Dict):
+    marker = {
+        **shard,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+        "task_index": os.getenv("CLOUD_RUN_TASK_INDEX"),
+        "summary": summary
+    }
+    storage_bucket.blob(shard_marker_name(entity, run_id, shard)).upload_from_string(
+        json.dumps(marker, ensure_ascii=False), content_type="application/json"
+    )
+
+def verify_shards(storage_bucket: Bucket, entity: str, run_id: str, shards: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    missing = [shard for shard in shards if not is_shard_done(storage_bucket, entity, run_id, shard)]
+
+    if missing:
+        logger.error(f"{len(missing)}/{len(shards)} shards de '{entity}' não concluídos: {missing}")
+    else:
+        logger.info(f"Todos os {len(shards)} shards de '{entity}' ({run_id}) foram concluídos.")
+
+    return missing
@@ -0,0 +1,183 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from google.cloud.storage import Bucket
+
+from . import config
+from .checkpoint import CheckpointSink
+from .codec import dumps
+from .compression import compressed_blob_name, content_type_for, normalize_compression, open_compressed_writer
+from .uploads import ParallelCompositeUploadWriter
+
+logger = logging.getLogger(__name__)
+
+class NdjsonBlobSink:
+    """
+    Streams records to a GCS object as NDJSON through a resumable chunked upload.
+
+    Records are serialized as soon as they are written, so memory is bounded by
+    the upload chunk size instead of the number of records. The object is only
+    created when the first line is written, and an upload interrupted by an
+    exception is abandoned instead of being finalized with partial data.
+    The metadata line is appended last, once the extraction totals are known.
+
+    With `compression` (gzip or zstd) the stream is compressed on the fly and the
+    object name gets the codec suffix. With `composite_upload` the compressed
+    bytes are uploaded as parallel parts composed server-side.
+    """
+
+    CONTENT_TYPE = "application/x-ndjson"
+
+    def __init__(
+        self,
+        storage_bucket: Bucket,
+        destination_blob_name: str,
+        chunk_size: int = None,
+        separators: Optional[Tuple[str, str]] = (',', ':'),
+        compression: str = None,
+        composite_upload: bool = None
+    ):
+        self.storage_bucket = storage_bucket
+        self.compression = normalize_compression(config.BLING_NDJSON_COMPRESSION if compression is None else compression)
+        self.destination_blob_name = compressed_blob_name(destination_blob_name, self.compression)
+        self.content_type = content_type_for(self.compression, self.CONTENT_TYPE)
+        self.chunk_size = chunk_size or config.GCS_UPLOAD_CHUNK_SIZE
+        self.composite_upload = config.BLING_COMPOSITE_UPLOAD_ENABLED if composite_upload is None else composite_upload
+        self.separators = separators
+        self.records_written = 0
+        self.bytes_written = 0
+        self._raw_writer = None
+        self._writer = None
+        self._closed = False
+
+    def __enter__(self) -> "NdjsonBlobSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._closed:
+            return
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open(self):
+        if self.composite_upload:
+            self._raw_writer = ParallelCompositeUploadWriter(
+                self.storage_bucket,
+                self.destination_blob_name,
+                content_type=self.content_type,
+                part_size=config.BLING_COMPOSITE_UPLOAD_PART_SIZE,
+                max_workers=config.BLING_COMPOSITE_UPLOAD_MAX_WORKERS
+            )
+        else:
+            blob = self.storage_bucket.blob(self.destination_blob_name)
+            self._raw_writer = blob.open("wb", chunk_size=self.chunk_size, content_type=self.content_type)
+
+        self._writer = open_compressed_writer(self._raw_writer, self.compression)
+
+    def _write_line(self, encoded: bytes):
+        if self._writer is None:
+            self._open()
+
+        if self.bytes_written:
+            self._writer.write(b"\n")
+            self.bytes_written += 1
+
+        self._writer.write(encoded)
+        self.bytes_written += len(encoded)
+
+    def write(self, record: Dict[str, Any]):
+        self._write_line(dumps(record, self.separators))
+        self.records_written += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.write_many(records)
+
+    def write_metadata(self, metadata: Dict[str, Any]):
+        self._write_line(dumps({"metadata": metadata}))
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        self._closed = True
+
+        if metadata is not None and self.records_written:
+            self.write_metadata(metadata)
+
+        if self._writer is None:
+            logger.warning(f"Nenhum registro escrito. gs://{self.storage_bucket.name}/{self.destination_blob_name} não foi criado.")
+            return
+
+        self._writer.close()
+        self._writer = None
+        self._raw_writer = None
+
+        logger.info(
+            f"Salvos {self.records_written} registros ({self.bytes_written / 1024 / 1024:.1f} MB) em: "
+            f"gs://{self.storage_bucket.name}/{self.destination_blob_name}"
+        )
+
+    def abort(self):
+        self._closed = True
+
+        if self._writer is not None:
+            logger.warning(f"Upload de gs://{self.storage_bucket.name}/{self.destination_blob_name} abandonado após erro.")
+            if isinstance(self._raw_writer, ParallelCompositeUploadWriter):
+                self._raw_writer.abort()
+            self._writer = None
+            self._raw_writer = None
+
+class TeeSink:
+    """
+    Forwards every record to a primary sink and to secondary sinks, e.g. the raw
+    NDJSON plus its columnar copy. Closing or aborting applies to all of them.
+    """
+
+    def __init__(self, primary, *secondaries):
+        self.primary = primary
+        self.secondaries = secondaries
+
+    def __enter__(self) -> "TeeSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for sink in (self.primary, *self.secondaries):
+            sink.__exit__(exc_type, exc, tb)
+
+    def write(self, record: Dict[str, Any]):
+        self.primary.write(record)
+        for sink in self.secondaries:
+            sink.write(record)
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_batch(self, batch_name: str, records: List[Dict[str, Any]], failed_ids: List[Any]):
+        self.primary.write_batch(batch_name, records, failed_ids)
+        for sink in self.secondaries:
+            sink.write_batch(batch_name, records, failed_ids)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None):
+        for sink in (self.primary, *self.secondaries):
+            sink.close(metadata)
+
+    def abort(self):
+        for sink in (self.primary, *self.secondaries):
+            sink.abort()
+
+def open_sink(
+    storage_bucket: Bucket,
+    entity: str,
+    params: Dict[str, Any],
+    destination_blob_name: str,
+    separators: Optional[Tuple[str, str]] = (',', ':')
+):
+    if config.BLING_CHECKPOINT_ENABLED:
+        return CheckpointSink(storage_bucket, entity, params, destination_blob_name, separators=separators)
+
+    return NdjsonBlobSink(storage_bucket, destination_blob_name, separators=separators)
@@ -0,0 +1,355 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from threading import RLock
+from typing import Any, Dict, Optional, Tuple
+import atexit
+import json
+import logging
+import os
+import tempfile
+import time
+
+from google.api_core import exceptions
+from google.cloud import secretmanager
+from google.cloud.storage import Bucket
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+def _encode(state: Dict) -> bytes:
+    return json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("UTF-8")
+
+def _decode(payload: bytes, source: str) -> Dict:
+    try:
+        state = json.loads(payload.decode("UTF-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.warning(f"O conteúdo de {source} não é um JSON válido. Retornando estado vazio.")
+        return {}
+
+    if not isinstance(state, dict):
+        logger.warning(f"O conteúdo de {source} não é um objeto JSON. Retornando estado vazio.")
+        return {}
+
+    return state
+
+class StateBackend(ABC):
+    """
+    Where the pipeline state document lives. `read` returns {} when absent.
+    `read_versioned` also returns the version read, which `write` can take as
+    a precondition; backends without conditional writes return None.
+    `stores_secrets` tells whether the backend is fit for live credentials.
+    """
+
+    stores_secrets = False
+
+    @abstractmethod
+    def read(self) -> Dict:
+        ...
+
+    def read_versioned(self) -> Tuple[Dict, Optional[int]]:
+        return self.read(), None
+
+    @abstractmethod
+    def write(self, state: Dict, if_version: Optional[int] = None):
+        ...
+
+    def describe(self) -> str:
+        return self.__class__.__name__
+
+class SecretManagerBackend(StateBackend):
+    """
+    State stored as versions of a Secret Manager secret.
+
+    Every write adds a version, so after each one the enabled versions beyond
+    the newest `keep_versions` are destroyed (0 keeps them all). Adding a
+    version cannot be made conditional, so `if_version` is ignored.
+    """
+
+    stores_secrets = True
+
+    def __init__(self, project_id: str, secret_id: str, keep_versions: int = 5, client=None):
+        if not project_id or not secret_id:
+            raise ValueError("project_id e secret_id são obrigatórios.")
+
+        self.project_id = project_id
+        self.secret_id = secret_id
+        self.keep_versions = keep_versions
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = secretmanager.SecretManagerServiceClient()
+        return self._client
+
+    @property
+    def secret_path(self) -> str:
+        return f"projects/{self.project_id}/secrets/{self.secret_id}"
+
+    def describe(self) -> str:
+        return f"segredo '{self.secret_id}'"
+
+    def read(self) -> Dict:
+        try:
+            response = self.client.access_secret_version(name=f"{self.secret_path}/versions/latest")
+        except exceptions.NotFound:
+            logger.warning(f"Segredo '{self.secret_id}' não encontrado. Retornando estado vazio.")
+            return {}
+
+        return _decode(response.payload.data, self.describe())
+
+    def write(self, state: Dict, if_version: Optional[int] = None):
+        self.client.add_secret_version(parent=self.secret_path, payload={"data": _encode(state)})
+        if self.keep_versions > 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Destroys enabled versions older than the newest `keep_versions`. Failures are only logged."""
+        try:
+            versions = list(self.client.list_secret_versions(request={"parent": self.secret_path, "filter": "state:ENABLED"}))
+            versions.sort(key=lambda version: version.create_time, reverse=True)
+
+            for version in versions[self.keep_versions:]:
+                self.client.destroy_secret_version(request={"name": version.name})
+        except exceptions.GoogleAPICallError as e:
+            logger.warning(f"Não foi possível remover versões antigas do segredo '{self.secret_id}': {e}")
+            return 0
+
+        pruned = max(0, len(versions) - self.keep_versions)
+        if pruned:
+            logger.info(f"{pruned} versões antigas do segredo '{self.secret_id}' destruídas.")
+        return pruned
+
+class GcsStateBackend(StateBackend):
+    """
+    State stored as a single JSON object in GCS, overwritten on each write.
+    The object generation is its version, so a conditional write fails with
+    PreconditionFailed when another process wrote in between.
+    """
+
+    def __init__(self, storage_bucket: Bucket, blob_name: str):
+        self.storage_bucket = storage_bucket
+        self.blob_name = blob_name
+
+    def describe(self) -> str:
+        return f"gs://{self.storage_bucket.name}/{self.blob_name}"
+
+    def read(self) -> Dict:
+        try:
+            payload = self.storage_bucket.blob(self.blob_name).download_as_bytes()
+        except exceptions.NotFound:
+            logger.warning(f"Estado {self.describe()} não encontrado. Retornando estado vazio.")
+            return {}
+
+        return _decode(payload, self.describe())
+
+    def read_versioned(self) -> Tuple[Dict, Optional[int]]:
+        blob = self.storage_bucket.get_blob(self.blob_name)
+        if blob is None:
+            return {}, 0
+
+        try:
+            payload = blob.download_as_bytes(if_generation_match=blob.generation)
+        except exceptions.NotFound:
+            return {}, 0
+
+        return _decode(payload, self.describe()), blob.generation
+
+    def write(self, state: Dict, if_version: Optional[int] = None):
+        preconditions = {} if if_version is None else {"if_generation_match": if_version}
+        self.storage_bucket.blob(self.blob_name).upload_from_string(
+            _encode(state), content_type="application/json", **preconditions
+        )
+
+def _write_private_file(path: str, payload: bytes):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".state-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class LocalFileStateBackend(StateBackend):
+    """State stored in a local JSON file, replaced atomically on each write."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def describe(self) -> str:
+        return self.path
+
+    def read(self) -> Dict:
+        try:
+            with open(self.path, "rb") as file:
+                return _decode(file.read(), self.describe())
+        except FileNotFoundError:
+            return {}
+
+    def write(self, state: Dict, if_version: Optional[int] = None):
+        _write_private_file(self.path, _encode(state))
+
+class StateStore:
+    """
+    In-process cache of the pipeline state (tokens, watermarks, run state)
+    over a pluggable `StateBackend`.
+
+    Reads never touch the backend after the initial load. Updates are buffered
+    and written by `flush`, which runs at checkpoints, at interpreter exit, or
+    immediately for `durable=True` updates such as a rotated refresh token.
+    Without `write_behind` every update is written. A flush re-reads the
+    backend and merges only the updated keys on top of it, conditionally on
+    the version read where the backend supports it, so it never reverts a key
+    another process changed in the meantime.
+
+    When `snapshot_path` is set, the last loaded or flushed state is mirrored
+    to that local file (mode 0600, it holds the tokens), and a snapshot newer
+    than `snapshot_max_age` seconds is used at startup instead of the backend.
+    `get_state(key, fresh=True)` never answers from the snapshot: it reads the
+    backend first when the state came from it, which is how tokens are read.
+    `reload` always reads the backend and re-applies unflushed updates.
+    """
+
+    FLUSH_ATTEMPTS = 5
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        write_behind: bool = True,
+        snapshot_path: Optional[str] = None,
+        snapshot_max_age: float = 0
+    ):
+        self.backend = backend
+        self.write_behind = write_behind
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age = snapshot_max_age
+
+        self._lock = RLock()
+        self._pending: Dict[str, Any] = {}
+        self.writes = 0
+
+        self._state: Dict = self._load_snapshot()
+        self._from_snapshot = self._state is not None
+        if self._state is None:
+            self._state = self._load_backend()
+
+        if write_behind:
+            atexit.register(self.flush)
+
+    def _load_snapshot(self) -> Optional[Dict]:
+        if not self.snapshot_path or self.snapshot_max_age <= 0:
+            return None
+
+        try:
+            age = time.time() - os.path.getmtime(self.snapshot_path)
+            if age > self.snapshot_max_age:
+                return None
+            with open(self.snapshot_path, "rb") as file:
+                state = json.loads(file.read().decode("UTF-8"))
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(state, dict):
+            return None
+
+        logger.info(f"Estado carregado do snapshot local {self.snapshot_path} ({age:.0f}s), sem consultar {self.backend.describe()}.")
+        return state
+
+    def _save_snapshot(self, state: Dict):
+        if not self.snapshot_path:
+            return
+
+        try:
+            _write_private_file(self.snapshot_path, _encode(state))
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o snapshot local do estado em {self.snapshot_path}: {e}")
+
+    def _load_backend(self) -> Dict:
+        state = self.backend.read()
+        self._save_snapshot(state)
+        return state
+
+    @property
+    def stores_secrets(self) -> bool:
+        return self.backend.stores_secrets
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def reload(self):
+        with self._lock:
+            self._state = {**self._load_backend(), **self._pending}
+            self._from_snapshot = False
+
+    def get_state(self, key: str, fresh: bool = False) -> Optional[Any]:
+        if fresh and self._from_snapshot:
+            self.reload()
+        return self._state.get(key)
+
+    def set_state(self, key: str, value: Any, durable: bool = False):
+        self.update_state({key: value}, durable=durable)
+
+    def update_state(self, values: Dict, durable: bool = False):
+        with self._lock:
+            values = {**values, "last_updated_at": datetime.now(timezone.utc).isoformat()}
+            self._state = {**self._state, **values}
+            self._pending.update(values)
+
+            if durable or not self.write_behind:
+                self.flush()
+
+    def flush(self):
+        """Merges the buffered updates, if any, into the latest backend state in a single write."""
+        with self._lock:
+            if not self._pending:
+                return
+
+            for attempt in range(1, self.FLUSH_ATTEMPTS + 1):
+                current, version = self.backend.read_versioned()
+                state = {**current, **self._pending}
+                try:
+                    self.backend.write(state, if_version=version)
+                    break
+                except exceptions.PreconditionFailed:
+                    if attempt == self.FLUSH_ATTEMPTS:
+                        raise
+                    logger.warning(
+                        f"Estado {self.backend.describe()} alterado por outro processo durante a escrita. "
+                        f"Relendo (tentativa {attempt + 1}/{self.FLUSH_ATTEMPTS})."
+                    )
+
+            self._state = state
+            self._pending = {}
+            self._from_snapshot = False
+            self.writes += 1
+            self._save_snapshot(state)
+
+def build_state_store(project_id: str, secret_id: str, storage_bucket: Optional[Bucket] = None) -> StateStore:
+    """Builds the state store selected by `BLING_STATE_BACKEND` (secret_manager, gcs or local)."""
+    kind = config.BLING_STATE_BACKEND
+
+    if kind == "secret_manager":
+        backend = SecretManagerBackend(project_id, secret_id, keep_versions=config.BLING_STATE_KEEP_VERSIONS)
+    elif kind == "gcs":
+        if storage_bucket is None:
+            raise ValueError("BLING_STATE_BACKEND=gcs exige um bucket.")
+        backend = GcsStateBackend(storage_bucket, config.BLING_STATE_GCS_BLOB)
+    elif kind == "local":
+        backend = LocalFileStateBackend(config.BLING_STATE_LOCAL_PATH)
+    else:
+        raise ValueError(f"BLING_STATE_BACKEND inválido: {kind!r}. Use secret_manager, gcs ou local.")
+
+    return StateStore(
+        backend,
+        write_behind=config.BLING_STATE_WRITE_BEHIND,
+        snapshot_path=config.BLING_STATE_SNAPSHOT_PATH,
+        snapshot_max_age=config.BLING_STATE_SNAPSHOT_MAX_AGE_SECONDS
+    )
@@ -0,0 +1,197 @@
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Optional
+import concurrent.futures
+import logging
+import time
+
+from .gcs_lock import GcsLock
+from .state import StateStore
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_KEY = "ELETROFOR_BLING_REFRESH_TOKEN"
+SHARED_ACCESS_TOKEN_KEY = "ELETROFOR_BLING_ACCESS_TOKEN"
+DEFAULT_EXPIRES_IN = 21600
+
+class TokenManager:
+    """
+    Owns the Bling OAuth tokens for every thread of a process.
+
+    Refreshes are single-flight: concurrent callers that find the same stale
+    token wait for one refresh and reuse its result. A token within
+    `refresh_margin` seconds of expiry is refreshed in the background, so
+    requests do not hit a 401 first. A still-valid access token stored in the
+    state is adopted at startup instead of rotating the refresh token; it is
+    only shared through the state when the backend stores secrets (Secret
+    Manager), otherwise it stays in process memory.
+
+    The rotated refresh token is persisted once per rotation on a background
+    writer (`flush` waits for it). With a `token_lock` (sharded runs), the
+    state is re-read under the cross-process lock and persisted before the
+    lock is released, so other workers never read a consumed refresh token.
+    """
+
+    BACKGROUND_RETRY_SECONDS = 30
+
+    def __init__(
+        self,
+        state_manager: StateStore,
+        request_token: Callable[[str], Dict[str, Any]],
+        token_lock: Optional[GcsLock] = None,
+        refresh_margin: float = 300,
+        persist_attempts: int = 3
+    ):
+        self.state_manager = state_manager
+        self.request_token = request_token
+        self.token_lock = token_lock
+        self.refresh_margin = refresh_margin
+        self.persist_attempts = persist_attempts
+
+        self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+        # A local snapshot may hold a refresh token another process already used.
+        self._refresh_token: Optional[str] = self.state_manager.get_state(REFRESH_TOKEN_KEY, fresh=True)
+
+        self._lock = Lock()
+        self._background_lock = Lock()
+        self._background: Optional[Thread] = None
+        self._background_retry_at = 0.0
+
+        self._persist_lock = Lock()
+        self._pending_state: Optional[Dict[str, Any]] = None
+        self._persisting = False
+        self._persist_future: Optional[concurrent.futures.Future] = None
+        self._persister = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-persist")
+
+        self.refreshes = 0
+        self.adopted = 0
+
+    def _remaining(self) -> float:
+        return self._expires_at - time.time()
+
+    def _adopt_stored_token(self) -> bool:
+        if not self.state_manager.stores_secrets:
+            return False
+
+        stored = self.state_manager.get_state(SHARED_ACCESS_TOKEN_KEY, fresh=True) or {}
+
+        if (
+            stored.get("access_token")
+            and stored["access_token"] != self._access_token
+            and stored.get("expires_at", 0) - time.time() > self.refresh_margin
+        ):
+            self._access_token = stored["access_token"]
+            self._expires_at = stored["expires_at"]
+            self._refresh_token = self.state_manager.get_state(REFRESH_TOKEN_KEY)
+            self.adopted += 1
+            logger.info("Access Token do Bling reaproveitado do estado salvo.")
+            return True
+
+        return False
+
+    def _rotate(self) -> Dict[str, Any]:
+        if not self._refresh_token:
+            raise ValueError("Refresh Token não encontrado. Gere um novo com o Auth Code.")
+
+        payload = self.request_token(self._refresh_token)
+
+        self._access_token = payload["access_token"]
+        self._refresh_token = payload["refresh_token"]
+        self._expires_at = time.time() + (payload.get("expires_in") or DEFAULT_EXPIRES_IN)
+        self.refreshes += 1
+
+        logger.info("Access Token do Bling renovado com sucesso!")
+
+        # A bearer token must not land in plain text in the bucket or on disk;
+        # any copy left there by an earlier version is cleared.
+        shared = {"access_token": self._access_token, "expires_at": self._expires_at} if self.state_manager.stores_secrets else None
+
+        return {REFRESH_TOKEN_KEY: self._refresh_token, SHARED_ACCESS_TOKEN_KEY: shared}
+
+    def _refresh(self, stale_token: Optional[str], force: bool):
+        with self._lock:
+            if self._access_token is not None and self._access_token != stale_token:
+                return
+            if not force and self._access_token is not None and self._remaining() > self.refresh_margin:
+                return
+
+            if self.token_lock is None:
+                if self._access_token is None and self._adopt_stored_token():
+                    return
+                self._schedule_persist(self._rotate())
+                return
+
+            with self.token_lock:
+                self.state_manager.reload()
+                if self._adopt_stored_token():
+                    return
+                self._refresh_token = self.state_manager.get_state(REFRESH_TOKEN_KEY)
+                self.state_manager.update_state(self._rotate(), durable=True)
+
+    def _refresh_in_background(self, stale_token: str):
+        try:
+            self._refresh(stale_token, force=False)
+        except Exception as e:
+            self._background_retry_at = time.time() + self.BACKGROUND_RETRY_SECONDS
+            logger.warning(f"Renovação antecipada do Access Token falhou: {e}. Nova tentativa em {self.BACKGROUND_RETRY_SECONDS}s.")
+
+    def _schedule_persist(self, values: Dict[str, Any]):
+        with self._persist_lock:
+            self._pending_state = {**(self._pending_state or {}), **values}
+            if not self._persisting:
+                self._persisting = True
+                self._persist_future = self._persister.submit(self._persist_pending)
+
+    def _persist_pending(self):
+        while True:
+            with self._persist_lock:
+                values, self._pending_state = self._pending_state, None
+                if values is None:
+                    self._persisting = False
+                    return
+
+            for attempt in range(1, self.persist_attempts + 1):
+                try:
+                    self.state_manager.update_state(values, durable=True)
+                    break
+                except Exception as e:
+                    if attempt == self.persist_attempts:
+                        logger.error(f"Falha ao salvar o Refresh Token rotacionado no estado: {e}")
+                        with self._persist_lock:
+                            self._pending_state = {**values, **(self._pending_state or {})}
+                            self._persisting = False
+                        raise
+                    time.sleep(2 ** (attempt - 1))
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Current token without blocking; starts a background refresh near expiry."""
+        token = self._access_token
+
+        if token is not None and self._remaining() <= self.refresh_margin and time.time() >= self._background_retry_at:
+            with self._background_lock:
+                if self._background is None or not self._background.is_alive():
+                    self._background = Thread(target=self._refresh_in_background, args=(token,), name="token-refresh", daemon=True)
+                    self._background.start()
+
+        return token
+
+    def get_token(self) -> str:
+        """Valid token, refreshing synchronously (single-flight) when missing or expired."""
+        token = self._access_token
+
+        if token is None or self._remaining() <= 0:
+            self._refresh(token, force=False)
+            return self._access_token
+
+        return self.access_token
+
+    def invalidate(self, stale_token: Optional[str]):
+        """Called after a 401: refreshes unless another thread already replaced `stale_token`."""
+        self._refresh(stale_token, force=True)
+
+    def flush(self, timeout: Optional[float] = None):
+        with self._persist_lock:
+            future = self._persist_future
+        if future is not None:
+            future.result(timeout=timeout)
@@ -0,0 +1,108 @@
+from typing import List
+import concurrent.futures
+import logging
+
+from google.cloud.storage import Bucket
+
+from .checkpoint import compose_blobs
+
+logger = logging.getLogger(__name__)
+
+class ParallelCompositeUploadWriter:
+    """
+    Writable file object that uploads large outputs as parts in parallel and
+    composes them server-side into `destination_blob_name`.
+
+    Bytes are buffered up to `part_size`; each full buffer is uploaded as its own
+    object on a worker pool, with at most `max_workers` parts in flight. An
+    output smaller than one part is uploaded directly with a single request.
+    Parts are deleted after the compose, and on `abort` nothing is composed.
+    """
+
+    def __init__(self, storage_bucket: Bucket, destination_blob_name: str, content_type: str, part_size: int, max_workers: int = 4):
+        self.storage_bucket = storage_bucket
+        self.destination_blob_name = destination_blob_name
+        self.content_type = content_type
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.parts_prefix = f"{destination_blob_name}.parts"
+
+        self._buffer = bytearray()
+        self._parts: List[str] = []
+        self._in_flight: List[concurrent.futures.Future] = []
+        self._executor = None
+        self._position = 0
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def _upload_part(self, name: str, data: bytes):
+        self.storage_bucket.blob(name).upload_from_string(data, content_type=self.content_type)
+
+    def _submit_part(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="upload")
+
+        if len(self._in_flight) >= self.max_workers:
+            done, _ = concurrent.futures.wait(self._in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                future.result()
+            self._in_flight = [future for future in self._in_flight if future not in done]
+
+        name = f"{self.parts_prefix}/{len(self._parts):06d}"
+        self._parts.append(name)
+        self._in_flight.append(self._executor.submit(self._upload_part, name, bytes(self._buffer)))
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+
+        if len(self._buffer) >= self.part_size:
+            self._submit_part()
+
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        if not self._parts:
+            self._upload_part(self.destination_blob_name, bytes(self._buffer))
+            return
+
+        if self._buffer:
+            self._submit_part()
+
+        try:
+            for future in concurrent.futures.as_completed(self._in_flight):
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+        compose_blobs(self.storage_bucket, self._parts, self.destination_blob_name, self.content_type, f"{self.parts_prefix}/compose")
+
+        for name in self._parts:
+            self.storage_bucket.blob(name).delete()
+
+        logger.info(f"Upload composto de {len(self._parts)} partes em gs://{self.storage_bucket.name}/{self.destination_blob_name}")
+
+    def abort(self):
+        self.closed = True
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+        for name in self._parts:
+            try:
+                self.storage_bucket.blob(name).delete()
+            except Exception:
+                pass
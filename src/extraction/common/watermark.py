@@ -0,0 +1,58 @@
+from typing import Dict, Optional
+from datetime import date, datetime, timedelta, timezone
+import logging
+
+from .state import StateStore
+
+logger = logging.getLogger(__name__)
+
+SALES_WATERMARK_KEY = "SALES_EXTRACTION_WATERMARK"
+
+def load_watermark(state_manager: StateStore, key: str = SALES_WATERMARK_KEY) -> Optional[Dict]:
+    watermark = state_manager.get_state(key)
+
+    if watermark and not isinstance(watermark, dict):
+        logger.warning(f"Watermark '{key}' inválido no estado ({watermark!r}). Ignorando.")
+        return None
+
+    return watermark
+
+def save_watermark(state_manager: StateStore, watermark: Dict, key: str = SALES_WATERMARK_KEY):
+    state_manager.set_state(key, watermark)
+    logger.info(f"Watermark '{key}' atualizado: {watermark}")
+
+def compute_incremental_window(
+    watermark: Optional[Dict],
+    until: date,
+    overlap_days: int = 1,
+    bootstrap_days: int = 7
+) -> Dict[str, str]:
+    """
+    Alteration-date window for the next incremental run.
+
+    The window starts `overlap_days` before the last successful
+    `dataAlteracaoFinal`, so late writes on the boundary day are picked up again,
+    and always ends at `until`. Since the watermark only advances after a
+    successful run, missed or failed runs widen the next window instead of
+    leaving gaps. Without a watermark the last `bootstrap_days` are extracted.
+    """
+    if watermark and watermark.get("dataAlteracaoFinal"):
+        last_until = date.fromisoformat(watermark["dataAlteracaoFinal"])
+        start = last_until - timedelta(days=overlap_days)
+    else:
+        start = until - timedelta(days=bootstrap_days - 1)
+
+    start = min(start, until)
+
+    return {
+        "dataAlteracaoInicial": start.isoformat(),
+        "dataAlteracaoFinal": until.isoformat()
+    }
+
+def build_watermark(window: Dict[str, str], extracted_records: int) -> Dict:
+    return {
+        "dataAlteracaoInicial": window["dataAlteracaoInicial"],
+        "dataAlteracaoFinal": window["dataAlteracaoFinal"],
+        "extracted_records": extracted_records,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
@@ -0,0 +1,84 @@
+from .common.entity import EntitySpec
+from .common.models import Product, SalesOrder
+from .common.parquet_sink import SALES_ORDER_TABLES
+
+# JSON paths read by the dbt staging models, as printed by
+# `python -m benchmarks.bench_projection --print-paths` (which also fails when
+# these lists drift from the models).
+SALES_ORDER_PATHS = (
+    "data.id", "data.numero", "data.data", "data.dataSaida", "data.dataPrevista", "data.totalProdutos", "data.total",
+    "data.contato.id", "data.situacao.id", "data.loja.id", "data.desconto.valor",
+    "data.taxas.taxaComissao", "data.taxas.custoFrete", "data.taxas.valorBase",
+    "data.itens[].produto.id", "data.itens[].quantidade", "data.itens[].valor"
+)
+
+PRODUCT_PATHS = (
+    "data.id", "data.nome", "data.codigo", "data.marca", "data.preco", "data.situacao", "data.formato", "data.categoria.id",
+    "data.fornecedor.contato.nome", "data.fornecedor.codigo", "data.fornecedor.precoCusto", "data.fornecedor.precoCompra",
+    "data.estrutura.componentes[].produto.id", "data.estrutura.componentes[].quantidade"
+)
+
+SALES_ORDERS = EntitySpec(
+    name="sales_orders",
+    list_endpoint="pedidos/vendas",
+    detail_endpoint="pedidos/vendas",
+    output_path="raw/sales_data/dt={partition}/raw_sales_orders.ndjson",
+    partition_keys=("dataFinal", "dataAlteracaoFinal"),
+    partition_field="data.data",
+    records_key="orders",
+    total_key="total_orders",
+    label="pedidos de venda",
+    separators=(',', ':'),
+    parquet_tables=SALES_ORDER_TABLES,
+    model=SalesOrder,
+    projection=SALES_ORDER_PATHS
+)
+
+PRODUCTS = EntitySpec(
+    name="products",
+    list_endpoint="produtos",
+    detail_endpoint="produtos",
+    output_path="raw/products_data/raw_products.ndjson",
+    records_key="products",
+    total_key="total_products",
+    label="produtos",
+    model=Product,
+    projection=PRODUCT_PATHS
+)
+
+PRODUCT_CATEGORIES = EntitySpec(
+    name="product_categories",
+    list_endpoint="categorias/produtos",
+    output_path="raw/dim_data/raw_product_categories.ndjson",
+    label="categorias de produtos"
+)
+
+SALES_CHANNELS = EntitySpec(
+    name="sales_channels",
+    list_endpoint="canais-venda",
+    output_path="raw/dim_data/raw_sales_channels.ndjson",
+    label="canais de venda"
+)
+
+SALES_STATUS = EntitySpec(
+    name="sales_status",
+    list_endpoint="situacoes/modulos/98310",
+    output_path="raw/dim_data/raw_sales_status.ndjson",
+    params={},
+    label="status de venda",
+    paginated=False
+)
+
+CONTACTS = EntitySpec(
+    name="contacts",
+    list_endpoint="contatos",
+    detail_endpoint="contatos",
+    output_path="raw/contacts_data/raw_contacts.ndjson",
+    records_key="contacts",
+    total_key="total_contacts",
+    label="contatos"
+)
+
+DIMENSIONS = (PRODUCT_CATEGORIES, SALES_CHANNELS, SALES_STATUS)
+
+ENTITIES = {spec.name: spec for spec in (SALES_ORDERS, PRODUCTS, CONTACTS, *DIMENSIONS)}